@@ -0,0 +1,459 @@
+"""Benchmarks of the CommandRunner hot paths.
+
+Measures command discovery, job dispatch through CommandExecuter, argument
+JSON handling and HTML generation, and writes the timings to a JSON file, so
+results of different versions can be compared.
+
+Examples:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --quick --output quick.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/old.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+SRC_DIR = ROOT_DIR / "src"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+RESULTS_VERSION = 1
+
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import CommandExecuter  # noqa: E402
+import Commands  # noqa: E402
+import Core  # noqa: E402
+
+# sizes of the synthetic inputs, full run and --quick run
+SIZES = {
+    "commands": (300, 20),
+    "target_files": (100000, 1000),
+    "links": (100000, 1000),
+    "worker_jobs": (50, 5),
+}
+
+SYNTHETIC_COMMAND = """from dataclasses import dataclass, field
+
+from CommandBase import CommandBase
+
+
+@dataclass
+class {name}(CommandBase):
+    label = "{name}"
+    tooltip = "Synthetic benchmark command"
+    Category = "Benchmark"
+
+    count: int = field(default=1, metadata={{"help": "a count"}})
+    name: str = "abc"
+    target_files: list = field(default=None)
+
+    def run(self, data={{}}):
+        pass
+"""
+
+# runs CommandExecuter with the synthetic commands importable as Commands.*
+EXECUTER_BOOTSTRAP = """import sys
+sys.path.insert(0, {src_dir!r})
+import Commands
+Commands.__path__.append({commands_dir!r})
+import CommandExecuter
+{statement}
+"""
+
+
+class BenchmarkContext:
+    """Synthetic inputs shared by the benchmarks.
+
+    Args:
+        work_dir (Path): Directory to create the inputs in
+        quick (bool): Use small inputs, e.g. to check the benchmarks still run
+    """
+
+    def __init__(self, work_dir: Path, quick: bool):
+        self.work_dir = work_dir
+        self.sizes = {name: sizes[int(quick)] for name, sizes in SIZES.items()}
+
+        self.commands_dir = work_dir / "Commands"
+        self.commands_dir.mkdir()
+        for index in range(self.sizes["commands"]):
+            name = "Cmd_Bench{0:04d}".format(index)
+            (self.commands_dir / f"{name}.py").write_text(
+                SYNTHETIC_COMMAND.format(name=name)
+            )
+
+        self.cache_dir = work_dir / "cache"
+        self.cache_dir.mkdir()
+        self.log_dir = work_dir / "log"
+        self.log_dir.mkdir()
+
+        self.noop_arguments = self.log_dir / "Arguments_noop.json"
+        self.noop_arguments.write_text(
+            json.dumps(
+                {"cmd_py_path": (self.commands_dir / "Cmd_Bench0000.py").as_posix()}
+            )
+        )
+
+        self.target_files = [
+            "D:/Projects/Assets/Character_{0:06d}/Character_{0:06d}.ma".format(index)
+            for index in range(self.sizes["target_files"])
+        ]
+        self.links = [
+            {
+                "Title": "Story number {0} about something".format(index),
+                "Link": "https://example.com/item?id={0}".format(index),
+                "Votes": index % 1000,
+            }
+            for index in range(self.sizes["links"])
+        ]
+
+    def bootstrap(self, statement: str) -> List[str]:
+        """Get the command line running CommandExecuter code in a new process.
+
+        Args:
+            statement (str): Code to run after CommandExecuter is imported
+
+        Returns:
+            List[str]: Program and arguments
+        """
+        code = EXECUTER_BOOTSTRAP.format(
+            src_dir=str(SRC_DIR),
+            commands_dir=str(self.commands_dir),
+            statement=statement,
+        )
+        return [sys.executable, "-c", code]
+
+
+@contextmanager
+def patched(obj: Any, name: str, value: Any):
+    """Replace an attribute for the duration of a benchmark."""
+    original = getattr(obj, name)
+    setattr(obj, name, value)
+    try:
+        yield
+    finally:
+        setattr(obj, name, original)
+
+
+@contextmanager
+def synthetic_commands(context: BenchmarkContext):
+    """Make the synthetic commands importable as Commands.*, quietly."""
+    Commands.__path__.append(str(context.commands_dir))
+    logging.disable(logging.INFO)
+    try:
+        with patched(Core, "get_cache_dir", lambda: context.cache_dir):
+            with patched(Core, "get_log_dir", lambda: context.log_dir):
+                yield
+    finally:
+        logging.disable(logging.NOTSET)
+        Commands.__path__.remove(str(context.commands_dir))
+
+
+def measure(
+    func: Callable[[], Any],
+    repeat: int,
+    setup: Optional[Callable[[], Any]] = None,
+) -> List[float]:
+    """Time a function.
+
+    Args:
+        func (Callable): Function to time
+        repeat (int): Number of timed runs
+        setup (Callable, optional): Called before every run, not timed
+
+    Returns:
+        List[float]: Seconds of every run
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        timer_start = timeit.default_timer()
+        func()
+        timings.append(timeit.default_timer() - timer_start)
+    return timings
+
+
+def bench_get_commands_map(context: BenchmarkContext) -> Dict[str, Any]:
+    """Import and instantiate every command, as the GUI did on refresh."""
+    timings = measure(lambda: Core.get_commands_map(context.commands_dir), 3)
+    return {"timings": timings, "params": {"commands": context.sizes["commands"]}}
+
+
+def bench_get_command_manifest_cold(context: BenchmarkContext) -> Dict[str, Any]:
+    """Parse every command file without importing it, with an empty cache."""
+
+    def clear_cache():
+        for manifest_path in context.cache_dir.glob("CommandManifest_*.json"):
+            manifest_path.unlink()
+
+    timings = measure(
+        lambda: Core.get_command_manifest(context.commands_dir), 3, clear_cache
+    )
+    return {"timings": timings, "params": {"commands": context.sizes["commands"]}}
+
+
+def bench_get_command_manifest_warm(context: BenchmarkContext) -> Dict[str, Any]:
+    """Get the command manifest when no command file changed."""
+    Core.get_command_manifest(context.commands_dir)
+    timings = measure(lambda: Core.get_command_manifest(context.commands_dir), 10)
+    return {"timings": timings, "params": {"commands": context.sizes["commands"]}}
+
+
+def bench_execute_in_process(context: BenchmarkContext) -> Dict[str, Any]:
+    """Run a no-op command through CommandExecuter.execute in this process."""
+
+    def clear_stats():
+        Core.clear_job_stats(context.noop_arguments)
+
+    timings = measure(
+        lambda: CommandExecuter.execute(str(context.noop_arguments)), 20, clear_stats
+    )
+    return {"timings": timings, "params": {}}
+
+
+def bench_execute_process(context: BenchmarkContext) -> Dict[str, Any]:
+    """Run a no-op command in a new CommandExecuter process, end to end."""
+    command_line = context.bootstrap(
+        "sys.exit(0 if CommandExecuter.execute({0!r}) else 1)".format(
+            str(context.noop_arguments)
+        )
+    )
+
+    def run():
+        subprocess.run(command_line, check=True, capture_output=True)
+
+    return {"timings": measure(run, 5), "params": {}}
+
+
+def bench_execute_warm_worker(context: BenchmarkContext) -> Dict[str, Any]:
+    """Run no-op commands one after another on a warm worker."""
+    marker = Core.CommandConfig.WORKER_JOB_DONE.encode("ascii")
+    job_line = (context.noop_arguments.as_posix() + "\n").encode("utf-8")
+
+    worker = subprocess.Popen(
+        context.bootstrap("CommandExecuter.serve()"),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+
+    def run_job():
+        worker.stdin.write(job_line)
+        worker.stdin.flush()
+        for line in worker.stdout:
+            if line.startswith(marker):
+                return
+
+    try:
+        # the first job imports the command
+        run_job()
+        timings = measure(run_job, context.sizes["worker_jobs"])
+    finally:
+        worker.stdin.close()
+        worker.wait()
+
+    return {"timings": timings, "params": {"jobs": context.sizes["worker_jobs"]}}
+
+
+def bench_save_arguments(context: BenchmarkContext) -> Dict[str, Any]:
+    """Write the arguments JSON of a job with many target files."""
+    arguments = {
+        "cmd_py_path": "Cmd_Bench0000.py",
+        "target_files": context.target_files,
+    }
+    timings = measure(lambda: Core.save_arguments(arguments), 5)
+    return {
+        "timings": timings,
+        "params": {"target_files": context.sizes["target_files"]},
+    }
+
+
+def bench_load_arguments(context: BenchmarkContext) -> Dict[str, Any]:
+    """Load the arguments JSON of a job with many target files."""
+    arguments_json = Core.save_arguments(
+        {"cmd_py_path": "Cmd_Bench0000.py", "target_files": context.target_files}
+    )
+
+    def load():
+        with open(arguments_json, "r", encoding="utf-8") as f:
+            json.load(f)
+
+    return {
+        "timings": measure(load, 5),
+        "params": {"target_files": context.sizes["target_files"]},
+    }
+
+
+def bench_generate_html_content_with_links(
+    context: BenchmarkContext,
+) -> Dict[str, Any]:
+    """Generate the HTML report of many links."""
+    timings = measure(
+        lambda: Core.generate_html_content_with_links(context.links, "Benchmark"), 3
+    )
+    return {"timings": timings, "params": {"links": context.sizes["links"]}}
+
+
+BENCHMARKS = {
+    "get_commands_map": bench_get_commands_map,
+    "get_command_manifest_cold": bench_get_command_manifest_cold,
+    "get_command_manifest_warm": bench_get_command_manifest_warm,
+    "execute_in_process": bench_execute_in_process,
+    "execute_process": bench_execute_process,
+    "execute_warm_worker": bench_execute_warm_worker,
+    "save_arguments": bench_save_arguments,
+    "load_arguments": bench_load_arguments,
+    "generate_html_content_with_links": bench_generate_html_content_with_links,
+}
+
+
+def get_git_commit() -> str:
+    """Get the current git commit of the repository, empty if unknown."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return ""
+    return result.stdout.strip()
+
+
+def run_benchmarks(names: List[str], quick: bool = False) -> Dict[str, Any]:
+    """Run benchmarks.
+
+    Args:
+        names (List[str]): Names of the benchmarks to run
+        quick (bool, optional): Use small inputs
+
+    Returns:
+        Dict[str, Any]: Results, with the environment and per benchmark the
+            timings and their min, median and mean in seconds
+    """
+    results = {
+        "version": RESULTS_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": get_git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "quick": quick,
+        "benchmarks": {},
+    }
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        context = BenchmarkContext(Path(work_dir), quick)
+        with synthetic_commands(context):
+            for name in names:
+                result = BENCHMARKS[name](context)
+                timings = result["timings"]
+                results["benchmarks"][name] = {
+                    "params": result["params"],
+                    "repeat": len(timings),
+                    "min": min(timings),
+                    "median": statistics.median(timings),
+                    "mean": statistics.mean(timings),
+                    "timings": timings,
+                }
+                print(
+                    "{0:<36} {1:>12.6f} s  (median of {2})".format(
+                        name, results["benchmarks"][name]["median"], len(timings)
+                    ),
+                    flush=True,
+                )
+
+    return results
+
+
+def compare_results(old: Dict[str, Any], new: Dict[str, Any], threshold: float):
+    """Print the median of every benchmark relative to a previous run.
+
+    Args:
+        old (Dict[str, Any]): Previous results
+        new (Dict[str, Any]): Current results
+        threshold (float): Ratio above which a benchmark counts as slower
+
+    Returns:
+        List[str]: Names of the benchmarks that got slower
+    """
+    slower = []
+    print("\ncompared to {0} ({1}):".format(old.get("commit"), old.get("created")))
+    for name, result in new["benchmarks"].items():
+        old_result = old["benchmarks"].get(name)
+        if not old_result or old_result["params"] != result["params"]:
+            print("{0:<36} {1:>12}".format(name, "n/a"))
+            continue
+
+        ratio = result["median"] / old_result["median"] if old_result["median"] else 0
+        flag = ""
+        if ratio > threshold:
+            flag = "  SLOWER"
+            slower.append(name)
+        elif ratio and ratio < 1 / threshold:
+            flag = "  faster"
+        print("{0:<36} {1:>11.2f}x{2}".format(name, ratio, flag))
+
+    return slower
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run CommandRunner benchmarks")
+    parser.add_argument(
+        "names",
+        nargs="*",
+        help="Benchmarks to run, all by default: {0}".format(", ".join(BENCHMARKS)),
+    )
+    parser.add_argument("--quick", action="store_true", help="Use small inputs")
+    parser.add_argument(
+        "--output",
+        help="Results JSON file, defaults to benchmarks/results/<time>_<commit>.json",
+    )
+    parser.add_argument("--compare", help="Results JSON file of a previous run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="Median ratio above which --compare reports a regression",
+    )
+    args = parser.parse_args(argv)
+    unknown_names = [name for name in args.names if name not in BENCHMARKS]
+    if unknown_names:
+        parser.error("unknown benchmarks: {0}".format(", ".join(unknown_names)))
+
+    results = run_benchmarks(args.names or list(BENCHMARKS), args.quick)
+
+    if args.output:
+        output_path = Path(args.output)
+    else:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output_path = RESULTS_DIR / "{0}_{1}.json".format(
+            datetime.now().strftime("%Y-%m-%d-%H-%M-%S"), results["commit"] or "local"
+        )
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4)
+    print("results: {0}".format(output_path.as_posix()))
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            if compare_results(json.load(f), results, args.threshold):
+                return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 @echo off
-python -m pytest tests/test_core.py -v
+python -m pytest tests -v
 if errorlevel 1 (
     echo Test execution failed
     pause
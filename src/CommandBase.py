@@ -1,7 +1,7 @@
 import importlib
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import Core
 from Core import CommandConfig
@@ -85,6 +85,10 @@ class CommandBase(ABC):
         active (bool): Whether the command is active and available for use
         Category (str): Category the command belongs to
         ui_class (str): Name of the UI class to use for this command
+        cache_results (bool): Whether jobs of the command may be answered from
+            the job cache, see JobCache. Only set it for commands whose
+            result depends on nothing but their source, arguments and target
+            files.
     """
 
     label = ""
@@ -92,6 +96,7 @@ class CommandBase(ABC):
     active = True
     Category = "General"
     ui_class = ""
+    cache_results = False
 
     def __init__(self):
         self._ui_ins = None
@@ -102,6 +107,11 @@ class CommandBase(ABC):
 
         This method must be implemented by all command subclasses.
 
+        "target_files" isn't always a list. A sharded job gets a
+        Core.SharedWorkQueue, and an incremental job a Core.OutdatedFiles.
+        Iterate it only once. len() is the number of files the whole job
+        processes, up-to-date files excluded, of which a shard only gets part.
+
         Args:
             data: Dictionary containing command execution data
 
@@ -110,6 +120,23 @@ class CommandBase(ABC):
         """
         pass
 
+    def get_output_path(self, target_file: str, data: Dict[str, Any]) -> Optional[str]:
+        """Get the path of the output the command writes for a target file.
+
+        Commands that declare it support the incremental mode: with
+        "incremental" set in the job arguments, target files whose output is
+        newer than the file are skipped before the command sees them, see
+        Core.OutdatedFiles.
+
+        Args:
+            target_file: Path of the target file
+            data: Dictionary containing command execution data
+
+        Returns:
+            Optional[str]: The output path, None if it isn't known
+        """
+        return None
+
     @property
     def ui(self):
         """Get the command's UI instance.
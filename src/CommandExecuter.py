@@ -1,13 +1,185 @@
 import importlib
 import json
 import os
+import sys
 import timeit
+from contextlib import suppress
+from datetime import datetime
 from pathlib import Path
 
+with suppress(ModuleNotFoundError):
+    import resource
+
 import Core
 
 logger = Core.get_logger()
 
+# mtime of each command file at the time its module was (re)imported
+_command_mtimes = {}
+
+
+def import_command_module(cmd: str, cmd_py_path: str):
+    """Import a command module, reloading it only if its file changed.
+
+    A fresh interpreter imports the module once. A worker process keeps the
+    module between jobs and reloads it when the command file was modified.
+
+    Args:
+        cmd (str): Name of the command module
+        cmd_py_path (str): Path to the python file of the command
+
+    Returns:
+        The imported command module
+    """
+    module_name = f"Commands.{cmd}"
+    mtime = Path(cmd_py_path).stat().st_mtime_ns
+
+    if module_name in sys.modules:
+        command_module = sys.modules[module_name]
+        if _command_mtimes.get(cmd) != mtime:
+            command_module = importlib.reload(command_module)
+    else:
+        command_module = importlib.import_module(module_name)
+
+    _command_mtimes[cmd] = mtime
+    return command_module
+
+
+def reset_peak_rss() -> bool:
+    """Reset the peak resident set size of this process to its current size.
+
+    Only possible on Linux, through /proc/self/clear_refs. Elsewhere the peak
+    can't be reset, so on a warm worker it covers every job run so far.
+
+    Returns:
+        bool: True if the peak was reset
+    """
+    with suppress(OSError):
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+
+    return False
+
+
+def get_peak_rss() -> int:
+    """Get the peak resident set size of this process.
+
+    Uses /proc on Linux, as ru_maxrss there includes the memory of the parent
+    process before exec, the resource module on other Unix systems and psutil
+    on Windows. On Linux the peak is since the last reset_peak_rss().
+
+    Returns:
+        int: Peak resident set size in bytes, 0 if it can't be measured
+    """
+    with suppress(OSError):
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+
+    if "resource" in globals():
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+    with suppress(ModuleNotFoundError):
+        import psutil
+
+        return getattr(psutil.Process().memory_info(), "peak_wset", 0)
+
+    return 0
+
+
+def get_output_paths(target_files, get_output_path) -> list:
+    """Get the output paths a command writes for its target files.
+
+    Args:
+        target_files: Paths of the target files, listed more than once or not
+        get_output_path: Callable returning the output path of a target file,
+            None if it isn't known
+
+    Returns:
+        list: The known output paths, in target file order
+
+    Raises:
+        ValueError: If different target files have the same output path
+    """
+    outputs = {}
+    for target_file in dict.fromkeys(target_files):
+        output_path = get_output_path(target_file)
+        if output_path:
+            outputs.setdefault(output_path, []).append(target_file)
+
+    clashes = [
+        "{0} <- {1}".format(output_path, ", ".join(files))
+        for output_path, files in outputs.items()
+        if len(files) > 1
+    ]
+    if clashes:
+        raise ValueError(
+            "target files with the same output: {0}".format("; ".join(clashes))
+        )
+    return list(outputs)
+
+
+def get_output_path_callable(command, arg_json_data: dict):
+    """Bind the get_output_path of a command to the arguments of its job.
+
+    Args:
+        command: Command instance
+        arg_json_data (dict): Command arguments, as loaded from the JSON file
+
+    Returns:
+        Callable returning the output path of a target file, None if the
+            command has no get_output_path
+    """
+    if not hasattr(command, "get_output_path"):
+        return None
+
+    data = dict(arg_json_data)
+    return lambda target_file: command.get_output_path(target_file, data)
+
+
+def wrap_target_files(ARG_JSON_PATH: str, arg_json_data: dict, get_output_path):
+    """Wrap the target files of a sharded or incremental job.
+
+    Args:
+        ARG_JSON_PATH (str): Path to the JSON file containing command arguments
+        arg_json_data (dict): Command arguments
+        get_output_path: Callable returning the output path of a target file,
+            None if the command doesn't know its outputs
+
+    Returns:
+        The target files to hand to the command, a list, a
+            Core.SharedWorkQueue or a Core.OutdatedFiles
+    """
+    target_files = arg_json_data.get("target_files", [])
+    if arg_json_data.get("shard_count", 1) > 1:
+        target_files = Core.SharedWorkQueue(
+            Core.SharedWorkQueue.get_queue_dir(ARG_JSON_PATH), target_files
+        )
+    if arg_json_data.get("incremental") and get_output_path:
+        target_files = Core.OutdatedFiles(target_files, get_output_path)
+    return target_files
+
+
+def log_target_files(target_files) -> None:
+    """Log how many target files a sharded or incremental job processed.
+
+    Args:
+        target_files: Target files from wrap_target_files, once iterated
+    """
+    if isinstance(target_files, Core.OutdatedFiles):
+        logger.info("skipped {0} up-to-date target files".format(target_files.skipped))
+        target_files = target_files.target_files
+    if isinstance(target_files, Core.SharedWorkQueue):
+        logger.info(
+            "processed {0} of {1} shared target files".format(
+                target_files.claimed, len(target_files)
+            )
+        )
+
 
 def execute(ARG_JSON_PATH: str) -> bool:
     """Execute a command using arguments from a JSON file.
@@ -25,6 +197,20 @@ def execute(ARG_JSON_PATH: str) -> bool:
         ...
     }
 
+    If "shard_count" is greater than 1, the job runs in several processes at
+    once and "target_files" is handed to the command as a SharedWorkQueue, so
+    each file is processed by only one of them.
+
+    The resource usage of the job, i.e. wall time, import and run time, user
+    and system CPU time and peak memory, is appended as a record to the job's
+    stats file next to the arguments JSON, see Core.get_job_stats_path.
+    "peak_rss_scope" is "job" if the peak memory was reset before the job,
+    and "process" where it can't be, i.e. outside Linux, in which case a warm
+    worker reports the peak of every job it ran so far. Commands with
+    get_output_path also record the output paths of their target files in
+    "outputs", which the job cache checks before reusing a result. Their job
+    fails without running if two target files have the same output path.
+
     Args:
         ARG_JSON_PATH (str): Path to the JSON file containing command arguments
 
@@ -36,6 +222,44 @@ def execute(ARG_JSON_PATH: str) -> bool:
         ImportError: If the command module cannot be imported
         ValueError: If the JSON file has invalid format
     """
+    stats = {"command": "", "import_time": 0.0, "run_time": 0.0}
+    start_time = datetime.now().isoformat(timespec="seconds")
+    peak_rss_scope = "job" if reset_peak_rss() else "process"
+    times_start = os.times()
+    timer_start = timeit.default_timer()
+
+    success = run_arguments(ARG_JSON_PATH, stats)
+
+    times_end = os.times()
+    if Path(ARG_JSON_PATH).is_file():
+        stats.update(
+            {
+                "pid": os.getpid(),
+                "start": start_time,
+                "wall_time": timeit.default_timer() - timer_start,
+                "user_time": times_end.user - times_start.user,
+                "system_time": times_end.system - times_start.system,
+                "peak_rss": get_peak_rss(),
+                "peak_rss_scope": peak_rss_scope,
+                "success": success,
+            }
+        )
+        Core.append_job_stats(ARG_JSON_PATH, stats)
+
+    return success
+
+
+def run_arguments(ARG_JSON_PATH: str, stats: dict) -> bool:
+    """Load the arguments JSON and run its command.
+
+    Args:
+        ARG_JSON_PATH (str): Path to the JSON file containing command arguments
+        stats (dict): Filled with the command name, the time spent importing
+            and running the command, and the output paths of the command
+
+    Returns:
+        bool: True if command executed successfully, False otherwise
+    """
     try:
         logger.info("arguments_json_path: {0}".format(ARG_JSON_PATH))
         if not Path(ARG_JSON_PATH).exists():
@@ -48,36 +272,23 @@ def execute(ARG_JSON_PATH: str) -> bool:
         logger.info("arg_json_data: {0}".format(arg_json_data))
         cmd_py_path = arg_json_data["cmd_py_path"]
         cmd = Path(cmd_py_path).stem
+        stats["command"] = cmd
 
         command_module = None
+        timer_start = timeit.default_timer()
         try:
-            command_module = importlib.import_module(f"Commands.{cmd}")
-            importlib.reload(command_module)
+            command_module = import_command_module(cmd, cmd_py_path)
         except ImportError as e:
             logger.error(f"ImportError: {e}", exc_info=True)
             return False
         except Exception as e:
             logger.error("Exception: {0}".format(e), exc_info=True)
             return False
+        finally:
+            stats["import_time"] = timeit.default_timer() - timer_start
 
         if command_module:
-            timer_start = timeit.default_timer()
-            try:
-                command_cls = getattr(command_module, cmd)
-                new_command = command_cls()
-                new_command.run(arg_json_data)
-                timer_end = timeit.default_timer()
-                logger.info(
-                    "> {0} s, {1} min".format(
-                        (timer_end - timer_start), (timer_end - timer_start) / 60.0
-                    )
-                )
-                logger.info("=================================")
-                logger.info("")
-                return True
-            except Exception as e:
-                logger.error("Exception: {0}".format(e), exc_info=True)
-                return False
+            return run_command(command_module, cmd, ARG_JSON_PATH, arg_json_data, stats)
 
         return False
 
@@ -86,6 +297,87 @@ def execute(ARG_JSON_PATH: str) -> bool:
         return False
 
 
+def run_command(
+    command_module, cmd: str, ARG_JSON_PATH: str, arg_json_data: dict, stats: dict
+) -> bool:
+    """Run the command of an imported command module.
+
+    Args:
+        command_module: The imported command module
+        cmd (str): Name of the command class
+        ARG_JSON_PATH (str): Path to the JSON file containing command arguments
+        arg_json_data (dict): Command arguments
+        stats (dict): Filled with the time spent running the command and its
+            output paths
+
+    Returns:
+        bool: True if command executed successfully, False otherwise
+    """
+    timer_start = timeit.default_timer()
+    try:
+        command_cls = getattr(command_module, cmd)
+        new_command = command_cls()
+        get_output_path = get_output_path_callable(new_command, arg_json_data)
+        if get_output_path:
+            stats["outputs"] = get_output_paths(
+                arg_json_data.get("target_files") or [], get_output_path
+            )
+
+        arg_json_data["target_files"] = wrap_target_files(
+            ARG_JSON_PATH, arg_json_data, get_output_path
+        )
+        new_command.run(arg_json_data)
+        timer_end = timeit.default_timer()
+        stats["run_time"] = timer_end - timer_start
+        log_target_files(arg_json_data["target_files"])
+        logger.info(
+            "> {0} s, {1} min".format(
+                (timer_end - timer_start), (timer_end - timer_start) / 60.0
+            )
+        )
+        logger.info("=================================")
+        logger.info("")
+        return True
+    except Exception as e:
+        logger.error("Exception: {0}".format(e), exc_info=True)
+        return False
+
+
+def serve(job_stream=None) -> None:
+    """Run as a worker that executes jobs one after another.
+
+    Each line read from the job stream is the path of an arguments JSON file.
+    The interpreter, Core and the imported command modules stay loaded between
+    jobs. After each job a line starting with CommandConfig.WORKER_JOB_DONE and
+    followed by a JSON result is printed, so the caller knows the worker is
+    free again. The worker exits when the job stream is closed.
+
+    Args:
+        job_stream: Stream to read jobs from. Defaults to stdin.
+    """
+    if job_stream is None:
+        job_stream = sys.stdin
+
+    logger.info("worker started: {0}".format(sys.executable))
+    for line in job_stream:
+        arg_json_path = line.strip()
+        if not arg_json_path:
+            continue
+
+        success = execute(arg_json_path)
+
+        sys.stderr.flush()
+        print(
+            "{0} {1}".format(
+                Core.CommandConfig.WORKER_JOB_DONE,
+                json.dumps({"arguments": arg_json_path, "success": success}),
+            ),
+            flush=True,
+        )
+
+    logger.info("worker stopped")
+
+
 if __name__ == "__main__":
     # parser = argparse.ArgumentParser()
     # parser.add_argument(
@@ -97,5 +389,8 @@ if __name__ == "__main__":
 
     # NOTE: due to the way blender handles the arguments, currently use environment
     # variable to pass the argument json
-    ARG_JSON_PATH = os.environ.get("ARG_JSON_PATH", "")
-    execute(ARG_JSON_PATH)
+    if os.environ.get(Core.CommandConfig.WORKER_ENV):
+        serve()
+    else:
+        ARG_JSON_PATH = os.environ.get("ARG_JSON_PATH", "")
+        sys.exit(0 if execute(ARG_JSON_PATH) else 1)
@@ -0,0 +1,629 @@
+"""Headless command line front end of CommandRunner.
+
+Lists the available commands and runs batches of jobs through
+CommandExecuter, without Qt. Only Core is imported, so it starts quickly and
+runs on machines without a display, e.g. render nodes or cron jobs.
+
+Examples:
+    python CommandRunnerCLI.py list
+    python CommandRunnerCLI.py run Cmd_Stock --set stock_id=MSFT --set period=1y
+    python CommandRunnerCLI.py run Cmd_MayaDumpSceneInformation \\
+        --interpreter "C:/Program Files/Autodesk/Maya2022/bin/mayapy.exe" \\
+        --file-list scenes.filelist --shards 8 --warm
+"""
+
+import argparse
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import timeit
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import Core
+import FileList
+from JobCache import JobCache
+
+logger = Core.get_logger()
+
+CUR_DIR = Path(__file__).resolve().parent
+EXECUTER_PY = CUR_DIR / "CommandExecuter.py"
+
+
+class CLIJob:
+    """A job run by the command line runner.
+
+    Args:
+        name (str): Name of the job
+        arguments_json (Path): Path to the arguments JSON file
+        cacheable (bool, optional): Whether the job may be answered from the
+            job cache, False for shards that only run part of their job
+    """
+
+    def __init__(self, name: str, arguments_json: Path, cacheable: bool = True):
+        self.name = name
+        self.arguments_json = arguments_json
+        self.log_path = arguments_json.with_suffix(".log")
+        self.cacheable = cacheable
+        self.cached = False
+        self.success = False
+        self.elapsed = 0.0
+
+
+def find_command(commands: Dict[str, Any], name: str) -> Optional[Any]:
+    """Find a command by label or by module name.
+
+    Args:
+        commands (Dict[str, Any]): Mapping of labels to CommandEntry objects
+        name (str): Label or module name, e.g. "Stock" or "Cmd_Stock"
+
+    Returns:
+        Optional[Any]: The CommandEntry, or None if not found
+    """
+    if name in commands:
+        return commands[name]
+
+    for entry in commands.values():
+        if name in (entry.name, entry.name[len("Cmd_") :]):
+            return entry
+
+    return None
+
+
+def parse_value(value: str, field_type: str) -> Any:
+    """Convert an override from the command line to the field's type.
+
+    Args:
+        value (str): Value as given on the command line
+        field_type (str): Annotation of the dataclass field, e.g. "int"
+
+    Returns:
+        Any: The converted value
+    """
+    if field_type == "str":
+        return value
+
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def build_parameters(
+    entry: Any, overrides: List[str], extra: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Build the arguments of a job from the command's field defaults.
+
+    The fields of commands that can't be read statically, e.g. with inherited
+    fields or default factories, are read from the imported command.
+
+    Args:
+        entry (Any): CommandEntry of the command
+        overrides (List[str]): "name=value" overrides
+        extra (Dict[str, Any], optional): Parameters set on top of the
+            overrides, e.g. from a parameters file
+
+    Returns:
+        Dict[str, Any]: Job arguments, including "cmd_py_path"
+
+    Raises:
+        ValueError: If an override isn't name=value, or the command has to be
+            imported and fails to
+    """
+    fields = entry.fields
+    if not entry.record.get("static"):
+        command = entry.load()
+        if command is None:
+            raise ValueError(f"Failed to import {entry.name}, see the log above")
+        fields = Core.get_command_fields(command)
+
+    field_types = {field["name"]: field["type"] for field in fields}
+    parameters = {
+        field["name"]: field["default"] for field in fields if "default" in field
+    }
+
+    for override in overrides:
+        name, sep, value = override.partition("=")
+        if not sep:
+            raise ValueError(f"Override is not name=value: {override}")
+        if name not in field_types:
+            logger.warning(f"{entry.name} has no field {name}, passed as is")
+        parameters[name] = parse_value(value, field_types.get(name, ""))
+
+    parameters.update(extra or {})
+    parameters["cmd_py_path"] = entry.path.as_posix()
+    if entry.cache_results:
+        parameters[JobCache.ARGUMENT] = True
+    return parameters
+
+
+def get_process_environment(worker: bool = False) -> Dict[str, str]:
+    """Get the environment CommandExecuter runs in.
+
+    Args:
+        worker (bool, optional): Start CommandExecuter as a warm worker
+
+    Returns:
+        Dict[str, str]: Environment variables
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        path for path in (CUR_DIR.as_posix(), env.get("PYTHONPATH")) if path
+    )
+    if worker:
+        env[Core.CommandConfig.WORKER_ENV] = "1"
+    return env
+
+
+def run_job_process(interpreter: str, job: CLIJob) -> bool:
+    """Run a job in a new CommandExecuter process.
+
+    Args:
+        interpreter (str): Interpreter command
+        job (CLIJob): Job to run
+
+    Returns:
+        bool: True if the job succeeded
+    """
+    env = get_process_environment()
+    env["ARG_JSON_PATH"] = job.arguments_json.as_posix()
+
+    with open(job.log_path, "wb") as log_file:
+        result = subprocess.run(
+            Core.get_interpreter_arguments(interpreter, EXECUTER_PY),
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+        )
+    return result.returncode == 0
+
+
+class WorkerProcess:
+    """Warm CommandExecuter worker running jobs one after another.
+
+    Args:
+        interpreter (str): Interpreter command
+    """
+
+    def __init__(self, interpreter: str):
+        self.interpreter = interpreter
+        self.process = None
+
+    def run(self, job: CLIJob) -> bool:
+        """Run a job on the worker, starting the worker if needed.
+
+        Args:
+            job (CLIJob): Job to run
+
+        Returns:
+            bool: True if the job succeeded
+        """
+        if self.process is None or self.process.poll() is not None:
+            self.process = subprocess.Popen(
+                Core.get_interpreter_arguments(self.interpreter, EXECUTER_PY),
+                env=get_process_environment(worker=True),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+            )
+
+        marker = Core.CommandConfig.WORKER_JOB_DONE.encode("ascii")
+        self.process.stdin.write(job.arguments_json.as_posix().encode("utf-8") + b"\n")
+        self.process.stdin.flush()
+
+        with open(job.log_path, "wb") as log_file:
+            for line in self.process.stdout:
+                if line.startswith(marker):
+                    return json.loads(line[len(marker) :])["success"]
+                log_file.write(line)
+
+        return False
+
+    def close(self) -> None:
+        """Let the worker exit once its job stream is closed."""
+        if self.process and self.process.poll() is None:
+            self.process.stdin.close()
+            self.process.wait()
+
+
+def run_cached_job(job_cache: JobCache, interpreter: str, job: CLIJob, run):
+    """Restore a job from the job cache, or run it and store its result.
+
+    Args:
+        job_cache (JobCache): Cache to look the job up in
+        interpreter (str): Interpreter command
+        job (CLIJob): Job to run
+        run: Callable running the job, returns whether it succeeded
+
+    Returns:
+        bool: True if the job was found in the cache or succeeded
+    """
+    key = None
+    try:
+        key = job_cache.get_job_key(job.arguments_json, interpreter)
+        entry = job_cache.lookup(key) if key else None
+        if entry:
+            job_cache.restore(entry, job.log_path)
+            job.cached = True
+            return True
+    except Exception as e:
+        logger.warning(f"{job.name}: job cache lookup failed: {e}")
+
+    success = run(job)
+    if success and key:
+        try:
+            job_cache.store(key, job.arguments_json, job.log_path)
+        except Exception as e:
+            logger.warning(f"{job.name}: storing the job result failed: {e}")
+    return success
+
+
+def run_job(
+    interpreter: str, job: CLIJob, run, job_cache: Optional[JobCache] = None
+) -> None:
+    """Run a job and record whether it succeeded and how long it took.
+
+    Args:
+        interpreter (str): Interpreter command
+        job (CLIJob): Job to run
+        run: Callable running the job, returns whether it succeeded
+        job_cache (JobCache, optional): Cache to look the job up in if
+            it's cacheable
+    """
+    timer_start = timeit.default_timer()
+    try:
+        if job_cache and job.cacheable:
+            job.success = run_cached_job(job_cache, interpreter, job, run)
+        else:
+            job.success = run(job)
+    except OSError as e:
+        logger.error(f"{job.name}: {e}")
+        job.success = False
+    job.elapsed = timeit.default_timer() - timer_start
+
+
+def run_worker(
+    interpreter: str,
+    job_queue: queue.Queue,
+    report,
+    warm: bool = False,
+    job_cache: Optional[JobCache] = None,
+) -> None:
+    """Run jobs from the queue one after another until it's empty.
+
+    Args:
+        interpreter (str): Interpreter command
+        job_queue (queue.Queue): Jobs shared with the other workers
+        report: Callable called with each finished job
+        warm (bool, optional): Run the jobs on a warm worker process
+        job_cache (JobCache, optional): Cache to look cacheable jobs up
+            in before running them
+    """
+    worker = WorkerProcess(interpreter) if warm else None
+
+    def run(job):
+        if worker:
+            return worker.run(job)
+        return run_job_process(interpreter, job)
+
+    try:
+        while True:
+            try:
+                job = job_queue.get_nowait()
+            except queue.Empty:
+                return
+
+            run_job(interpreter, job, run, job_cache)
+            report(job)
+    finally:
+        if worker:
+            worker.close()
+
+
+def get_job_status(job: CLIJob) -> str:
+    """Get the status of a finished job, as printed in the progress."""
+    status = "OK" if job.success else "FAILED"
+    if job.cached:
+        status += " (cached)"
+    return status
+
+
+def print_jobs_summary(jobs: List[CLIJob], elapsed: float) -> bool:
+    """Print how many jobs succeeded and the logs of the failed ones.
+
+    Args:
+        jobs (List[CLIJob]): Finished jobs
+        elapsed (float): Time taken by the jobs, in seconds
+
+    Returns:
+        bool: True if every job succeeded
+    """
+    failed = [job for job in jobs if not job.success]
+    print(
+        "{0} jobs, {1} succeeded, {2} failed, {3:.2f} s".format(
+            len(jobs), len(jobs) - len(failed), len(failed), elapsed
+        )
+    )
+    for job in failed:
+        print(f"  FAILED {job.name}: {job.log_path.as_posix()}")
+
+    return not failed
+
+
+def run_jobs(
+    interpreter: str,
+    jobs: List[CLIJob],
+    parallel: int,
+    warm: bool = False,
+    job_cache: Optional[JobCache] = None,
+) -> bool:
+    """Run jobs with a limited number of parallel processes.
+
+    Args:
+        interpreter (str): Interpreter command
+        jobs (List[CLIJob]): Jobs to run
+        parallel (int): Maximum number of jobs running at once
+        warm (bool, optional): Run the jobs on warm workers
+        job_cache (JobCache, optional): Cache to look cacheable jobs up
+            in before running them
+
+    Returns:
+        bool: True if every job succeeded
+    """
+    job_queue = queue.Queue()
+    for job in jobs:
+        job_queue.put(job)
+
+    lock = threading.Lock()
+    finished = []
+
+    def report(job):
+        with lock:
+            finished.append(job)
+            print(
+                "[{0}/{1}] {2}: {3} ({4:.2f} s) {5}".format(
+                    len(finished),
+                    len(jobs),
+                    job.name,
+                    get_job_status(job),
+                    job.elapsed,
+                    job.log_path.as_posix(),
+                ),
+                flush=True,
+            )
+
+    timer_start = timeit.default_timer()
+    threads = [
+        threading.Thread(
+            target=run_worker,
+            args=(interpreter, job_queue, report, warm, job_cache),
+            daemon=True,
+        )
+        for _ in range(max(1, min(parallel, len(jobs))))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return print_jobs_summary(jobs, timeit.default_timer() - timer_start)
+
+
+def list_commands(args) -> int:
+    """Print the available commands and their parameters."""
+    commands = Core.get_command_entries()
+
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    label: {
+                        "name": entry.name,
+                        "tooltip": entry.tooltip,
+                        "Category": entry.Category,
+                        "fields": entry.fields,
+                    }
+                    for label, entry in commands.items()
+                },
+                indent=4,
+            )
+        )
+        return 0
+
+    for label, entry in sorted(commands.items()):
+        print(f"{entry.name}: {label}")
+        if entry.tooltip:
+            print(f"    {entry.tooltip}")
+        for field in entry.fields:
+            default = field.get("default", "<required>")
+            print(f"    --set {field['name']}=<{field['type']}>  (default: {default})")
+
+    return 0
+
+
+def get_target_files(args) -> List[str]:
+    """Get the target files of the run arguments, dropping the missing ones.
+
+    Args:
+        args: Parsed "run" arguments
+
+    Returns:
+        List[str]: Target files from --target-files and --file-list
+    """
+    target_files = list(args.target_files or [])
+    if args.file_list:
+        for chunk in FileList.iter_file_list(args.file_list):
+            target_files += chunk
+
+    if target_files and args.check_files:
+        missing = FileList.find_missing_files(target_files)
+        if missing:
+            logger.warning(FileList.summarize_missing_files(missing, len(target_files)))
+            missing = set(missing)
+            target_files = [path for path in target_files if path not in missing]
+
+    return target_files
+
+
+def get_extra_parameters(args) -> Dict[str, Any]:
+    """Get the parameters the run arguments set on top of the overrides.
+
+    Args:
+        args: Parsed "run" arguments
+
+    Returns:
+        Dict[str, Any]: Target files and how to process them, if any
+    """
+    extra = {}
+    target_files = get_target_files(args)
+    if target_files:
+        extra["target_files"] = target_files
+        if args.incremental:
+            extra["incremental"] = True
+        if args.shards > 1:
+            extra["shard_count"] = min(args.shards, len(target_files))
+
+    return extra
+
+
+def build_jobs(entry: Any, args) -> List[CLIJob]:
+    """Build the jobs of a command, one per parameter set and shard.
+
+    Args:
+        entry (Any): CommandEntry of the command
+        args: Parsed "run" arguments
+
+    Returns:
+        List[CLIJob]: Jobs to run
+
+    Raises:
+        ValueError: If the parameters can't be built, see build_parameters()
+    """
+    extra = get_extra_parameters(args)
+    parameter_sets = [{}]
+    if args.params_file:
+        with open(args.params_file, "r", encoding="utf-8") as f:
+            parameter_sets = [json.loads(line) for line in f if line.strip()]
+
+    jobs = []
+    for index, parameter_set in enumerate(parameter_sets):
+        arguments = build_parameters(entry, args.set, {**extra, **parameter_set})
+        arguments_json = Core.save_arguments(arguments)
+        shard_count = arguments.get("shard_count", 1)
+        if shard_count > 1:
+            Core.SharedWorkQueue(
+                Core.SharedWorkQueue.get_queue_dir(arguments_json), []
+            ).reset()
+
+        for shard in range(shard_count):
+            name = f"{entry.name} #{index}"
+            if shard_count > 1:
+                name += f"/{shard}"
+            job = CLIJob(name, arguments_json, cacheable=shard_count == 1)
+            if shard_count > 1:
+                job.log_path = arguments_json.with_suffix(f".{shard}.log")
+            jobs.append(job)
+
+    return jobs
+
+
+def run_command(args) -> int:
+    """Build the jobs of a command and run them."""
+    commands = Core.get_command_entries()
+    entry = find_command(commands, args.command)
+    if not entry:
+        logger.error(f"Command not found: {args.command}")
+        return 2
+
+    try:
+        jobs = build_jobs(entry, args)
+    except ValueError as e:
+        logger.error(f"{entry.name}: {e}")
+        return 2
+
+    config = Core.get_command_config()
+    interpreter = args.interpreter or Path(sys.executable).as_posix()
+    parallel = args.parallel or config["max_parallel_jobs"]
+    job_cache = JobCache.from_config(config) if args.cache else None
+    return 0 if run_jobs(interpreter, jobs, parallel, args.warm, job_cache) else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run CommandRunner commands")
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    list_parser = subparsers.add_parser("list", help="List the available commands")
+    list_parser.add_argument("--json", action="store_true", help="Print as JSON")
+    list_parser.set_defaults(func=list_commands)
+
+    run_parser = subparsers.add_parser("run", help="Run a command")
+    run_parser.add_argument("command", help="Command label or name, e.g. Cmd_Stock")
+    run_parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="Override a parameter default, can be repeated",
+    )
+    run_parser.add_argument(
+        "--params-file",
+        help="JSON lines file, one job per line with its parameter overrides",
+    )
+    run_parser.add_argument("--target-files", nargs="*", help="Files to process")
+    run_parser.add_argument(
+        "--file-list",
+        help="File list saved by the file collector, or a text file "
+        "with one target file per line",
+    )
+    run_parser.add_argument(
+        "--no-file-check",
+        dest="check_files",
+        action="store_false",
+        help="Don't drop the target files that don't exist, leave it to the command",
+    )
+    run_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip the target files whose output is newer than the file, "
+        "for commands that declare their output paths",
+    )
+    run_parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Number of processes sharing the target files of each job",
+    )
+    run_parser.add_argument(
+        "--interpreter",
+        help="Interpreter command, e.g. mayapy. Defaults to this python",
+    )
+    run_parser.add_argument(
+        "-j",
+        "--parallel",
+        type=int,
+        default=0,
+        help="Maximum number of parallel processes, defaults to max_parallel_jobs",
+    )
+    run_parser.add_argument(
+        "--warm",
+        action="store_true",
+        help="Run jobs on warm workers instead of one process per job",
+    )
+    run_parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        help="Run every job, even if the job cache has its result",
+    )
+    run_parser.set_defaults(func=run_command)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,12 @@
 import json
 from contextlib import suppress
 from dataclasses import dataclass, field
-from pathlib import Path
 
 with suppress(ModuleNotFoundError):
     import bpy
 
 import Core
+import Records
 from CommandBase import CommandBase
 
 logger = Core.get_logger()
@@ -33,25 +33,97 @@ def get_material_info(mat):
     }
 
 
-def get_scene_info():
-    scene_info = {}
+def get_texture_info(image):
+    return {
+        "name": image.name,
+        "filepath": image.filepath,
+        "source": image.source,
+        "size": list(image.size),
+    }
+
+
+def get_camera_info(obj):
+    return {
+        "name": obj.name,
+        "data": obj.data.name,
+        "lens": obj.data.lens,
+        "sensor_width": obj.data.sensor_width,
+        "clip_start": obj.data.clip_start,
+        "clip_end": obj.data.clip_end,
+    }
+
+
+def get_light_info(obj):
+    return {
+        "name": obj.name,
+        "data": obj.data.name,
+        "type": obj.data.type,
+        "energy": obj.data.energy,
+        "color": list(obj.data.color),
+    }
+
+
+def get_collection_info(col):
+    return {"name": col.name, "objects": [obj.name for obj in col.objects]}
+
 
-    scene_info["objects"] = [get_object_info(obj) for obj in bpy.data.objects]
+# records of every category, read one at a time from the open scene
+SCENE_INFO_READERS = {
+    "objects": lambda: map(get_object_info, bpy.data.objects),
+    "materials": lambda: map(get_material_info, bpy.data.materials),
+    "textures": lambda: map(get_texture_info, bpy.data.images),
+    "cameras": lambda: (
+        get_camera_info(obj) for obj in bpy.data.objects if obj.type == "CAMERA"
+    ),
+    "lights": lambda: (
+        get_light_info(obj) for obj in bpy.data.objects if obj.type == "LIGHT"
+    ),
+    "collections": lambda: map(get_collection_info, bpy.data.collections),
+}
 
-    scene_info["materials"] = [get_material_info(mat) for mat in bpy.data.materials]
 
-    scene_info["collections"] = [
-        {"name": col.name, "objects": [obj.name for obj in col.objects]}
-        for col in bpy.data.collections
-    ]
+def write_scene_info(f, categories):
+    """Write the information of the open scene as a JSON object.
 
-    return scene_info
+    Every record is serialized and written on its own, so the whole scene is
+    never held in memory.
+
+    Args:
+        f: Text file to write to
+        categories: Categories to write, keys of SCENE_INFO_READERS
+    """
+    f.write("{")
+    for category_index, category in enumerate(categories):
+        f.write(
+            "{0}\n{1}: [".format("," if category_index else "", json.dumps(category))
+        )
+        for record_index, record in enumerate(SCENE_INFO_READERS[category]()):
+            f.write("{0}\n{1}".format("," if record_index else "", json.dumps(record)))
+        f.write("\n]")
+    f.write("\n}\n")
+
+
+def write_scene_records(writer, target_file, categories):
+    """Write the information of the open scene as one record per item.
+
+    The first record describes the scene, the others have the category they
+    belong to in "category", see Records.iter_records to read them back.
+
+    Args:
+        writer: Records.RecordWriter to write to
+        target_file: Path of the scene
+        categories: Categories to write, keys of SCENE_INFO_READERS
+    """
+    writer.write({"scene": target_file})
+    for category in categories:
+        for record in SCENE_INFO_READERS[category]():
+            writer.write({"category": category, **record})
 
 
 @dataclass
 class Cmd_BlenderDumpSceneInformation(CommandBase):
     label = "Sample - Blender: Dump Scene Information"
-    tooltip = "Dump Blender scene information to a JSON file"
+    tooltip = "Dump Blender scene information to a JSON, JSON lines or msgpack file"
 
     ui_class = "CmdUI_FileCollector"
 
@@ -70,18 +142,65 @@ class Cmd_BlenderDumpSceneInformation(CommandBase):
             ],
         },
     )
+    param_output_dir: str = field(
+        default="",
+        metadata={
+            "help": "Directory to write the JSON files to, "
+            "next to the scene files if empty"
+        },
+    )
 
-    def run(self, data={}):
-        """Run the command to dump Blender scene information"""
-        target_files = data["target_files"]
-
-        for target_file in target_files:
-            logger.info("process: {0}".format(target_file))
+    param_output_format: str = field(
+        default="json",
+        metadata={
+            "help": "Format of the information files, one JSON object or one "
+            "record per line, msgpack needs the msgpack package and .zst "
+            "compression the zstandard package",
+            "items": ["json", *Records.RECORD_FORMATS],
+        },
+    )
 
-            output_path = Path("E:/Temp/") / f"{Path(target_file).stem}_info.json"
-            # Get scene information
-            scene_info = get_scene_info()
+    def get_output_path(self, target_file, data):
+        """The file the information of a scene is dumped to
+
+        Dumps of a single type of information are named after it, so they are
+        not taken for a dump of all of it.
+        """
+        output_format = data.get("param_output_format", "json")
+        output_type = data.get("param_output_type", "all")
+        suffix = "_info" if output_type == "all" else f"_{output_type}_info"
+        return Core.get_scene_output_path(
+            target_file,
+            data.get("param_output_dir", ""),
+            f"{suffix}.{output_format}",
+        )
 
-            # Save to JSON
-            with open(output_path, "w") as f:
-                json.dump(scene_info, f, indent=4)
+    def run(self, data={}):
+        """Run the command to dump Blender scene information
+
+        Every target file is opened in turn in this Blender session. The scenes
+        finished before a failure or a crash are kept, see
+        Core.write_target_outputs.
+        """
+        output_format = data.get("param_output_format", "json")
+        output_type = data.get("param_output_type", "all")
+        if output_type == "all":
+            categories = list(SCENE_INFO_READERS)
+        else:
+            categories = [output_type]
+
+        def write_info(target_file, temp_path):
+            bpy.ops.wm.open_mainfile(filepath=target_file, load_ui=False)
+
+            if output_format == "json":
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    write_scene_info(f, categories)
+            else:
+                with Records.RecordWriter(temp_path, output_format) as writer:
+                    write_scene_records(writer, target_file, categories)
+
+        Core.write_target_outputs(
+            data["target_files"],
+            lambda target_file: self.get_output_path(target_file, data),
+            write_info,
+        )
@@ -1,31 +1,123 @@
 from contextlib import suppress
+from dataclasses import dataclass, field
 
 with suppress(ModuleNotFoundError):
     import maya.standalone
 
     maya.standalone.initialize(name="python")
 
+    import maya.api.OpenMaya as om
     import maya.cmds as cmds
 
 
 import Core
+import Records
 from CommandBase import CommandBase
 
 logger = Core.get_logger()
 
 
+def get_node_record(node):
+    """Describe a dependency node.
+
+    Args:
+        node: MObject of the node
+
+    Returns:
+        dict: Name, type and reference state of the node, plus the DAG path and
+            local transformation of transforms, or the file of references
+    """
+    node_fn = om.MFnDependencyNode(node)
+    record = {
+        "name": node_fn.name(),
+        "type": node_fn.typeName,
+        "referenced": node_fn.isFromReferencedFile,
+    }
+
+    if node.hasFn(om.MFn.kReference):
+        with suppress(RuntimeError):
+            reference_fn = om.MFnReference(node)
+            record["file"] = reference_fn.fileName(True, False, False)
+            record["namespace"] = reference_fn.associatedNamespace(False)
+            record["loaded"] = reference_fn.isLoaded()
+
+    elif node.hasFn(om.MFn.kTransform):
+        path = om.MDagPath.getAPathTo(node)
+        transform_fn = om.MFnTransform(path)
+        translation = transform_fn.translation(om.MSpace.kTransform)
+        rotation = transform_fn.rotation(om.MSpace.kTransform, asQuaternion=False)
+        record["path"] = path.fullPathName()
+        record["translate"] = [translation.x, translation.y, translation.z]
+        record["rotate"] = [rotation.x, rotation.y, rotation.z]
+        record["scale"] = transform_fn.scale()
+        record["visible"] = path.isVisible()
+
+    return record
+
+
+def iter_node_records():
+    """Describe the nodes of the open scene one at a time."""
+    iterator = om.MItDependencyNodes()
+    while not iterator.isDone():
+        yield get_node_record(iterator.thisNode())
+        iterator.next()
+
+
+@dataclass
 class Cmd_MayaDumpSceneInformation(CommandBase):
     label = "Sample - Maya: Dump Scene Information"
-    tooltip = "Dump scene information"
+    tooltip = (
+        "Dump the nodes of every scene to a JSON lines or msgpack file, "
+        "use several processes to share the scenes between mayapy processes"
+    )
     ui_class = "CmdUI_FileCollector"
 
+    param_output_dir: str = field(
+        default="",
+        metadata={
+            "help": "Directory to write the node files to, "
+            "next to the scene files if empty"
+        },
+    )
+    param_output_format: str = field(
+        default="jsonl",
+        metadata={
+            "help": "Format of the node files, msgpack needs the msgpack "
+            "package and .zst compression the zstandard package",
+            "items": [*Records.RECORD_FORMATS],
+        },
+    )
+
+    def get_output_path(self, target_file, data):
+        """The file the nodes of a scene are dumped to"""
+        output_format = data.get("param_output_format", "jsonl")
+        return Core.get_scene_output_path(
+            target_file, data.get("param_output_dir", ""), f"_nodes.{output_format}"
+        )
+
     def run(self, data={}):
-        target_files = data["target_files"]
+        """Dump the nodes of every target file, one record per node
+
+        The first record describes the scene, see Records.iter_records to read
+        them back. The scenes finished before a failure or a crash are kept,
+        see Core.write_target_outputs.
+        """
+        output_format = data.get("param_output_format", "jsonl")
 
-        for target_file in target_files:
-            logger.info("process: {0}".format(target_file))
+        def write_nodes(target_file, temp_path):
             cmds.file(force=True, newFile=True)
             cmds.file(target_file, f=True, open=True)
 
-            for o in cmds.ls():
-                logger.info("Object: {0}".format(o))
+            nodes = 0
+            with Records.RecordWriter(temp_path, output_format) as writer:
+                writer.write({"scene": target_file})
+                for record in iter_node_records():
+                    writer.write(record)
+                    nodes += 1
+            logger.info("{0} nodes: {1}".format(nodes, target_file))
+
+        Core.write_target_outputs(
+            data["target_files"],
+            lambda target_file: self.get_output_path(target_file, data),
+            write_nodes,
+        )
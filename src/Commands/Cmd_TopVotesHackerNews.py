@@ -1,11 +1,13 @@
 import tempfile
 import webbrowser
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from contextlib import suppress
 from dataclasses import dataclass, field
 
 with suppress(ModuleNotFoundError):
     import requests
     from bs4 import BeautifulSoup as bs
+    from requests.adapters import HTTPAdapter
 
 import Core
 from CommandBase import CommandBase
@@ -116,6 +118,65 @@ def create_custom_hn(url, links_arg, subtext_arg):
     return sort_by_votes(hn)
 
 
+def create_session(max_connections):
+    """Create a session keeping up to max_connections connections alive"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_page(session, url, page, timeout=30):
+    response = session.get(f"{url}?p={page}", timeout=timeout)
+    response.raise_for_status()
+    return response.text
+
+
+def parse_page(url, text):
+    soup = bs(text, "html.parser")
+
+    links = soup.select(".titleline > a")
+    subtext = soup.select(".subtext")
+
+    return create_custom_hn(url, links, subtext)
+
+
+def fetch_top_votes(url, num_pages, max_connections=8):
+    """Fetch the pages at once and collect their links with over 99 votes
+
+    At most max_connections pages are requested at once through one pooled
+    session, and every page is parsed as soon as it arrives, while the
+    others are still downloading. Pages that fail are logged and skipped.
+
+    Args:
+        url: Hacker News url
+        num_pages: Number of pages to fetch, starting from the first one
+        max_connections: Maximum number of pages fetched at once
+
+    Returns:
+        list: The links, sorted by votes
+    """
+    all_links = []
+    with create_session(max_connections) as session, ThreadPoolExecutor(
+        max_workers=max(1, min(max_connections, num_pages))
+    ) as executor:
+        futures = {
+            executor.submit(fetch_page, session, url, page): page
+            for page in range(1, num_pages + 1)
+        }
+        for future in as_completed(futures):
+            try:
+                text = future.result()
+            except requests.RequestException as e:
+                logger.error(f"Page {futures[future]}: {e}")
+                continue
+
+            all_links.extend(parse_page(url, text))
+
+    return sort_by_votes(all_links)
+
+
 @dataclass
 class Cmd_TopVotesHackerNews(CommandBase):
     label = "Top Votes Hacker News"
@@ -129,25 +190,18 @@ class Cmd_TopVotesHackerNews(CommandBase):
         default=20, metadata={"help": "Number of top votes to display"}
     )
     num_pages: int = field(default=5, metadata={"help": "Number of pages to scrape"})
+    max_connections: int = field(
+        default=8, metadata={"help": "Maximum number of pages fetched at once"}
+    )
 
     def run(self, data={}):
         url = data["url"]
         num_top_votes = data["num_top_votes"]
         num_pages = data["num_pages"]
+        max_connections = data.get("max_connections", 8)
 
         try:
-            all_links = []
-            for page in range(1, num_pages + 1):
-                req = requests.get(f"{url}?p={page}")
-
-                soup = bs(req.text, "html.parser")
-
-                links = soup.select(".titleline > a")
-                subtext = soup.select(".subtext")
-
-                all_links.extend(create_custom_hn(url, links, subtext))
-
-            all_links = sort_by_votes(all_links)
+            all_links = fetch_top_votes(url, num_pages, max_connections)
             all_links = all_links[:num_top_votes]
             html = generate_html_content_with_links_for_hackernews(
                 all_links,
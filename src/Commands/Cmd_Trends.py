@@ -1,5 +1,7 @@
 import tempfile
+import threading
 import webbrowser
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
 from dataclasses import dataclass, field
 
@@ -12,6 +14,51 @@ from CommandBase import CommandBase
 logger = Core.get_logger("Cmd_Trends")
 
 
+def fetch_news(selected, max_connections=8):
+    """Fetch the news of the trends at once
+
+    At most max_connections trends are fetched at once. Every thread of the
+    pool keeps its own Trends client, so its connections are reused.
+
+    Args:
+        selected: (index, trend) pairs
+        max_connections: Maximum number of trends fetched at once
+
+    Returns:
+        list: Links of the news of every trend, in the order of the trends.
+            A trend whose news can't be fetched has no links.
+    """
+    clients = threading.local()
+
+    def fetch(item):
+        cur_idx, trend = item
+        if not hasattr(clients, "trends"):
+            clients.trends = Trends()
+
+        try:
+            news = clients.trends.trending_now_news_by_ids(
+                trend.news_tokens,
+                max_news=20,
+            )
+        except Exception as e:
+            logger.error(f"Index {cur_idx}: {e}", exc_info=True)
+            return []
+
+        return [
+            {
+                "Title": article.title,
+                "Link": article.url,
+                "Votes": article.source,
+            }
+            for article in news
+        ]
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(max_connections, len(selected)))
+    ) as executor:
+        return list(executor.map(fetch, selected))
+
+
 @dataclass
 class Cmd_Trends(CommandBase):
     label = "Trends"
@@ -24,60 +71,46 @@ class Cmd_Trends(CommandBase):
     )
     start_idx: int = field(default=0, metadata={"help": "Start index of trends"})
     count: int = field(default=10, metadata={"help": "Number of trends to display"})
+    max_connections: int = field(
+        default=8, metadata={"help": "Maximum number of trends fetched at once"}
+    )
 
     def run(self, data={}):
         country_code = data["country_code"]
         count = data["count"]
         start_idx = data["start_idx"]
+        max_connections = data.get("max_connections", 8)
 
         try:
             tr = Trends()
 
             trends = tr.trending_now(geo=country_code)
-            logger.info(f"Got {len(trends)} trend items\n\nFirst trend item:")
-
-            cur_idx = 0
-            for trend in trends:
-                if cur_idx < start_idx:
-                    cur_idx += 1
-                    continue
+            logger.info(f"Got {len(trends)} trend items")
 
-                if cur_idx >= start_idx + count:
+            selected = []
+            for index, trend in enumerate(trends[start_idx:], start_idx):
+                if len(selected) >= count:
                     break
-
-                if not trend.news_tokens:
-                    continue
-
-                logger.info(f"Index: {cur_idx}")
-                news = []
-                try:
-                    news = tr.trending_now_news_by_ids(
-                        trend.news_tokens,
-                        max_news=20,
-                    )
-                except Exception as e:
-                    logger.error(f"Error: {e}", exc_info=True)
-
-                hn = []
-                for article in news:
-                    hn.append(
-                        {
-                            "Title": article.title,
-                            "Link": article.url,
-                            "Votes": article.source,
-                        }
-                    )
-                else:
-                    html = Core.generate_html_content_with_links(
-                        hn, title=f"Trends News [{cur_idx}]: {trend.keyword} "
-                    )
-
-                    # generate temp html file and open it in browser
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=".html") as f:
-                        f.write(html.encode("utf-8"))
-                        webbrowser.open_new_tab(f.name)
-
-                cur_idx += 1
+                if trend.news_tokens:
+                    selected.append((index, trend))
+
+            sections = [
+                (f"[{cur_idx}] {trend.keyword}", news)
+                for (cur_idx, trend), news in zip(
+                    selected, fetch_news(selected, max_connections)
+                )
+            ]
+
+            html = Core.generate_html_report_with_links(
+                sections,
+                title=f"Trends News: {country_code}",
+                votes_label="Source",
+            )
+
+            # generate temp html file and open it in browser
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".html") as f:
+                f.write(html.encode("utf-8"))
+                webbrowser.open_new_tab(f.name)
 
         except Exception as e:
             logger.error(f"Exception: {e}", exc_info=True)
@@ -1,34 +1,217 @@
+import dataclasses
 import logging
-import os
-from pathlib import Path
+import threading
 
-from Qt import QtCore, QtGui
-from Qt.QtWidgets import QFileDialog, QWidget
+from Qt import QtCore
+from Qt.QtWidgets import QFileDialog, QHeaderView, QWidget
 
 import Core
+import FileIndex
+import FileList
 import Util
 from CommandBase import CommandUIBase
+from CommandsUI.QAargparseUI import QAargparseUI
 
 logger = Core.get_logger()
 
 
+class FileCollectorSignals(QtCore.QObject):
+    """Signals of a FileCollectorTask, delivered in the GUI thread."""
+
+    filesFound = QtCore.Signal(list, int)
+    filesMissing = QtCore.Signal(list)
+    collectFinished = QtCore.Signal(int)
+
+
+class FileCollectorTask(QtCore.QRunnable):
+    """Collect files in a thread pool thread, see FileIndex.iter_collected_files.
+
+    The directory tree is read through a FileIndex.DirectoryIndex. Every chunk of
+    matching files is sent with filesFound, together with the number of files
+    with the extension seen so far.
+
+    Args:
+        directory: Root directory
+        file_ext: Extensions, e.g. ".ma;.mb", or "*.*" for any
+        file_filters: Filter tokens, see FileIndex.FileFilter
+        refresh: Re-scan the directories that changed since the last collection,
+            otherwise only the index is queried
+    """
+
+    def __init__(self, directory, file_ext, file_filters, refresh=True):
+        super(FileCollectorTask, self).__init__()
+
+        self.signals = FileCollectorSignals()
+        self._directory = directory
+        self._file_ext = file_ext
+        self._file_filters = file_filters
+        self._refresh = refresh
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """Stop collecting, no more signals are sent."""
+        self._cancel_event.set()
+
+    def run(self):
+        total = 0
+        try:
+            directory_files = FileIndex.DirectoryIndex(self._directory).walk(
+                self._refresh, self._cancel_event, self._file_ext
+            )
+            for chunk, total in FileIndex.iter_collected_files(
+                self._directory,
+                self._file_ext,
+                self._file_filters,
+                cancel_event=self._cancel_event,
+                directory_files=directory_files,
+            ):
+                if self._cancel_event.is_set():
+                    return
+                self.signals.filesFound.emit(chunk, total)
+        except Exception as e:
+            logger.error(e, exc_info=True)
+
+        if not self._cancel_event.is_set():
+            self.signals.collectFinished.emit(total)
+
+
+class FileListLoadTask(QtCore.QRunnable):
+    """Load a file list in a thread pool thread, see FileList.iter_file_list.
+
+    The existence of every block of paths is checked in a thread pool before
+    the existing ones are sent with filesFound, together with the number of
+    paths read so far. The missing ones are sent once with filesMissing.
+
+    Args:
+        file_path: Path of the file list
+    """
+
+    def __init__(self, file_path):
+        super(FileListLoadTask, self).__init__()
+
+        self.signals = FileCollectorSignals()
+        self._file_path = file_path
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """Stop loading, no more signals are sent."""
+        self._cancel_event.set()
+
+    def run(self):
+        total = 0
+        missing = []
+        try:
+            for chunk in FileList.iter_file_list(self._file_path):
+                chunk_missing = set(
+                    FileList.find_missing_files(chunk, cancel_event=self._cancel_event)
+                )
+                if self._cancel_event.is_set():
+                    return
+
+                total += len(chunk)
+                if chunk_missing:
+                    missing.extend(path for path in chunk if path in chunk_missing)
+                    chunk = [path for path in chunk if path not in chunk_missing]
+                self.signals.filesFound.emit(chunk, total)
+        except Exception as e:
+            logger.error(e, exc_info=True)
+
+        if not self._cancel_event.is_set():
+            self.signals.filesMissing.emit(missing)
+            self.signals.collectFinished.emit(total)
+
+
+class FileListModel(QtCore.QAbstractListModel):
+    """List model of file paths, stored in a FileList.PackedPathList.
+
+    Rows are only decoded when the view shows them, so the model holds
+    millions of paths in little more memory than the paths themselves.
+    """
+
+    def __init__(self, parent=None):
+        super(FileListModel, self).__init__(parent)
+        self._paths = FileList.PackedPathList()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._paths)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.ToolTipRole):
+            return self._paths[index.row()]
+        return None
+
+    def clear(self):
+        self.beginResetModel()
+        self._paths.clear()
+        self.endResetModel()
+
+    def append_paths(self, paths):
+        """Append rows for the paths.
+
+        Args:
+            paths: Posix paths of the files
+        """
+        if not paths:
+            return
+
+        first = len(self._paths)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(paths) - 1)
+        self._paths.extend(paths)
+        self.endInsertRows()
+
+    def set_paths(self, paths):
+        """Replace all the rows.
+
+        Args:
+            paths: Posix paths of the files
+        """
+        self.beginResetModel()
+        self._paths.clear()
+        self._paths.extend(paths)
+        self.endResetModel()
+
+    def get_paths(self, start, stop):
+        """Paths of the rows from start to stop, excluded."""
+        return self._paths.get_range(start, stop)
+
+    @property
+    def paths(self):
+        """The FileList.PackedPathList of the rows."""
+        return self._paths
+
+
 class FileCollectorWidget(QWidget):
+    FILE_LIST_FILTER = "File List (*.filelist *.filelist.gz)"
+
     def __init__(self, parent=None):
         QWidget.__init__(self, parent)
         Util.load_ui(self)
 
         # memeber variable
-        self._collect_files_model = QtGui.QStandardItemModel(self.file_listView)
+        self._collect_files_model = FileListModel(self.file_tableView)
+        self._collect_task = None
+        self._collected_files = 0
 
         # slot/signal setup
         self.directory_lineEdit.returnPressed.connect(self.build_file_list)
-        self.filter_lineEdit.returnPressed.connect(self.build_file_list)
+        self.filter_lineEdit.returnPressed.connect(self.filter_file_list)
+        self.directory_lineEdit.textEdited.connect(self.cancel_collect)
+        self.filter_lineEdit.textEdited.connect(self.cancel_collect)
         self.collectFiles_pushButton.clicked.connect(self.build_file_list)
-        self.ext_comboBox.currentTextChanged.connect(self.build_file_list)
+        self.ext_comboBox.currentTextChanged.connect(self.filter_file_list)
         self.selectDirectory_pushButton.clicked.connect(self.select_directory)
 
-        self.file_listView.setModel(self._collect_files_model)
-        self.file_listView.selectionModel().selectionChanged.connect(
+        # unlike QListView, QTableView only lays out the visible rows
+        self.file_tableView.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.file_tableView.verticalHeader().setDefaultSectionSize(
+            self.file_tableView.fontMetrics().height() + 4
+        )
+        self.file_tableView.setModel(self._collect_files_model)
+        self.file_tableView.selectionModel().selectionChanged.connect(
             self.update_selectedFiles_label
         )
 
@@ -39,59 +222,139 @@ class FileCollectorWidget(QWidget):
             lambda x: self.save_load_file_list("save")
         )
 
-    def collect_target_files(self):
-        directory = self.directory_lineEdit.text()
-        if not directory:
-            return []
+    def update_files_label(self, total_files, matched_files, collecting=False):
+        self.collectFiles_label.setText(
+            f"[{matched_files} / {total_files}] files matched]"
+            + (" collecting..." if collecting else "")
+        )
+        self.update_selectedFiles_label()
 
-        file_filter_list = self.filter_lineEdit.text().split(",")
+    def update_selectedFiles_label(self, *args):
+        current_selected = sum(
+            stop - start for start, stop in self.get_selected_ranges()
+        )
+        self.selectedFiles_label.setText(f"[{current_selected}] selected")
 
-        file_ext = self.ext_comboBox.currentText()
+    def get_selected_ranges(self):
+        """Selected rows as sorted, non overlapping ranges.
 
-        all_targets = [
-            Path(dp).joinpath(f)
-            for dp, dn, filenames in os.walk(directory)
-            for f in filenames
-            if file_ext == "*.*" or os.path.splitext(f)[1].lower() == file_ext
-        ]
+        Unlike selectedRows() this doesn't create an index per selected row.
 
-        results = []
-        matched = 0
-        for target in all_targets:
-            bFound = False
-            for file_filter in file_filter_list:
-                if file_filter.lower() in target.as_posix().lower():
-                    bFound = True
-                    break
+        Returns:
+            List[Tuple[int, int]]: First row and row after the last one of every
+                range
+        """
+        ranges = sorted(
+            (selection_range.top(), selection_range.bottom() + 1)
+            for selection_range in self.file_tableView.selectionModel().selection()
+        )
+        merged = []
+        for start, stop in ranges:
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], stop))
+            else:
+                merged.append((start, stop))
+        return merged
+
+    def build_file_list(self, *args):
+        """Collect the files, re-scanning the directories that changed."""
+        self.collect_files(refresh=True)
 
-            if not bFound:
-                continue
+    def filter_file_list(self, *args):
+        """Collect the files from the directory index, without re-scanning."""
+        self.collect_files(refresh=False)
 
-            matched += 1
-            results.append(target)
+    def collect_files(self, refresh=True):
+        """Collect the files in a background thread, streaming them into the list.
 
-        self.update_files_label(len(all_targets), matched)
+        A collection that is still running is cancelled first.
 
-        return results
+        Args:
+            refresh: Re-scan the directories that changed, see FileCollectorTask
+        """
+        self.cancel_collect()
+        self._collect_files_model.clear()
+        self._collected_files = 0
 
-    def update_files_label(self, total_files, matched_files):
+        directory = self.directory_lineEdit.text()
+        if not directory:
+            self.update_files_label(0, 0)
+            return
+
+        self.start_collect_task(
+            FileCollectorTask(
+                directory,
+                self.ext_comboBox.currentText(),
+                self.filter_lineEdit.text().split(","),
+                refresh,
+            )
+        )
+
+    def start_collect_task(self, task):
+        """Run a collection task in the thread pool, streaming files into the list.
+
+        The task is cancelled if the widget is destroyed while it runs.
+
+        Args:
+            task: FileCollectorTask or FileListLoadTask
+        """
+        self._collect_task = task
+        task.signals.filesFound.connect(self.on_files_found)
+        task.signals.collectFinished.connect(self.on_collect_finished)
+        self.destroyed.connect(task.cancel)
+        self.update_files_label(0, 0, collecting=True)
+        QtCore.QThreadPool.globalInstance().start(task)
+
+    def release_collect_task(self):
+        """Forget the current task, so the widget no longer keeps it alive.
+
+        Returns:
+            The task, None if there was none
+        """
+        task = self._collect_task
+        self._collect_task = None
+        if task:
+            self.destroyed.disconnect(task.cancel)
+        return task
+
+    def cancel_collect(self, *args):
+        """Stop the running collection, keeping the files found so far."""
+        task = self.release_collect_task()
+        if not task:
+            return
+
+        task.cancel()
         self.collectFiles_label.setText(
-            f"[{matched_files} / {total_files}] files matched]"
+            self.collectFiles_label.text().replace(" collecting...", "")
         )
-        self.update_selectedFiles_label()
 
-    def update_selectedFiles_label(self, *args):
-        current_selected = len(self.file_listView.selectionModel().selectedRows())
-        self.selectedFiles_label.setText(f"[{current_selected}] selected")
+    def on_files_found(self, chunk, total):
+        """Append a chunk of collected files to the list.
 
-    def build_file_list(self, *args):
-        self._collect_files_model.clear()
+        Args:
+            chunk: Paths of the files
+            total: Number of files with the extension seen so far
+        """
+        if not self._collect_task or self.sender() is not self._collect_task.signals:
+            return
+
+        if chunk:
+            self._collect_files_model.append_paths(chunk)
+            self._collected_files += len(chunk)
 
-        all_targets = self.collect_target_files()
-        for target in all_targets:
-            item = QtGui.QStandardItem(target.as_posix())
+        self.update_files_label(total, self._collected_files, collecting=True)
 
-            self._collect_files_model.appendRow(item)
+    def on_collect_finished(self, total):
+        """Show the final count once the collection is done.
+
+        Args:
+            total: Number of files with the extension
+        """
+        if not self._collect_task or self.sender() is not self._collect_task.signals:
+            return
+
+        self.release_collect_task()
+        self.update_files_label(total, self._collected_files)
 
     def select_directory(self, *args):
         dialog = QFileDialog()
@@ -105,49 +368,76 @@ class FileCollectorWidget(QWidget):
 
         if mode == "save":
             fileName, _ = QFileDialog.getSaveFileName(
-                self, "Save File List", "", "*.filelist", options=options
+                self, "Save File List", "", self.FILE_LIST_FILTER, options=options
             )
             if not fileName:
                 return
 
-            all_targets = self.collect_target_files()
-            with open(fileName, "w") as f:
-                f.writelines("\n".join([target.as_posix() for target in all_targets]))
+            FileList.save_file_list(
+                fileName,
+                self._collect_files_model.paths,
+                compression="gzip" if fileName.endswith(".gz") else None,
+            )
 
         elif mode == "load":
             fileName, _ = QFileDialog.getOpenFileName(
-                self, "Open File List", "", "*.filelist", options=options
+                self, "Open File List", "", self.FILE_LIST_FILTER, options=options
             )
             if not fileName:
                 return
 
-            self._collect_files_model.clear()
-            all_targets = []
-            with open(fileName, "r") as f:
-                for line in f.readlines():
-                    target = Path(line.replace("\n", ""))
-                    if target.exists():
-                        all_targets.append(target)
+            self.load_file_list(fileName)
+
+    def load_file_list(self, file_path):
+        """Load a file list in a background thread, streaming it into the list.
 
-            for target in all_targets:
-                item = QtGui.QStandardItem(target.as_posix())
-                self._collect_files_model.appendRow(item)
+        Args:
+            file_path: Path of the file list
+        """
+        self.cancel_collect()
+        self._collect_files_model.clear()
+        self._collected_files = 0
+
+        task = FileListLoadTask(file_path)
+        task.signals.filesMissing.connect(self.on_files_missing)
+        self.start_collect_task(task)
+
+    def on_files_missing(self, missing):
+        """Report the files of a loaded file list that don't exist.
+
+        Args:
+            missing: Paths of the missing files
+        """
+        if not self._collect_task or self.sender() is not self._collect_task.signals:
+            return
+
+        if missing:
+            logger.warning(
+                FileList.summarize_missing_files(
+                    missing, self._collected_files + len(missing)
+                )
+            )
 
-            self.update_files_label(len(all_targets), 0)
+    def set_parameters_widget(self, widget):
+        """Show the widget of the command's own parameters above the files.
+
+        Args:
+            widget: Parameters widget
+        """
+        self.verticalLayout.insertWidget(0, widget)
 
     def get_parameters(self) -> dict:
         return {
             "target_files": self.get_target_files(),
+            "shard_count": self.shard_spinBox.value(),
+            "incremental": self.incremental_checkBox.isChecked(),
         }
 
     def get_target_files(self):
         target_files = []
         try:
-            indexes = self.file_listView.selectionModel().selectedRows()
-            model = self.file_listView.model()
-            role = QtCore.Qt.DisplayRole
-            for index in indexes:
-                target_files.append(model.data(index, role))
+            for start, stop in self.get_selected_ranges():
+                target_files.extend(self._collect_files_model.get_paths(start, stop))
 
         except Exception as e:
             logging.error(e, exc_info=True)
@@ -156,8 +446,18 @@ class FileCollectorWidget(QWidget):
 
 
 class CmdUI_FileCollector(CommandUIBase):
+    """File collector, together with the dataclass fields of the command."""
+
     def rebuild_ui(self):
         self.ui = FileCollectorWidget()
+        self._parameters_ui = None
+        if dataclasses.is_dataclass(self._cmd_cls):
+            self._parameters_ui = QAargparseUI(self._cmd_cls)
+            self.ui.set_parameters_widget(self._parameters_ui.ui)
 
     def get_parameters(self) -> dict:
-        return self.ui.get_parameters()
+        parameters = {}
+        if self._parameters_ui:
+            parameters.update(self._parameters_ui.get_parameters())
+        parameters.update(self.ui.get_parameters())
+        return parameters
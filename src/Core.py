@@ -1,10 +1,18 @@
+import ast
+import dataclasses
 import glob
+import hashlib
+import heapq
+import html
 import importlib
 import json
 import logging
+import os
 import sys
+from contextlib import suppress
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 class CommandConfig:
@@ -16,11 +24,31 @@ class CommandConfig:
     Attributes:
         DEFAULT_UI_CLASS (str): Default UI class name used when none is specified
         LOG_FORMAT (str): Format string for logging output
+        MANIFEST_VERSION (int): Version of the on-disk command manifest layout
+        COMMAND_METADATA (dict): Command class attributes and their defaults, as
+            declared on CommandBase
+        WORKER_ENV (str): Environment variable that starts CommandExecuter as a
+            long-lived worker
+        WORKER_JOB_DONE (str): Line prefix a worker prints after each job
     """
 
     DEFAULT_UI_CLASS = "QAargparseUI"
     LOG_FORMAT = "%(asctime)s %(levelname)-8s [%(name)s] %(message)s"
-
+    MANIFEST_VERSION = 2
+    WORKER_ENV = "COMMAND_RUNNER_WORKER"
+    WORKER_JOB_DONE = "@@CommandRunner:job_done@@"
+    COMMAND_METADATA = {
+        "label": "",
+        "tooltip": "",
+        "active": True,
+        "Category": "General",
+        "ui_class": "",
+        "cache_results": False,
+    }
+
+
+# content hash of each command module as it was last imported by a CommandEntry
+_LOADED_COMMAND_HASHES: Dict[str, str] = {}
 
 logging.basicConfig(
     level=logging.INFO,
@@ -36,6 +64,8 @@ def get_command_config() -> Dict:
 
     Loads the default configuration and ensures it contains required settings.
     If the default Python interpreter is not in the command list, it will be added.
+    The number of parallel jobs defaults to the number of CPU cores, and the
+    job cache, see JobCache, to 1 GB.
 
     Returns:
         Dict: Configuration dictionary containing command settings
@@ -48,6 +78,10 @@ def get_command_config() -> Dict:
         raise ValueError("Invalid configuration format")
 
     config.setdefault("command", [])
+    config.setdefault("max_parallel_jobs", os.cpu_count() or 1)
+    config.setdefault("warm_workers", 0)
+    config.setdefault("job_cache_size_mb", 1024)
+    config.setdefault("job_cache_hash_contents", False)
     default_py_interpreter = Path(sys.executable).as_posix()
 
     if default_py_interpreter not in config["command"]:
@@ -130,6 +164,134 @@ def get_log_dir() -> Path:
     return directory
 
 
+def save_arguments(arguments: Dict[str, Any]) -> Path:
+    """Save the arguments of a job to a new JSON file in the log directory.
+
+    Args:
+        arguments (Dict[str, Any]): Job arguments, including "cmd_py_path"
+
+    Returns:
+        Path: Path to the arguments JSON file
+    """
+    cur_time_str = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
+    arguments_json = get_log_dir() / f"Arguments_{cur_time_str}.json"
+
+    index = 0
+    while True:
+        try:
+            f = open(arguments_json, "x", encoding="utf-8")
+            break
+        except FileExistsError:
+            index += 1
+            arguments_json = get_log_dir() / f"Arguments_{cur_time_str}_{index}.json"
+
+    with f:
+        json.dump(arguments, f, indent=4, ensure_ascii=False)
+
+    return arguments_json
+
+
+def get_interpreter_arguments(command: str, script_file: Path) -> List[str]:
+    """Split an interpreter command into the arguments to run a script.
+
+    Everything from the first "--" on is passed as extra arguments before the
+    script, e.g. "blender.exe --background --python" runs
+    ["blender.exe", "--background", "--python", script_file].
+
+    Args:
+        command (str): Interpreter command from the configuration
+        script_file (Path): Script to run
+
+    Returns:
+        List[str]: Program and arguments
+    """
+    command_token = command.split("--")
+    arguments = [command_token[0].strip()]
+    if len(command_token) > 1:
+        arguments += ("--" + "--".join(command_token[1:])).split()
+    arguments.append(Path(script_file).as_posix())
+    return arguments
+
+
+def get_job_stats_path(arguments_path: Path) -> Path:
+    """Get the path to the resource usage records of a job.
+
+    Args:
+        arguments_path (Path): Path to the arguments JSON file of the job
+
+    Returns:
+        Path: JSON lines file next to the arguments file
+    """
+    return Path(arguments_path).with_suffix(".stats.jsonl")
+
+
+def append_job_stats(arguments_path: Path, record: Dict[str, Any]) -> None:
+    """Append a resource usage record to the records of a job.
+
+    Every process running the job appends one record, in a single write, so
+    the shards of a job can share the file.
+
+    Args:
+        arguments_path (Path): Path to the arguments JSON file of the job
+        record (Dict[str, Any]): Resource usage of one process
+    """
+    with open(get_job_stats_path(arguments_path), "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def read_job_stats(arguments_path: Path) -> List[Dict[str, Any]]:
+    """Read the resource usage records of a job.
+
+    Args:
+        arguments_path (Path): Path to the arguments JSON file of the job
+
+    Returns:
+        List[Dict[str, Any]]: One record per process, empty if none were written
+    """
+    stats_path = get_job_stats_path(arguments_path)
+    if not stats_path.exists():
+        return []
+
+    with open(stats_path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def clear_job_stats(arguments_path: Path) -> None:
+    """Remove the resource usage records of a job before it runs again.
+
+    Args:
+        arguments_path (Path): Path to the arguments JSON file of the job
+    """
+    get_job_stats_path(arguments_path).unlink(missing_ok=True)
+
+
+def summarize_job_stats(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge the resource usage records of the processes of a job.
+
+    Times spent in parallel by shards are summed for CPU time, while the wall
+    time is the one of the slowest process.
+
+    Args:
+        records (List[Dict[str, Any]]): Records from read_job_stats
+
+    Returns:
+        Dict[str, Any]: Merged record, empty if there are no records
+    """
+    if not records:
+        return {}
+
+    return {
+        "processes": len(records),
+        "wall_time": max(record["wall_time"] for record in records),
+        "import_time": max(record["import_time"] for record in records),
+        "run_time": max(record["run_time"] for record in records),
+        "user_time": sum(record["user_time"] for record in records),
+        "system_time": sum(record["system_time"] for record in records),
+        "peak_rss": max(record["peak_rss"] for record in records),
+        "success": all(record["success"] for record in records),
+    }
+
+
 def get_config_dir() -> Path:
     """Get the path to the configuration directory.
 
@@ -143,6 +305,56 @@ def get_config_dir() -> Path:
     return directory
 
 
+def get_cache_dir() -> Path:
+    """Get the path to the cache directory.
+
+    Creates the cache directory if it doesn't exist.
+
+    Returns:
+        Path: Path to the cache directory
+    """
+    directory = Path(__file__).resolve().parent / "cache"
+    directory.mkdir(exist_ok=True)
+    return directory
+
+
+def get_commands_dir(command_path: Optional[Path] = None) -> Path:
+    """Get the path to the commands directory.
+
+    Args:
+        command_path (Path, optional): Custom path to commands directory.
+            If None, uses the default Commands directory.
+
+    Returns:
+        Path: Path to the commands directory
+    """
+    if not command_path or not isinstance(command_path, Path):
+        command_path = Path(__file__).resolve().parent / "Commands"
+    return command_path
+
+
+def load_command(command_name: str, reload: bool = False) -> Any:
+    """Import a command module and instantiate its command class.
+
+    Args:
+        command_name (str): Name of the command module, e.g. "Cmd_Stock"
+        reload (bool, optional): Reload the module if it was imported before.
+            Defaults to False.
+
+    Returns:
+        Any: Instance of the command class
+    """
+    module_name = f"Commands.{command_name}"
+
+    if module_name in sys.modules and reload:
+        module = importlib.reload(sys.modules[module_name])
+    else:
+        module = importlib.import_module(module_name)
+
+    command_cls = getattr(module, command_name)
+    return command_cls()
+
+
 def get_commands_map(command_path: Optional[Path] = None) -> Dict[str, Any]:
     """Get a mapping of available commands.
 
@@ -156,24 +368,14 @@ def get_commands_map(command_path: Optional[Path] = None) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: Mapping of command labels to command classes
     """
-    if not command_path or not isinstance(command_path, Path):
-        command_path = Path(__file__).resolve().parent / "Commands"
+    command_path = get_commands_dir(command_path)
 
     commands = {}
     command_files = glob.glob(str(command_path / "Cmd_*.py"))
 
     for command_file in command_files:
         try:
-            command_name = Path(command_file).stem
-            module_name = f"Commands.{command_name}"
-
-            if module_name in sys.modules:
-                module = importlib.reload(sys.modules[module_name])
-            else:
-                module = importlib.import_module(module_name)
-
-            command_cls = getattr(module, command_name)
-            command_instance = command_cls()
+            command_instance = load_command(Path(command_file).stem, reload=True)
 
             if command_instance.active:
                 commands[command_instance.label] = command_instance
@@ -185,27 +387,710 @@ def get_commands_map(command_path: Optional[Path] = None) -> Dict[str, Any]:
     return commands
 
 
-def generate_html_content_with_links(links, title="", with_votes=True):
-    """Generate HTML content with links.
+class _ConstantResolver(ast.NodeTransformer):
+    """Replace the shared constants a command references by their values.
+
+    Commands may share the constants of CONSTANT_MODULES, such as
+    Records.RECORD_FORMATS, in their metadata, also unpacked into a list with
+    "*", and still be read statically. Only upper case names holding strings,
+    numbers or tuples are resolved. The manifest is keyed by the command files,
+    so a changed constant needs a new CommandConfig.MANIFEST_VERSION.
+    """
+
+    CONSTANT_MODULES = ("Core", "Records")
+    CONSTANT_TYPES = (str, int, float, tuple)
+
+    def get_constant(self, module_name: str, name: str) -> Any:
+        if module_name not in self.CONSTANT_MODULES or not name.isupper():
+            return None
+
+        if module_name == "Core":
+            module = sys.modules[__name__]
+        else:
+            module = importlib.import_module(module_name)
+        value = getattr(module, name, None)
+        return value if isinstance(value, self.CONSTANT_TYPES) else None
+
+    def visit_Attribute(self, node):
+        if isinstance(node.value, ast.Name):
+            value = self.get_constant(node.value.id, node.attr)
+            if value is not None:
+                return ast.copy_location(ast.Constant(value), node)
+        return node
+
+    def visit_List(self, node):
+        self.generic_visit(node)
+        elements = []
+        for element in node.elts:
+            if (
+                isinstance(element, ast.Starred)
+                and isinstance(element.value, ast.Constant)
+                and isinstance(element.value.value, tuple)
+            ):
+                elements += [ast.Constant(item) for item in element.value.value]
+            else:
+                elements.append(element)
+        node.elts = elements
+        return node
+
+    visit_Tuple = visit_List
+
+
+def _literal_eval(node: ast.AST) -> Any:
+    """Evaluate a literal, which may use shared constants, see _ConstantResolver.
 
     Args:
-        links (list): List of link dictionaries with 'Link', 'Title', and 'Votes' keys
-        title (str, optional): Title of the HTML page. Defaults to an empty string.
-        with_votes (bool, optional): Include vote counts in the HTML. Defaults to True.
+        node (ast.AST): Expression node
+
+    Raises:
+        ValueError: If the expression isn't a literal
+    """
+    return ast.literal_eval(_ConstantResolver().visit(node))
+
+
+def _parse_command_field(node: ast.AnnAssign) -> Optional[Dict[str, Any]]:
+    """Read a dataclass field declaration from the AST.
+
+    Args:
+        node (ast.AnnAssign): Annotated assignment inside the command class body
 
     Returns:
-        str: HTML content as a string
+        Optional[Dict[str, Any]]: Field schema with "name", "type" and, when
+            declared, "default" and "metadata". None if the field can't be read
+            without executing the module.
     """
-    get_logger().info(f"Title = {title}")
+    field_record = {
+        "name": node.target.id,
+        "type": ast.unparse(node.annotation),
+        "metadata": {},
+    }
 
-    html_content = """
-    <!DOCTYPE html>
-    <html>
-    <head>
+    if node.value is None:
+        return field_record
+
+    try:
+        value = node.value
+        is_field_call = (
+            isinstance(value, ast.Call)
+            and getattr(value.func, "id", getattr(value.func, "attr", "")) == "field"
+        )
+        if not is_field_call:
+            field_record["default"] = _literal_eval(value)
+            return field_record
+
+        for keyword in value.keywords:
+            if keyword.arg == "default":
+                field_record["default"] = _literal_eval(keyword.value)
+            elif keyword.arg == "metadata":
+                field_record["metadata"] = _literal_eval(keyword.value)
+            elif keyword.arg == "default_factory":
+                return None
+
+    except ValueError:
+        return None
+
+    return field_record
+
+
+def get_command_fields(command: Any) -> List[Dict[str, Any]]:
+    """Get the field schema of an imported command, as parse_command_file does.
+
+    Unlike the static schema, it includes inherited fields and the defaults of
+    default factories and computed defaults.
+
+    Args:
+        command (Any): Command instance
+
+    Returns:
+        List[Dict[str, Any]]: Field schemas with "name", "type", "default" and
+            "metadata", empty if the command isn't a dataclass
     """
-    html_content += f"<title>{title}</title>"
+    if not dataclasses.is_dataclass(command):
+        return []
 
-    html_content += """
+    return [
+        {
+            "name": field.name,
+            "type": getattr(field.type, "__name__", str(field.type)),
+            "default": getattr(command, field.name),
+            "metadata": dict(field.metadata),
+        }
+        for field in dataclasses.fields(command)
+    ]
+
+
+def parse_command_file(command_file: Path) -> Optional[Dict[str, Any]]:
+    """Read a command's metadata and parameter schema without importing it.
+
+    Only literal values are understood, in which shared constants may be used,
+    e.g. Records.RECORD_FORMATS. When the command class uses anything else
+    (computed attributes, custom base classes, default factories), the
+    record is flagged as not static and the command has to be imported to get
+    its metadata.
+
+    Args:
+        command_file (Path): Path to the Cmd_*.py file
+
+    Returns:
+        Optional[Dict[str, Any]]: Command record, or None if the file doesn't
+            define a class named after the file
+    """
+    command_file = Path(command_file)
+    command_name = command_file.stem
+    tree = ast.parse(command_file.read_bytes(), filename=str(command_file))
+
+    class_node = next(
+        (
+            node
+            for node in tree.body
+            if isinstance(node, ast.ClassDef) and node.name == command_name
+        ),
+        None,
+    )
+    if class_node is None:
+        return None
+
+    record = {
+        "name": command_name,
+        "path": command_file.as_posix(),
+        "static": all(
+            _get_node_name(base) in ("CommandBase", "ABC", "object")
+            for base in class_node.bases
+        ),
+        "fields": [],
+    }
+    record.update(CommandConfig.COMMAND_METADATA)
+
+    is_dataclass = any(
+        _get_node_name(decorator) == "dataclass"
+        for decorator in class_node.decorator_list
+    )
+
+    for node in class_node.body:
+        if isinstance(node, ast.Assign):
+            _parse_command_attribute(node, record)
+        elif (
+            is_dataclass
+            and isinstance(node, ast.AnnAssign)
+            and isinstance(node.target, ast.Name)
+        ):
+            field_record = _parse_command_field(node)
+            if field_record is None:
+                record["static"] = False
+            else:
+                record["fields"].append(field_record)
+
+    return record
+
+
+def _get_node_name(node: ast.AST) -> str:
+    """Get the name a base class or decorator is referenced by, e.g. "dataclass"."""
+    return getattr(node, "id", getattr(node, "attr", ""))
+
+
+def _parse_command_attribute(node: ast.Assign, record: Dict[str, Any]) -> None:
+    """Read the command metadata set by a class attribute into a command record.
+
+    Args:
+        node (ast.Assign): Assignment inside the command class body
+        record (Dict[str, Any]): Command record, flagged as not static if the
+            value can't be read without executing the module
+    """
+    for target in node.targets:
+        if isinstance(target, ast.Name) and target.id in CommandConfig.COMMAND_METADATA:
+            try:
+                record[target.id] = _literal_eval(node.value)
+            except ValueError:
+                record["static"] = False
+
+
+def get_file_hash(file_path: Path) -> str:
+    """Get the SHA-1 hash of a file's content.
+
+    Args:
+        file_path (Path): Path to the file
+
+    Returns:
+        str: Hex digest of the file content
+    """
+    return hashlib.sha1(Path(file_path).read_bytes()).hexdigest()
+
+
+def get_manifest_path(command_path: Optional[Path] = None) -> Path:
+    """Get the path of the cached manifest for a commands directory.
+
+    Args:
+        command_path (Path, optional): Custom path to commands directory.
+            If None, uses the default Commands directory.
+
+    Returns:
+        Path: Path to the manifest JSON file in the cache directory
+    """
+    command_path = get_commands_dir(command_path).resolve()
+    key = hashlib.sha1(command_path.as_posix().encode("utf-8")).hexdigest()[:12]
+    return get_cache_dir() / f"CommandManifest_{key}.json"
+
+
+def get_command_manifest(command_path: Optional[Path] = None) -> Dict[str, Dict]:
+    """Get the metadata of every command file without importing them.
+
+    Records are cached on disk, keyed by the file's mtime and size. A file is
+    only hashed when its mtime or size changed, and only re-parsed when its
+    content hash changed.
+
+    Args:
+        command_path (Path, optional): Custom path to commands directory.
+            If None, uses the default Commands directory.
+
+    Returns:
+        Dict[str, Dict]: Mapping of command file paths to command records
+    """
+    command_path = get_commands_dir(command_path)
+    manifest_path = get_manifest_path(command_path)
+    cached = _load_command_manifest(manifest_path)
+
+    manifest = {}
+    modified = False
+    for command_file in sorted(glob.glob(str(command_path / "Cmd_*.py"))):
+        command_file = Path(command_file).as_posix()
+        cached_record = cached.get(command_file)
+        try:
+            record = _get_command_record(command_file, cached_record)
+        except Exception as e:
+            get_logger().error(
+                f"Failed to read command {command_file}: {e}", exc_info=True
+            )
+            continue
+
+        modified = modified or record is not cached_record
+        if record is not None:
+            manifest[command_file] = record
+
+    if modified or manifest.keys() != cached.keys():
+        _save_command_manifest(manifest_path, manifest)
+
+    return manifest
+
+
+def _get_command_record(
+    command_file: str, cached_record: Optional[Dict]
+) -> Optional[Dict]:
+    """Get the record of a command file, re-using the cached one if unchanged.
+
+    Args:
+        command_file (str): Path of the command file
+        cached_record (Dict, optional): Record of the file in the cached manifest
+
+    Returns:
+        Optional[Dict]: The cached record itself if the file's mtime and size
+            didn't change, None if the file has no command class
+    """
+    stat = Path(command_file).stat()
+    if (
+        cached_record
+        and cached_record["mtime_ns"] == stat.st_mtime_ns
+        and cached_record["size"] == stat.st_size
+    ):
+        return cached_record
+
+    record = cached_record
+    file_hash = get_file_hash(command_file)
+    if not record or record["sha1"] != file_hash:
+        record = parse_command_file(Path(command_file))
+        if record is None:
+            get_logger().error(f"No command class found in {command_file}")
+            return None
+
+    return {
+        **record,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha1": file_hash,
+    }
+
+
+def _load_command_manifest(manifest_path: Path) -> Dict[str, Dict]:
+    """Read a cached manifest, empty if missing, broken or of an older version."""
+    if not manifest_path.exists():
+        return {}
+
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest_data = json.load(f)
+    except (OSError, ValueError) as e:
+        get_logger().warning(f"Ignore broken manifest {manifest_path}: {e}")
+        return {}
+
+    if manifest_data.get("version") != CommandConfig.MANIFEST_VERSION:
+        return {}
+    return manifest_data.get("commands", {})
+
+
+def _save_command_manifest(manifest_path: Path, manifest: Dict[str, Dict]) -> None:
+    """Write a manifest to the cache, logging a failure."""
+    try:
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": CommandConfig.MANIFEST_VERSION, "commands": manifest},
+                f,
+                indent=4,
+            )
+    except OSError as e:
+        get_logger().warning(f"Failed to write manifest {manifest_path}: {e}")
+
+
+def diff_command_manifests(
+    old_manifest: Dict[str, Dict], new_manifest: Dict[str, Dict]
+) -> Tuple[List[str], List[str], List[str]]:
+    """Compare two command manifests.
+
+    Args:
+        old_manifest (Dict[str, Dict]): Manifest from a previous scan
+        new_manifest (Dict[str, Dict]): Manifest from the current scan
+
+    Returns:
+        Tuple[List[str], List[str], List[str]]: Paths of the added, changed and
+            removed command files
+    """
+    added = [path for path in new_manifest if path not in old_manifest]
+    removed = [path for path in old_manifest if path not in new_manifest]
+    changed = [
+        path
+        for path, record in new_manifest.items()
+        if path in old_manifest and old_manifest[path]["sha1"] != record["sha1"]
+    ]
+    return added, changed, removed
+
+
+class CommandEntry:
+    """A command known from its manifest record, imported on first use.
+
+    The metadata attributes mirror the ones on CommandBase, so an entry can be
+    listed and filtered like a command instance without importing its module.
+
+    Args:
+        record (Dict[str, Any]): Command record from get_command_manifest()
+    """
+
+    def __init__(self, record: Dict[str, Any]):
+        self.record = record
+        self.name = record["name"]
+        self.path = Path(record["path"])
+        self.fields: List[Dict[str, Any]] = record.get("fields", [])
+        for key, default in CommandConfig.COMMAND_METADATA.items():
+            setattr(self, key, record.get(key, default))
+
+        self._instance = None
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the command module has been imported."""
+        return self._instance is not None
+
+    def load(self) -> Any:
+        """Import the command module and instantiate the command.
+
+        The module is only reloaded if it was imported from a different
+        version of the file.
+
+        Returns:
+            Any: The command instance, or None if the import failed
+        """
+        if self._instance is None:
+            file_hash = self.record.get("sha1")
+            try:
+                self._instance = load_command(
+                    self.name,
+                    reload=_LOADED_COMMAND_HASHES.get(self.name) != file_hash,
+                )
+                _LOADED_COMMAND_HASHES[self.name] = file_hash
+            except Exception as e:
+                get_logger().error(
+                    f"Failed to load command {self.path}: {e}", exc_info=True
+                )
+                return None
+
+            for key in CommandConfig.COMMAND_METADATA:
+                setattr(self, key, getattr(self._instance, key))
+
+        return self._instance
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r})"
+
+
+def create_command_entry(record: Dict[str, Any]) -> Optional[CommandEntry]:
+    """Create a CommandEntry from a manifest record.
+
+    Commands whose metadata can't be read statically are imported right away.
+
+    Args:
+        record (Dict[str, Any]): Command record from get_command_manifest()
+
+    Returns:
+        Optional[CommandEntry]: The entry, or None if the command failed to load
+    """
+    entry = CommandEntry(record)
+    if not record.get("static") and entry.load() is None:
+        return None
+
+    return entry
+
+
+def get_command_entries(command_path: Optional[Path] = None) -> Dict[str, Any]:
+    """Get a mapping of available commands without importing them.
+
+    Same as get_commands_map(), but built from the cached command manifest.
+
+    Args:
+        command_path (Path, optional): Custom path to commands directory.
+            If None, uses the default Commands directory.
+
+    Returns:
+        Dict[str, Any]: Mapping of command labels to CommandEntry objects
+    """
+    commands = {}
+    for record in get_command_manifest(command_path).values():
+        entry = create_command_entry(record)
+        if entry and entry.active:
+            commands[entry.label] = entry
+
+    return commands
+
+
+def sort_topologically(items: List[Any], get_dependencies) -> List[Any]:
+    """Order items so that every item comes after its dependencies.
+
+    Items keep their order where the dependencies allow it, and dependencies
+    that are not in items are ignored.
+
+    Args:
+        items (List[Any]): Items to sort
+        get_dependencies (Callable): Returns the dependencies of an item
+
+    Raises:
+        ValueError: If the dependencies have a cycle
+
+    Returns:
+        List[Any]: The sorted items
+    """
+    positions = {id(item): position for position, item in enumerate(items)}
+    dependents = [[] for _ in items]
+    blocking = [0] * len(items)
+    for position, item in enumerate(items):
+        for dependency in set(map(id, get_dependencies(item))):
+            if dependency in positions:
+                dependents[positions[dependency]].append(position)
+                blocking[position] += 1
+
+    ready = [position for position, count in enumerate(blocking) if count == 0]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        position = heapq.heappop(ready)
+        order.append(items[position])
+        for dependent in dependents[position]:
+            blocking[dependent] -= 1
+            if blocking[dependent] == 0:
+                heapq.heappush(ready, dependent)
+
+    if len(order) < len(items):
+        cycle = [item for position, item in enumerate(items) if blocking[position]]
+        raise ValueError(f"Dependency cycle between {cycle}")
+
+    return order
+
+
+class SharedWorkQueue:
+    """Work queue shared by the processes of a sharded job.
+
+    Every process iterates the same list of items, but each item is only
+    yielded to the process that claims it first. A claim is a file created
+    exclusively in the queue directory, so the queue works across processes
+    and interpreters without any locking API. Fast processes simply claim more
+    items than slow ones. Its length is the number of items of the whole
+    job, not the number this process gets.
+
+    Args:
+        queue_dir (Path): Directory holding the claim files
+        items (List[str]): Items to share, in processing order
+    """
+
+    def __init__(self, queue_dir: Path, items: List[str]):
+        self.queue_dir = Path(queue_dir)
+        self.items = items
+        self.claimed = 0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self):
+        self.queue_dir.mkdir(parents=True, exist_ok=True)
+        for index, item in enumerate(self.items):
+            claim_path = self.queue_dir / f"{index}.claim"
+            try:
+                fd = os.open(claim_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                continue
+
+            os.write(fd, str(os.getpid()).encode("ascii"))
+            os.close(fd)
+            self.claimed += 1
+            yield item
+
+    def reset(self) -> None:
+        """Remove all claims, so the items can be processed again."""
+        if not self.queue_dir.exists():
+            return
+
+        for claim_path in self.queue_dir.glob("*.claim"):
+            claim_path.unlink()
+
+    @staticmethod
+    def get_queue_dir(arguments_path: Path) -> Path:
+        """Get the queue directory of a job.
+
+        Args:
+            arguments_path (Path): Path to the arguments JSON file of the job
+
+        Returns:
+            Path: Queue directory next to the arguments file
+        """
+        return Path(arguments_path).with_suffix(".queue")
+
+
+def get_scene_output_path(target_file: str, output_dir: str, suffix: str) -> str:
+    """Get the path of a file written for a scene.
+
+    Scenes in different directories can have the same name, so when they are
+    written to one output directory, the name gets a short hash of the
+    directory of the scene.
+
+    Args:
+        target_file (str): Path of the scene
+        output_dir (str): Directory to write to, next to the scene if empty
+        suffix (str): Appended to the name of the scene, e.g. "_info.json"
+
+    Returns:
+        str: Path of the file
+    """
+    target_path = Path(target_file)
+    if not output_dir:
+        return (target_path.parent / f"{target_path.stem}{suffix}").as_posix()
+
+    scene_dir = Path(os.path.abspath(target_path.parent)).as_posix()
+    digest = hashlib.sha1(scene_dir.encode("utf-8")).hexdigest()[:8]
+    return (Path(output_dir) / f"{target_path.stem}_{digest}{suffix}").as_posix()
+
+
+def is_output_up_to_date(target_file: str, output_path: str) -> bool:
+    """Whether the output of a target file is at least as new as the file.
+
+    Args:
+        target_file (str): Path of the target file
+        output_path (str): Path of the output written for it
+
+    Returns:
+        bool: False if either of them doesn't exist
+    """
+    try:
+        return os.stat(output_path).st_mtime_ns >= os.stat(target_file).st_mtime_ns
+    except OSError:
+        return False
+
+
+class OutdatedFiles:
+    """Target files of an incremental job whose output is missing or older.
+
+    The up-to-date files are skipped while the command iterates the target
+    files, so they are never opened, and skipped counts them for the last
+    iteration. Wrapping a SharedWorkQueue checks the files as the shard claims
+    them, and its length is the number of outdated files of the whole job.
+
+    Args:
+        target_files: Target files, a list or a SharedWorkQueue
+        get_output_path: Callable returning the output path of a target file,
+            or None if its output isn't known and it always has to be processed
+    """
+
+    def __init__(self, target_files, get_output_path):
+        self.target_files = target_files
+        self.get_output_path = get_output_path
+        self.skipped = 0
+
+    def __len__(self) -> int:
+        target_files = self.target_files
+        if isinstance(target_files, SharedWorkQueue):
+            # counted without claiming them
+            target_files = target_files.items
+        return sum(not self.is_up_to_date(target_file) for target_file in target_files)
+
+    def __iter__(self):
+        self.skipped = 0
+        for target_file in self.target_files:
+            if self.is_up_to_date(target_file):
+                self.skipped += 1
+                continue
+
+            yield target_file
+
+    def is_up_to_date(self, target_file: str) -> bool:
+        """Whether the output of a target file is known and up to date.
+
+        Args:
+            target_file (str): Path of the target file
+        """
+        output_path = self.get_output_path(target_file)
+        return bool(output_path) and is_output_up_to_date(target_file, output_path)
+
+
+def write_target_outputs(target_files, get_output_path, write_output) -> None:
+    """Write the output of every target file through a temporary file.
+
+    Each output is written next to its path with a ".tmp" suffix, and renamed
+    once complete, so an output is either complete or missing. The outputs
+    finished before a failure or a crash are kept, and incremental jobs
+    continue from there. A target file that fails is logged, and the next one
+    is processed.
+
+    Args:
+        target_files: Target files, any iterable of paths
+        get_output_path: Callable returning the output path of a target file
+        write_output: Callable writing the output of a target file, called
+            with the target file and the temporary path to write to
+
+    Raises:
+        RuntimeError: If any target file failed, once all were processed
+    """
+    logger = get_logger()
+    processed = 0
+    failed = []
+    for target_file in target_files:
+        logger.info("process: {0}".format(target_file))
+        processed += 1
+
+        output_path = Path(get_output_path(target_file))
+        temp_path = output_path.with_name(output_path.name + ".tmp")
+        try:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            write_output(target_file, temp_path)
+            os.replace(temp_path, output_path)
+        except Exception as e:
+            logger.error("{0}: {1}".format(target_file, e), exc_info=True)
+            failed.append(target_file)
+            with suppress(OSError):
+                temp_path.unlink()
+
+    if failed:
+        raise RuntimeError(
+            "{0} of {1} files failed: {2}".format(
+                len(failed), processed, ", ".join(failed)
+            )
+        )
+
+
+# style sheet of the pages of links
+LINKS_PAGE_STYLE = """
         <style>
             body {
                 font-family: Arial, sans-serif;
@@ -217,6 +1102,11 @@ def generate_html_content_with_links(links, title="", with_votes=True):
                 font-size: 48px;
                 color: #333;
             }
+            h2 {
+                font-size: 28px;
+                color: #333;
+                margin-top: 40px;
+            }
             ul {
                 list-style-type: none;
                 padding: 0;
@@ -228,6 +1118,10 @@ def generate_html_content_with_links(links, title="", with_votes=True):
                 border-radius: 5px;
                 box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
             }
+            nav li {
+                margin: 4px 0;
+                padding: 8px 15px;
+            }
             a {
                 text-decoration: none;
                 color: #007bff;
@@ -241,6 +1135,31 @@ def generate_html_content_with_links(links, title="", with_votes=True):
                 font-size: 14px;
             }
         </style>
+"""
+
+
+def generate_html_content_with_links(links, title="", with_votes=True):
+    """Generate HTML content with links.
+
+    Args:
+        links (list): List of link dictionaries with 'Link', 'Title', and 'Votes' keys
+        title (str, optional): Title of the HTML page. Defaults to an empty string.
+        with_votes (bool, optional): Include vote counts in the HTML. Defaults to True.
+
+    Returns:
+        str: HTML content as a string
+    """
+    get_logger().info(f"Title = {title}")
+
+    html_content = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+    """
+    html_content += f"<title>{title}</title>"
+
+    html_content += LINKS_PAGE_STYLE
+    html_content += """
     </head>
     <body>
     """
@@ -269,6 +1188,55 @@ def generate_html_content_with_links(links, title="", with_votes=True):
     return html_content
 
 
+def generate_html_report_with_links(sections, title="", votes_label="Votes"):
+    """Generate one HTML page with an index and a section of links per topic.
+
+    The page is built in one pass and joined once, so reports with many
+    sections stay fast. Titles and headings are HTML escaped.
+
+    Args:
+        sections (list): (heading, links) pairs, links being dictionaries with
+            'Link', 'Title' and optionally 'Votes' keys
+        title (str, optional): Title of the HTML page. Defaults to an empty string.
+        votes_label (str, optional): Label of the 'Votes' values. Defaults to "Votes".
+
+    Returns:
+        str: HTML content as a string
+    """
+    parts = [
+        '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n',
+        f"<title>{html.escape(title)}</title>\n",
+        LINKS_PAGE_STYLE,
+        "</head>\n<body>\n",
+        f"<h1>{html.escape(title)}</h1>\n<nav><ul>\n",
+    ]
+
+    for index, (heading, links) in enumerate(sections):
+        parts.append(
+            f'<li><a href="#section-{index}">{html.escape(heading)}</a>'
+            f' <span class="votes">({len(links)})</span></li>\n'
+        )
+    parts.append("</ul></nav>\n")
+
+    for index, (heading, links) in enumerate(sections):
+        parts.append(f'<h2 id="section-{index}">{html.escape(heading)}</h2>\n<ul>\n')
+        for link in links:
+            parts.append(
+                f'<li><a href="{html.escape(link["Link"])}">'
+                f'{html.escape(link["Title"])}</a>'
+            )
+            if link.get("Votes") is not None:
+                parts.append(
+                    f' <span class="votes">- {votes_label}: '
+                    f'{html.escape(str(link["Votes"]))}</span>'
+                )
+            parts.append("</li>\n")
+        parts.append("</ul>\n")
+
+    parts.append("</body>\n</html>\n")
+    return "".join(parts)
+
+
 def generate_html_content_with_text(text, title=""):
     """Generate HTML content with text.
 
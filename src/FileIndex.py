@@ -0,0 +1,550 @@
+import fnmatch
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import timeit
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import Core
+
+
+def scan_directory(dir_path: str) -> Tuple[List[str], List[str]]:
+    """List the files and subdirectories of a directory.
+
+    Symbolic links to directories are skipped, as os.walk does.
+
+    Args:
+        dir_path (str): Posix path of the directory
+
+    Returns:
+        Tuple[List[str], List[str]]: Names of the files and subdirectories
+
+    Raises:
+        OSError: If the directory can't be read
+    """
+    file_names = []
+    dir_names = []
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+
+            if not is_dir:
+                file_names.append(entry.name)
+            elif not entry.is_symlink():
+                dir_names.append(entry.name)
+
+    return file_names, dir_names
+
+
+def split_file_extensions(file_ext: str) -> Tuple[str, ...]:
+    """Parse the extension setting of the file collector.
+
+    Args:
+        file_ext (str): Extensions separated by ";" or ",", e.g. ".ma;.mb", or
+            "*.*" for any
+
+    Returns:
+        Tuple[str, ...]: Lower case extensions with their dot, empty for any
+    """
+    extensions = []
+    for extension in re.split("[;,]", file_ext.lower()):
+        extension = extension.strip().lstrip("*")
+        if extension in ("", ".", ".*"):
+            return ()
+        extensions.append(extension if extension.startswith(".") else "." + extension)
+
+    return tuple(extensions)
+
+
+class FileFilter:
+    """Filter of the file collector, compiled once per query.
+
+    The filter is a list of tokens, all matched ignoring case:
+
+    - ``chars``: substring of the path
+    - ``*_v0?.ma``: glob matching the file name, or the end of the path from
+      a "/" if it contains "/", e.g. ``chars/*.ma``
+    - ``re:_v\\d+\\.ma$``: regular expression searched in the path
+    - ``!token``: excludes the files matching the token
+
+    A file is kept if it has one of the extensions, matches any token (or
+    there are only exclusions) and matches no exclusion. Substrings found in
+    the directory of the files decide for the whole directory, the other
+    tokens are combined into one regular expression per kind.
+
+    Args:
+        file_filters (List[str], optional): Tokens, empty ones are ignored
+        file_ext (str, optional): Extensions, see split_file_extensions
+    """
+
+    REGEX_PREFIX = "re:"
+    NEGATION_PREFIX = "!"
+    GLOB_CHARACTERS = "*?["
+
+    class Patterns:
+        """Compiled tokens of one kind, included or excluded."""
+
+        def __init__(self, tokens: List[str]):
+            self.substrings = []
+            name_patterns = []
+            path_patterns = []
+            regexes = []
+            for token in tokens:
+                if token.startswith(FileFilter.REGEX_PREFIX):
+                    regexes.append(token[len(FileFilter.REGEX_PREFIX) :])
+                    continue
+
+                if any(char in token for char in FileFilter.GLOB_CHARACTERS):
+                    pattern = r"(?:\A|/)" + fnmatch.translate(token.lower())
+                else:
+                    # substrings not in the directory can only be in the name,
+                    # unless they span the last "/"
+                    self.substrings.append(token.lower())
+                    pattern = re.escape(token.lower())
+
+                if "/" in token:
+                    path_patterns.append(pattern)
+                else:
+                    name_patterns.append(pattern)
+
+            self.count = len(tokens)
+            self.name_pattern = self.compile(name_patterns)
+            self.path_pattern = self.compile(path_patterns)
+            self.regex = self.compile(regexes, re.IGNORECASE)
+
+        @staticmethod
+        def compile(patterns: List[str], flags: int = 0) -> Optional[re.Pattern]:
+            if not patterns:
+                return None
+            return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), flags)
+
+        def in_directory(self, dir_path: str) -> bool:
+            """Whether a substring is in the directory, so in all its files."""
+            dir_path = dir_path.lower() + "/"
+            return any(substring in dir_path for substring in self.substrings)
+
+        def select(
+            self, dir_path: str, file_names: List[str], matching: bool
+        ) -> List[str]:
+            """Select the file names that match any token, or that match none.
+
+            Only valid if no substring is in the directory, see in_directory.
+
+            Args:
+                dir_path (str): Posix path of the directory
+                file_names (List[str]): Names of the files in the directory
+                matching (bool): Select the matching names, or the others
+
+            Returns:
+                List[str]: The selected names
+            """
+            name_pattern = self.name_pattern
+            path_pattern = self.path_pattern
+            regex = self.regex
+            prefix = dir_path + "/"
+            lower_prefix = prefix.lower()
+            return [
+                name
+                for name in file_names
+                if bool(
+                    (name_pattern is not None and name_pattern.search(name.lower()))
+                    or (
+                        path_pattern is not None
+                        and path_pattern.search(lower_prefix + name.lower())
+                    )
+                    or (regex is not None and regex.search(prefix + name))
+                )
+                is matching
+            ]
+
+    def __init__(self, file_filters: Optional[List[str]] = None, file_ext: str = "*.*"):
+        included = []
+        excluded = []
+        for token in file_filters or []:
+            token = token.strip()
+            if token.startswith(self.NEGATION_PREFIX):
+                token = token[len(self.NEGATION_PREFIX) :].strip()
+                if token:
+                    excluded.append(token)
+            elif token:
+                included.append(token)
+
+        self.extensions = split_file_extensions(file_ext)
+        self.included = self.Patterns(included)
+        self.excluded = self.Patterns(excluded)
+
+    def filter_extensions(self, file_names: List[str]) -> List[str]:
+        """Keep the file names with one of the extensions.
+
+        Args:
+            file_names (List[str]): Names of the files
+
+        Returns:
+            List[str]: The names with the extensions
+        """
+        extensions = self.extensions
+        if not extensions:
+            return file_names
+        return [name for name in file_names if name.lower().endswith(extensions)]
+
+    def filter_paths(self, dir_path: str, file_names: List[str]) -> List[str]:
+        """Filter the files of a directory by the tokens.
+
+        Args:
+            dir_path (str): Posix path of the directory
+            file_names (List[str]): Names of the files, with the extensions
+
+        Returns:
+            List[str]: Posix paths of the files that are kept
+        """
+        if self.excluded.count:
+            if self.excluded.in_directory(dir_path):
+                return []
+            file_names = self.excluded.select(dir_path, file_names, False)
+
+        if self.included.count and not self.included.in_directory(dir_path):
+            file_names = self.included.select(dir_path, file_names, True)
+
+        prefix = dir_path + "/"
+        return [prefix + name for name in file_names]
+
+
+def iter_directory_files(
+    directory: str, cancel_event: Optional[threading.Event] = None
+) -> Iterator[Tuple[str, List[str]]]:
+    """Walk a directory tree with os.scandir, in the same order as os.walk.
+
+    Directories that can't be read are skipped.
+
+    Args:
+        directory (str): Root directory
+        cancel_event (threading.Event, optional): Stops the walk when set
+
+    Yields:
+        Tuple[str, List[str]]: Posix path of every directory and the names of
+            its files
+    """
+    stack = [Path(directory).as_posix()]
+    while stack:
+        if cancel_event and cancel_event.is_set():
+            return
+
+        dir_path = stack.pop()
+        try:
+            file_names, dir_names = scan_directory(dir_path)
+        except OSError:
+            continue
+
+        yield dir_path, file_names
+        stack.extend(dir_path + "/" + name for name in reversed(dir_names))
+
+
+class DirectoryIndex:
+    """On-disk index of the files of a directory tree.
+
+    The file names of every directory are stored in an SQLite database in the
+    cache directory, with the modification time of the directory. Adding,
+    removing or renaming an entry changes the modification time of its
+    directory, so walking the index only stats the directories and re-scans
+    the ones that changed. A subdirectory found by a re-scan is stored as not
+    scanned yet, so an interrupted walk picks it up the next time. So is a
+    directory modified less than RACY_SECONDS before it was scanned, as it may
+    change again without its coarse modification time changing.
+
+    Args:
+        root (str): Root directory of the tree
+        index_path (Path, optional): Database file, see get_index_path
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS dirs (
+            id INTEGER PRIMARY KEY,
+            path TEXT UNIQUE NOT NULL,
+            parent_id INTEGER,
+            mtime_ns INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS dirs_parent_id ON dirs (parent_id);
+        CREATE TABLE IF NOT EXISTS files (
+            dir_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            ext TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS files_dir_id_ext ON files (dir_id, ext);
+    """
+    SCHEMA_VERSION = 1
+    NOT_SCANNED = -1
+    RACY_SECONDS = 2
+
+    def __init__(self, root: str, index_path: Optional[Path] = None):
+        self.root = Path(root).as_posix()
+        self.index_path = Path(index_path or self.get_index_path(self.root))
+
+    @staticmethod
+    def get_index_path(root: str) -> Path:
+        """Get the database file of a tree in the cache directory.
+
+        Args:
+            root (str): Root directory of the tree
+
+        Returns:
+            Path: Path to the database file
+        """
+        key = hashlib.sha1(Path(root).as_posix().encode("utf-8")).hexdigest()
+        return Core.get_cache_dir() / f"FileIndex_{key[:16]}.sqlite"
+
+    def connect(self) -> sqlite3.Connection:
+        """Open the database, recreating it if its schema is outdated.
+
+        Returns:
+            sqlite3.Connection: Connection to the database
+        """
+        connection = sqlite3.connect(self.index_path)
+        if connection.execute("PRAGMA user_version").fetchone()[0] != (
+            self.SCHEMA_VERSION
+        ):
+            connection.executescript(
+                "DROP TABLE IF EXISTS dirs; DROP TABLE IF EXISTS files;"
+            )
+            connection.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        connection.executescript(self.SCHEMA)
+        return connection
+
+    def walk(
+        self,
+        refresh: bool = True,
+        cancel_event: Optional[threading.Event] = None,
+        file_ext: str = "*.*",
+    ) -> Iterator[Tuple[str, List[str]]]:
+        """Walk the indexed tree, like iter_directory_files.
+
+        Args:
+            refresh (bool, optional): Re-scan the directories that changed. If
+                False, only directories that were never scanned are read from
+                disk.
+            cancel_event (threading.Event, optional): Stops the walk when set
+            file_ext (str, optional): Only yield the files with these
+                extensions, see split_file_extensions
+
+        Yields:
+            Tuple[str, List[str]]: Posix path of every directory and the names
+                of its files
+        """
+        extensions = split_file_extensions(file_ext)
+        connection = self.connect()
+        try:
+            row = connection.execute(
+                "SELECT id, path, mtime_ns FROM dirs WHERE path = ?", (self.root,)
+            ).fetchone()
+            if row is None:
+                row = self._add_dir(connection, self.root, None)
+
+            stack = [row]
+            while stack:
+                if cancel_event and cancel_event.is_set():
+                    return
+
+                dir_id, dir_path, mtime_ns = stack.pop()
+                try:
+                    scanned = None
+                    if refresh or mtime_ns == self.NOT_SCANNED:
+                        scanned = self._refresh_dir(
+                            connection, dir_id, dir_path, mtime_ns, extensions
+                        )
+                except OSError:
+                    continue
+
+                file_names, sub_dirs = scanned or self._read_dir(
+                    connection, dir_id, extensions
+                )
+                yield dir_path, file_names
+                stack.extend(reversed(sub_dirs))
+        finally:
+            connection.commit()
+            connection.close()
+
+    def _refresh_dir(
+        self,
+        connection: sqlite3.Connection,
+        dir_id: int,
+        dir_path: str,
+        mtime_ns: int,
+        extensions: Tuple[str, ...],
+    ) -> Optional[Tuple[List[str], List[Tuple[int, str, int]]]]:
+        # None if the directory didn't change, raises OSError if it can't be read
+        current_mtime_ns = os.stat(dir_path).st_mtime_ns
+        if current_mtime_ns == mtime_ns:
+            return None
+
+        file_names, sub_dirs = self._rescan_dir(
+            connection, dir_id, dir_path, current_mtime_ns
+        )
+        if extensions:
+            file_names = [
+                name
+                for name in file_names
+                if os.path.splitext(name)[1].lower() in extensions
+            ]
+        return file_names, sub_dirs
+
+    def _read_dir(
+        self, connection: sqlite3.Connection, dir_id: int, extensions: Tuple[str, ...]
+    ) -> Tuple[List[str], List[Tuple[int, str, int]]]:
+        if extensions:
+            file_rows = connection.execute(
+                "SELECT name FROM files WHERE dir_id = ? AND ext IN "
+                f"({', '.join('?' * len(extensions))}) ORDER BY rowid",
+                (dir_id, *extensions),
+            )
+        else:
+            file_rows = connection.execute(
+                "SELECT name FROM files WHERE dir_id = ? ORDER BY rowid",
+                (dir_id,),
+            )
+        file_names = [name for (name,) in file_rows]
+        sub_dirs = connection.execute(
+            "SELECT id, path, mtime_ns FROM dirs WHERE parent_id = ? ORDER BY id",
+            (dir_id,),
+        ).fetchall()
+        return file_names, sub_dirs
+
+    def _add_dir(
+        self, connection: sqlite3.Connection, dir_path: str, parent_id: Optional[int]
+    ) -> Tuple[int, str, int]:
+        cursor = connection.execute(
+            "INSERT INTO dirs (path, parent_id, mtime_ns) VALUES (?, ?, ?)",
+            (dir_path, parent_id, self.NOT_SCANNED),
+        )
+        return cursor.lastrowid, dir_path, self.NOT_SCANNED
+
+    def _remove_dir(self, connection: sqlite3.Connection, dir_id: int) -> None:
+        dir_ids = [dir_id]
+        index = 0
+        while index < len(dir_ids):
+            dir_ids += [
+                child_id
+                for (child_id,) in connection.execute(
+                    "SELECT id FROM dirs WHERE parent_id = ?", (dir_ids[index],)
+                )
+            ]
+            index += 1
+
+        connection.executemany(
+            "DELETE FROM files WHERE dir_id = ?", ((i,) for i in dir_ids)
+        )
+        connection.executemany("DELETE FROM dirs WHERE id = ?", ((i,) for i in dir_ids))
+
+    def _rescan_dir(
+        self,
+        connection: sqlite3.Connection,
+        dir_id: int,
+        dir_path: str,
+        mtime_ns: int,
+    ) -> Tuple[List[str], List[Tuple[int, str, int]]]:
+        file_names, dir_names = scan_directory(dir_path)
+
+        connection.execute("DELETE FROM files WHERE dir_id = ?", (dir_id,))
+        connection.executemany(
+            "INSERT INTO files (dir_id, name, ext) VALUES (?, ?, ?)",
+            ((dir_id, name, os.path.splitext(name)[1].lower()) for name in file_names),
+        )
+
+        known_dirs = {
+            row[1]: row
+            for row in connection.execute(
+                "SELECT id, path, mtime_ns FROM dirs WHERE parent_id = ?", (dir_id,)
+            )
+        }
+        sub_dirs = []
+        for name in dir_names:
+            sub_dir_path = dir_path + "/" + name
+            row = known_dirs.pop(sub_dir_path, None)
+            sub_dirs.append(row or self._add_dir(connection, sub_dir_path, dir_id))
+
+        for row in known_dirs.values():
+            self._remove_dir(connection, row[0])
+
+        if time.time_ns() - mtime_ns < self.RACY_SECONDS * 10**9:
+            mtime_ns = self.NOT_SCANNED
+        connection.execute(
+            "UPDATE dirs SET mtime_ns = ? WHERE id = ?", (mtime_ns, dir_id)
+        )
+        return file_names, sub_dirs
+
+
+def iter_collected_files(
+    directory: str,
+    file_ext: str = "*.*",
+    file_filters: Optional[List[str]] = None,
+    chunk_size: int = 1000,
+    chunk_interval: float = 0.1,
+    cancel_event: Optional[threading.Event] = None,
+    directory_files: Optional[Iterator[Tuple[str, List[str]]]] = None,
+) -> Iterator[Tuple[List[str], int]]:
+    """Collect the files of a directory tree in chunks.
+
+    Files with the extensions are counted, and kept if they pass the filter,
+    see FileFilter. A chunk is yielded once it holds chunk_size files or
+    chunk_interval seconds passed, so callers can show progress while the walk
+    goes on.
+
+    Args:
+        directory (str): Root directory
+        file_ext (str, optional): Extensions, e.g. ".ma" or ".ma;.mb", or "*.*"
+            for any
+        file_filters (List[str], optional): Filter tokens, see FileFilter.
+            Empty filters, or None, keep every file.
+        chunk_size (int, optional): Maximum number of files per chunk
+        chunk_interval (float, optional): Maximum seconds between chunks
+        cancel_event (threading.Event, optional): Stops the walk when set
+        directory_files (Iterator, optional): Directories and their file names
+            to collect from, e.g. DirectoryIndex.walk(). Defaults to walking
+            the directory with iter_directory_files.
+
+    Yields:
+        Tuple[List[str], int]: The matching paths found since the previous
+            chunk, as posix paths, and the number of files with the extension
+            seen so far
+    """
+    if directory_files is None:
+        directory_files = iter_directory_files(directory, cancel_event)
+
+    file_filter = FileFilter(file_filters, file_ext)
+
+    chunk = []
+    total = 0
+    chunk_time = timeit.default_timer()
+
+    for dir_path, file_names in directory_files:
+        file_names = file_filter.filter_extensions(file_names)
+        total += len(file_names)
+
+        # large directories are streamed too
+        for start in range(0, len(file_names), chunk_size):
+            chunk.extend(
+                file_filter.filter_paths(
+                    dir_path, file_names[start : start + chunk_size]
+                )
+            )
+            if len(chunk) >= chunk_size or (
+                timeit.default_timer() - chunk_time >= chunk_interval
+            ):
+                yield chunk[:chunk_size], total
+                chunk = chunk[chunk_size:]
+                chunk_time = timeit.default_timer()
+                if cancel_event and cancel_event.is_set():
+                    return
+
+        if timeit.default_timer() - chunk_time >= chunk_interval:
+            yield chunk, total
+            chunk = []
+            chunk_time = timeit.default_timer()
+
+    if not (cancel_event and cancel_event.is_set()):
+        yield chunk, total
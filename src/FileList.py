@@ -0,0 +1,321 @@
+import gzip
+import itertools
+import json
+import os
+import sys
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+
+class PackedPathList:
+    """Compact list of paths for file lists of millions of entries.
+
+    The paths are stored UTF-8 encoded in one buffer, each followed by a
+    newline, with the offset of every path in an array, i.e. a few bytes per
+    path on top of the path itself instead of a Python object each. A range of
+    paths is decoded with one slice and split.
+    """
+
+    def __init__(self, paths: Optional[List[str]] = None):
+        self.clear()
+        if paths:
+            self.extend(paths)
+
+    @classmethod
+    def from_buffer(cls, buffer: bytes, offsets: array) -> "PackedPathList":
+        """Wrap packed paths without parsing them, see buffer and offsets.
+
+        Args:
+            buffer (bytes): UTF-8 encoded paths, each followed by a newline
+            offsets (array): Offset of every path and the end of the buffer
+
+        Returns:
+            PackedPathList: The paths
+        """
+        if len(offsets) < 1 or offsets[0] != 0 or offsets[-1] != len(buffer):
+            raise ValueError("Offsets don't match the buffer")
+
+        paths = cls()
+        paths._buffer = bytearray(buffer)
+        paths._offsets = offsets
+        return paths
+
+    @property
+    def buffer(self) -> bytearray:
+        """UTF-8 encoded paths, each followed by a newline."""
+        return self._buffer
+
+    @property
+    def offsets(self) -> array:
+        """Offset of every path in the buffer, and the end of the buffer."""
+        return self._offsets
+
+    def clear(self) -> None:
+        """Remove all the paths."""
+        self._buffer = bytearray()
+        self._offsets = array("q", [0])
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, row: int) -> str:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return self._buffer[self._offsets[row] : self._offsets[row + 1] - 1].decode(
+            "utf-8"
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.get_range(0, len(self))
+
+    def extend(self, paths: List[str]) -> None:
+        """Append paths, which must not contain newlines.
+
+        Args:
+            paths (List[str]): Paths to append
+        """
+        encoded = [(path + "\n").encode("utf-8") for path in paths]
+        end = self._offsets[-1]
+        self._offsets.extend(
+            end + offset for offset in itertools.accumulate(map(len, encoded))
+        )
+        self._buffer += b"".join(encoded)
+
+    def get_range(self, start: int, stop: int) -> List[str]:
+        """Paths of the rows from start to stop, excluded.
+
+        Args:
+            start (int): First row
+            stop (int): Row after the last one
+
+        Returns:
+            List[str]: The paths
+        """
+        start = max(start, 0)
+        stop = min(stop, len(self))
+        if start >= stop:
+            return []
+        data = self._buffer[self._offsets[start] : self._offsets[stop] - 1]
+        return data.decode("utf-8").split("\n")
+
+    def to_bytes(self) -> bytes:
+        """All the paths, UTF-8 encoded and separated by newlines."""
+        return bytes(self._buffer[:-1])
+
+
+class FileListFormat:
+    """Layout of .filelist files.
+
+    A file list starts with a header line, "#filelist " and a JSON object with
+    the number of paths, the size of the body and its compression. The body
+    holds the UTF-8 encoded paths, each followed by a newline, then the
+    offset of every path as int64, so load_file_list reads the paths without
+    parsing them. With compression, the body and the offsets are one gzip
+    stream. Files without the header are read as one path per line.
+    """
+
+    VERSION = 1
+    HEADER_PREFIX = b"#filelist "
+    COMPRESSIONS = (None, "gzip")
+    BLOCK_SIZE = 1024 * 1024
+
+
+def save_file_list(
+    file_path: Path, paths: PackedPathList, compression: Optional[str] = None
+) -> None:
+    """Save paths to a file list, see FileListFormat.
+
+    Args:
+        file_path (Path): Path of the file list
+        paths (PackedPathList): Paths to save
+        compression (str, optional): None or "gzip"
+    """
+    if compression not in FileListFormat.COMPRESSIONS:
+        raise ValueError(f"Unknown file list compression: {compression}")
+
+    header = {
+        "version": FileListFormat.VERSION,
+        "count": len(paths),
+        "body_size": len(paths.buffer),
+        "byteorder": sys.byteorder,
+        "compression": compression,
+    }
+    with open(file_path, "wb") as f:
+        f.write(FileListFormat.HEADER_PREFIX + json.dumps(header).encode() + b"\n")
+        if compression == "gzip":
+            with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=6, mtime=0) as gz:
+                gz.write(paths.buffer)
+                gz.write(paths.offsets.tobytes())
+        else:
+            f.write(paths.buffer)
+            f.write(paths.offsets.tobytes())
+
+
+@contextmanager
+def _open_file_list(file_path: Path):
+    """Open a file list at its body.
+
+    Yields:
+        Tuple[dict, BinaryIO]: The header, None for files without one, and the
+            stream of the body
+    """
+    with open(file_path, "rb") as f:
+        first_line = f.readline()
+        if not first_line.startswith(FileListFormat.HEADER_PREFIX):
+            f.seek(0)
+            yield None, f
+            return
+
+        header = json.loads(first_line[len(FileListFormat.HEADER_PREFIX) :])
+        if header.get("version") != FileListFormat.VERSION:
+            raise ValueError(f"Unsupported file list version: {header.get('version')}")
+
+        if header["compression"] == "gzip":
+            with gzip.GzipFile(fileobj=f, mode="rb") as gz:
+                try:
+                    yield header, gz
+                except EOFError:
+                    raise ValueError(f"Truncated file list: {file_path}")
+        elif header["compression"] is None:
+            yield header, f
+        else:
+            raise ValueError(f"Unknown file list compression: {header['compression']}")
+
+
+def iter_file_list(
+    file_path: Path, block_size: int = FileListFormat.BLOCK_SIZE
+) -> Iterator[List[str]]:
+    """Read a file list a block at a time.
+
+    Args:
+        file_path (Path): Path of the file list
+        block_size (int, optional): Bytes read per chunk
+
+    Yields:
+        List[str]: The paths of the next block. Lines of files without header
+            are stripped, and empty lines skipped.
+    """
+    with _open_file_list(file_path) as (header, stream):
+        remaining = header["body_size"] if header else -1
+        pending = b""
+        while remaining:
+            block = stream.read(
+                block_size if remaining < 0 else min(block_size, remaining)
+            )
+            if not block:
+                if remaining > 0:
+                    raise ValueError(f"Truncated file list: {file_path}")
+                break
+
+            if remaining > 0:
+                remaining -= len(block)
+            lines = (pending + block).split(b"\n")
+            pending = lines.pop()
+            if header:
+                yield [line.decode("utf-8") for line in lines]
+            else:
+                yield [line.decode("utf-8").strip() for line in lines if line.strip()]
+
+        if pending.strip():
+            yield [pending.decode("utf-8").strip()]
+
+
+def load_file_list(file_path: Path) -> PackedPathList:
+    """Load a whole file list, using the offsets it stores.
+
+    Args:
+        file_path (Path): Path of the file list
+
+    Returns:
+        PackedPathList: The paths
+    """
+    with _open_file_list(file_path) as (header, stream):
+        if header is None:
+            return PackedPathList(
+                [path for chunk in iter_file_list(file_path) for path in chunk]
+            )
+
+        buffer = stream.read(header["body_size"])
+        offsets = array("q")
+        offsets_size = (header["count"] + 1) * offsets.itemsize
+        offsets_data = stream.read(offsets_size)
+        if len(buffer) != header["body_size"] or len(offsets_data) != offsets_size:
+            raise ValueError(f"Truncated file list: {file_path}")
+
+        offsets.frombytes(offsets_data)
+        if header["byteorder"] != sys.byteorder:
+            offsets.byteswap()
+        return PackedPathList.from_buffer(buffer, offsets)
+
+
+def find_missing_files(
+    paths: List[str],
+    max_workers: int = 16,
+    cancel_event: Optional[threading.Event] = None,
+) -> List[str]:
+    """Check which files don't exist, in a thread pool.
+
+    Files are grouped by directory, and a directory with many of them is
+    listed once instead of checking every file, so a list of posix paths on a
+    network share only costs a request per directory.
+
+    Args:
+        paths (List[str]): Paths of the files
+        max_workers (int, optional): Maximum number of threads
+        cancel_event (threading.Event, optional): Stops checking when set, the
+            files that were not checked are not reported
+
+    Returns:
+        List[str]: The paths that don't exist
+    """
+    directories = {}
+    for path in paths:
+        prefix, separator, name = path.rpartition("/")
+        directories.setdefault(prefix + separator, []).append(name)
+
+    def missing_in_directory(directory):
+        prefix, names = directory
+        if cancel_event and cancel_event.is_set():
+            return []
+
+        if len(names) > 2:
+            try:
+                existing = set(os.listdir(prefix or "."))
+            except OSError:
+                existing = set()
+            names = [name for name in names if name not in existing]
+
+        # names that are not listed may still exist, e.g. with another case
+        return [prefix + name for name in names if not os.path.exists(prefix + name)]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return [
+            path
+            for missing in executor.map(missing_in_directory, directories.items())
+            for path in missing
+        ]
+
+
+def summarize_missing_files(missing: List[str], total: int, limit: int = 10) -> str:
+    """Describe missing files in one message.
+
+    Args:
+        missing (List[str]): Paths of the missing files
+        total (int): Number of files that were checked
+        limit (int, optional): Maximum number of paths listed
+
+    Returns:
+        str: The message
+    """
+    message = f"{len(missing)} of {total} files are missing"
+    if missing:
+        message += ":\n" + "\n".join(missing[:limit])
+        if len(missing) > limit:
+            message += f"\n... and {len(missing) - limit} more"
+    return message
@@ -0,0 +1,321 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import Core
+
+
+class JobCache:
+    """Content addressed cache of job results.
+
+    Jobs whose arguments have "cache_results" set, see CommandBase, get a key
+    hashed from their interpreter, the source of their command file, their
+    arguments and the size and modification time of their target files. A job
+    that succeeded stores its log under its key, and a later job with the same
+    key restores that log instead of running. The size and modification time
+    of the outputs the job recorded, see CommandBase.get_output_path, are
+    stored with the log, and an entry whose outputs were since removed or
+    changed is a miss. Once the stored logs take more than max_size bytes, the
+    least recently used entries are evicted.
+
+    Args:
+        max_size (int): Maximum size of the stored logs in bytes
+        hash_contents (bool, optional): Key the target files by the hash of
+            their content instead of their modification time, so touched but
+            unchanged files still hit. The hashes are kept in the cache until
+            the size or modification time of a file changes.
+        cache_dir (Path, optional): Directory of the cache, defaults to
+            "JobCache" in the cache directory
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            command TEXT NOT NULL,
+            arguments_path TEXT NOT NULL,
+            created TEXT NOT NULL,
+            last_used REAL NOT NULL,
+            size INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS file_hashes (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            digest TEXT NOT NULL
+        );
+    """
+    ARGUMENT = "cache_results"
+    LOG_NAME = "job.log"
+    OUTPUTS_NAME = "outputs.json"
+
+    def __init__(
+        self,
+        max_size: int,
+        hash_contents: bool = False,
+        cache_dir: Optional[Path] = None,
+    ):
+        self.max_size = max_size
+        self.hash_contents = hash_contents
+        self.cache_dir = Path(cache_dir or Core.get_cache_dir() / "JobCache")
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict] = None) -> Optional["JobCache"]:
+        """Create the job cache of the settings.
+
+        Args:
+            config (Dict, optional): Settings, see Core.get_command_config
+
+        Returns:
+            Optional[JobCache]: The cache, None if "job_cache_size_mb" is 0
+        """
+        config = config or Core.get_command_config()
+        if config["job_cache_size_mb"] <= 0:
+            return None
+        return cls(
+            int(config["job_cache_size_mb"] * 1024 * 1024),
+            config["job_cache_hash_contents"],
+        )
+
+    @contextmanager
+    def connect(self):
+        """Open the index of the cache, committing on success."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.cache_dir / "index.sqlite", timeout=30)
+        try:
+            connection.executescript(self.SCHEMA)
+            yield connection
+            connection.commit()
+        finally:
+            connection.close()
+
+    def get_entry_dir(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+    def get_job_key(self, arguments_path: Path, command: str = "") -> Optional[str]:
+        """Hash the inputs of a job.
+
+        Args:
+            arguments_path (Path): Path to the arguments JSON file of the job
+            command (str, optional): Interpreter the job runs with
+
+        Returns:
+            Optional[str]: The key, None if the job doesn't cache its results
+        """
+        with open(arguments_path, "r", encoding="utf-8") as f:
+            arguments = json.load(f)
+        if not arguments.get(self.ARGUMENT):
+            return None
+
+        digest = hashlib.sha256(command.encode("utf-8"))
+        try:
+            digest.update(Path(arguments["cmd_py_path"]).read_bytes())
+        except OSError:
+            return None
+        digest.update(json.dumps(arguments, sort_keys=True).encode("utf-8"))
+
+        with self.connect() as connection:
+            for path in arguments.get("target_files") or []:
+                fingerprint = self.get_file_fingerprint(connection, path)
+                digest.update(json.dumps(fingerprint).encode("utf-8"))
+
+        return digest.hexdigest()
+
+    def get_file_fingerprint(self, connection: sqlite3.Connection, path: str) -> list:
+        """Describe the version of a target file.
+
+        Args:
+            connection (sqlite3.Connection): Connection to the index
+            path (str): Path of the file
+
+        Returns:
+            list: Path, size and modification time or content hash of the file
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return [path, None]
+
+        if not self.hash_contents:
+            return [path, stat.st_size, stat.st_mtime_ns]
+
+        row = connection.execute(
+            "SELECT digest FROM file_hashes WHERE path = ? AND size = ? "
+            "AND mtime_ns = ?",
+            (path, stat.st_size, stat.st_mtime_ns),
+        ).fetchone()
+        if row:
+            return [path, stat.st_size, row[0]]
+
+        file_digest = hashlib.sha1()
+        try:
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    file_digest.update(block)
+        except OSError:
+            return [path, None]
+
+        connection.execute(
+            "INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?)",
+            (path, stat.st_size, stat.st_mtime_ns, file_digest.hexdigest()),
+        )
+        return [path, stat.st_size, file_digest.hexdigest()]
+
+    @staticmethod
+    def get_output_fingerprint(path: str) -> list:
+        """Describe the version of an output file.
+
+        Args:
+            path (str): Path of the file
+
+        Returns:
+            list: Path, size and modification time of the file, or None if it
+                doesn't exist
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return [path, None]
+        return [path, stat.st_size, stat.st_mtime_ns]
+
+    def is_entry_valid(self, key: str) -> bool:
+        """Whether the log and the unchanged outputs of an entry are there.
+
+        Args:
+            key (str): Key from get_job_key
+        """
+        entry_dir = self.get_entry_dir(key)
+        if not (entry_dir / self.LOG_NAME).is_file():
+            return False
+
+        try:
+            with open(entry_dir / self.OUTPUTS_NAME, "r", encoding="utf-8") as f:
+                outputs = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        return all(
+            self.get_output_fingerprint(output[0]) == output for output in outputs
+        )
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Find the stored result of a job, marking it as used.
+
+        Args:
+            key (str): Key from get_job_key
+
+        Returns:
+            Optional[Dict[str, Any]]: The entry with its command, the arguments
+                file and creation time of the job that stored it and the path
+                of its log, None if there is none or its outputs changed
+        """
+        log_path = self.get_entry_dir(key) / self.LOG_NAME
+        with self.connect() as connection:
+            row = connection.execute(
+                "SELECT command, arguments_path, created FROM entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if not self.is_entry_valid(key):
+                connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                shutil.rmtree(self.get_entry_dir(key), ignore_errors=True)
+                return None
+
+            connection.execute(
+                "UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+
+        command, arguments_path, created = row
+        return {
+            "key": key,
+            "command": command,
+            "arguments_path": arguments_path,
+            "created": created,
+            "log_path": log_path,
+        }
+
+    def store(self, key: str, arguments_path: Path, log_path: Optional[Path]) -> None:
+        """Store the result of a job that succeeded, evicting old entries.
+
+        The outputs recorded in the job stats are stored as they are now.
+
+        Args:
+            key (str): Key from get_job_key
+            arguments_path (Path): Path to the arguments JSON file of the job
+            log_path (Path): Path to the log of the job
+        """
+        entry_dir = self.get_entry_dir(key)
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        cached_log_path = entry_dir / self.LOG_NAME
+        if log_path and Path(log_path).is_file():
+            shutil.copyfile(log_path, cached_log_path)
+        else:
+            cached_log_path.write_bytes(b"")
+
+        output_paths = {
+            output_path
+            for record in Core.read_job_stats(arguments_path)
+            for output_path in record.get("outputs", [])
+        }
+        with open(entry_dir / self.OUTPUTS_NAME, "w", encoding="utf-8") as f:
+            json.dump(
+                [self.get_output_fingerprint(path) for path in sorted(output_paths)], f
+            )
+
+        with open(arguments_path, "r", encoding="utf-8") as f:
+            command = Path(json.load(f)["cmd_py_path"]).stem
+
+        with self.connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    command,
+                    Path(arguments_path).as_posix(),
+                    datetime.now().isoformat(timespec="seconds"),
+                    time.time(),
+                    cached_log_path.stat().st_size,
+                ),
+            )
+            self.evict(connection)
+
+    def evict(self, connection: sqlite3.Connection) -> None:
+        """Remove the least recently used entries above the maximum size.
+
+        Args:
+            connection (sqlite3.Connection): Connection to the index
+        """
+        total = connection.execute("SELECT SUM(size) FROM entries").fetchone()[0] or 0
+        rows = connection.execute(
+            "SELECT key, size FROM entries ORDER BY last_used"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_size:
+                break
+
+            connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            shutil.rmtree(self.get_entry_dir(key), ignore_errors=True)
+            total -= size
+
+    def restore(self, entry: Dict[str, Any], log_path: Path) -> None:
+        """Write the log of a cache hit to the log of the new job.
+
+        Args:
+            entry (Dict[str, Any]): Entry from lookup
+            log_path (Path): Path to the log of the new job
+        """
+        with open(log_path, "wb") as f:
+            f.write(
+                "Cached result of {0} from {1}\n".format(
+                    entry["arguments_path"], entry["created"]
+                ).encode("utf-8")
+            )
+            with open(entry["log_path"], "rb") as cached_log:
+                shutil.copyfileobj(cached_log, f)
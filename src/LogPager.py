@@ -0,0 +1,117 @@
+import bisect
+import mmap
+from array import array
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List
+
+
+class LogPager:
+    """Read a log file by line number through a memory map.
+
+    The file is indexed in blocks of block_size bytes, storing the number of
+    lines before each block. Finding a line only scans the one block it is in,
+    so any window of lines of a log of many gigabytes is read without loading
+    the file. Call refresh() to index the output appended since.
+
+    Args:
+        log_path (Path): Path to the log file
+        block_size (int): Size of the indexed blocks in bytes
+    """
+
+    BLOCK_SIZE = 64 * 1024
+
+    def __init__(self, log_path: Path, block_size: int = BLOCK_SIZE):
+        self.log_path = Path(log_path)
+        self.block_size = block_size
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop the index, e.g. after the log file was rewritten."""
+        self._size = 0
+        self._block_lines = array("q", [0])
+        self._tail_lines = 0
+        self._partial_line = False
+
+    @property
+    def size(self) -> int:
+        """Number of indexed bytes."""
+        return self._size
+
+    @property
+    def line_count(self) -> int:
+        """Number of indexed lines, counting an unterminated last line."""
+        return self._block_lines[-1] + self._tail_lines + int(self._partial_line)
+
+    @contextmanager
+    def _mapped(self):
+        with open(self.log_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+    def refresh(self) -> bool:
+        """Index the output appended to the log file since the last refresh.
+
+        Returns:
+            bool: True if the log changed
+        """
+        try:
+            size = self.log_path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+
+        if size < self._size:
+            self.reset()
+            if not size:
+                return True
+        elif size == self._size:
+            return False
+
+        with self._mapped() as mapped:
+            full_blocks = size // self.block_size
+            for block in range(len(self._block_lines) - 1, full_blocks):
+                start = block * self.block_size
+                self._block_lines.append(
+                    self._block_lines[-1]
+                    + mapped[start : start + self.block_size].count(b"\n")
+                )
+
+            self._tail_lines = mapped[full_blocks * self.block_size : size].count(b"\n")
+            self._partial_line = mapped[size - 1 : size] != b"\n"
+
+        self._size = size
+        return True
+
+    def _find_line(self, mapped: mmap.mmap, line: int) -> int:
+        if line <= 0:
+            return 0
+
+        # the block holding the newline that ends the previous line
+        block = bisect.bisect_left(self._block_lines, line) - 1
+        position = block * self.block_size
+        for _ in range(line - self._block_lines[block]):
+            position = mapped.find(b"\n", position, self._size) + 1
+        return position
+
+    def read_lines(self, start: int, count: int) -> List[bytes]:
+        """Read a window of lines.
+
+        Args:
+            start (int): Index of the first line
+            count (int): Maximum number of lines to read
+
+        Returns:
+            List[bytes]: The lines, including their line endings
+        """
+        if start >= self.line_count or count <= 0:
+            return []
+
+        lines = []
+        with self._mapped() as mapped:
+            position = self._find_line(mapped, start)
+            while len(lines) < count and position < self._size:
+                end = mapped.find(b"\n", position, self._size) + 1 or self._size
+                lines.append(mapped[position:end])
+                position = end
+
+        return lines
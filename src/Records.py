@@ -0,0 +1,134 @@
+import gzip
+import io
+import json
+from contextlib import suppress
+from pathlib import Path
+from typing import Any, Iterator, Optional, Tuple
+
+msgpack = None
+with suppress(ModuleNotFoundError):
+    import msgpack
+
+zstandard = None
+with suppress(ModuleNotFoundError):
+    import zstandard
+
+
+RECORD_FORMATS = (
+    "jsonl",
+    "jsonl.gz",
+    "jsonl.zst",
+    "msgpack",
+    "msgpack.gz",
+    "msgpack.zst",
+)
+
+
+def get_record_format(file_path: Path) -> str:
+    """Get the record format of a file from its name.
+
+    Args:
+        file_path (Path): Path of the file, e.g. "scene_nodes.msgpack.zst"
+
+    Returns:
+        str: One of RECORD_FORMATS
+
+    Raises:
+        ValueError: If the name doesn't end with a record format
+    """
+    name = Path(file_path).name
+    for record_format in sorted(RECORD_FORMATS, key=len, reverse=True):
+        if name.endswith("." + record_format):
+            return record_format
+    raise ValueError(f"Unknown record format: {file_path}")
+
+
+def _open_record_stream(file_path: Path, mode: str, compression: str):
+    """Open a binary stream of a record file.
+
+    Args:
+        file_path (Path): Path of the file
+        mode (str): "rb" or "wb"
+        compression (str): "", "gz" or "zst"
+    """
+    if compression == "gz":
+        return gzip.open(file_path, mode)
+
+    if compression == "zst":
+        if zstandard is None:
+            raise ModuleNotFoundError("zstandard is needed for .zst record files")
+        f = open(file_path, mode)
+        if mode == "wb":
+            return zstandard.ZstdCompressor().stream_writer(f)
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(f))
+
+    return open(file_path, mode)
+
+
+def _get_record_encoding(record_format: str) -> Tuple[str, str]:
+    encoding, _, compression = record_format.partition(".")
+    if encoding == "msgpack" and msgpack is None:
+        raise ModuleNotFoundError("msgpack is needed for .msgpack record files")
+    return encoding, compression
+
+
+class RecordWriter:
+    """Write records one at a time to a JSON lines or msgpack file.
+
+    Records are encoded as soon as they are written, so a dump never holds
+    more than one of them. Use it as a context manager to close the file.
+
+    Args:
+        file_path (Path): Path of the file
+        record_format (str, optional): One of RECORD_FORMATS, from the file
+            name if None
+    """
+
+    def __init__(self, file_path: Path, record_format: Optional[str] = None):
+        self.record_format = record_format or get_record_format(file_path)
+        self._encoding, compression = _get_record_encoding(self.record_format)
+        self._packer = msgpack.Packer() if self._encoding == "msgpack" else None
+        self._stream = _open_record_stream(file_path, "wb", compression)
+
+    def write(self, record: Any) -> None:
+        """Append a record to the file.
+
+        Args:
+            record (Any): JSON serializable record
+        """
+        if self._packer:
+            self._stream.write(self._packer.pack(record))
+        else:
+            self._stream.write((json.dumps(record) + "\n").encode("utf-8"))
+
+    def close(self) -> None:
+        self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def iter_records(file_path: Path, record_format: Optional[str] = None) -> Iterator:
+    """Read the records of a file written by RecordWriter one at a time.
+
+    Args:
+        file_path (Path): Path of the file
+        record_format (str, optional): One of RECORD_FORMATS, from the file
+            name if None
+
+    Yields:
+        Any: The records, in the order they were written
+    """
+    encoding, compression = _get_record_encoding(
+        record_format or get_record_format(file_path)
+    )
+    with _open_record_stream(file_path, "rb", compression) as f:
+        if encoding == "msgpack":
+            yield from msgpack.Unpacker(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
@@ -1,17 +1,43 @@
 import inspect
 import json
-from datetime import datetime
+import re
+from collections import deque
 from enum import IntEnum
+from functools import lru_cache
 from pathlib import Path
 
-from Qt.QtCore import QDir, QProcess, QProcessEnvironment, Qt, Slot
-from Qt.QtGui import QColor, QStandardItem, QStandardItemModel, QTextCursor
+from Qt.QtCore import (
+    QDir,
+    QEvent,
+    QObject,
+    QProcess,
+    QProcessEnvironment,
+    QRunnable,
+    Qt,
+    QThreadPool,
+    QTimer,
+    Signal,
+    Slot,
+)
+from Qt.QtGui import (
+    QColor,
+    QStandardItem,
+    QStandardItemModel,
+    QTextCharFormat,
+    QTextCursor,
+)
 from Qt.QtWidgets import (
     QAbstractItemView,
+    QAbstractSlider,
     QDialog,
     QDialogButtonBox,
+    QHBoxLayout,
     QHeaderView,
+    QLabel,
+    QPlainTextEdit,
     QPushButton,
+    QScrollBar,
+    QSpinBox,
     QTableWidgetItem,
     QTextEdit,
     QVBoxLayout,
@@ -20,6 +46,8 @@ from Qt.QtWidgets import (
 
 import Core
 import Util
+from JobCache import JobCache
+from LogPager import LogPager
 
 SUCCESS_COLOR = QColor(92, 184, 92)
 FAIL_COLOR = QColor(240, 173, 78)
@@ -27,28 +55,70 @@ ERROR_COLOR = QColor(217, 83, 79)
 SKIP_COLOR = QColor(88, 165, 204)
 NORMAL_COLOR = QColor(200, 200, 200)
 
+SCROLL_KEY_ACTIONS = {
+    Qt.Key_Up: QAbstractSlider.SliderSingleStepSub,
+    Qt.Key_Down: QAbstractSlider.SliderSingleStepAdd,
+    Qt.Key_PageUp: QAbstractSlider.SliderPageStepSub,
+    Qt.Key_PageDown: QAbstractSlider.SliderPageStepAdd,
+    Qt.Key_Home: QAbstractSlider.SliderToMinimum,
+    Qt.Key_End: QAbstractSlider.SliderToMaximum,
+}
+
 STATUS_STR = {
     QProcess.NotRunning: "Not Running",
     QProcess.Starting: "Starting",
     QProcess.Running: "Running",
 }
+
+
+class JOB_STATE:
+    """Status texts of a job in the process table."""
+
+    NOT_RUNNING = STATUS_STR[QProcess.NotRunning]
+    WAITING = "Waiting"
+    CHECKING = "Checking Cache"
+    QUEUED = "Queued"
+    STARTING = STATUS_STR[QProcess.Starting]
+    RUNNING = STATUS_STR[QProcess.Running]
+    FINISHED = "Finished!"
+    FAILED = "Failed!"
+    KILLED = "Killed"
+    SKIPPED = "Skipped"
+
+
+JOB_STATE_COLOR = {
+    JOB_STATE.FINISHED: SUCCESS_COLOR,
+    JOB_STATE.FAILED: ERROR_COLOR,
+    JOB_STATE.KILLED: FAIL_COLOR,
+    JOB_STATE.SKIPPED: FAIL_COLOR,
+}
 CUR_DIR = Path(__file__).parent
 
 logger = Core.get_logger()
 
 
-def apply_stylesheet(widget):
-    """Apply the application's stylesheet to a widget.
+@lru_cache(maxsize=None)
+def get_stylesheet():
+    """Get the application's stylesheet, read from style.qss only once.
 
-    Args:
-        widget: The Qt widget to apply the stylesheet to
+    Returns:
+        str: The stylesheet
     """
     QDir.addSearchPath(
         "icons", Path(__file__).parent.joinpath("ui", "images").as_posix()
     )
     styles_path = Path(__file__).parent.joinpath("style.qss")
     with open(styles_path) as style:
-        widget.setStyleSheet(style.read())
+        return style.read()
+
+
+def apply_stylesheet(widget):
+    """Apply the application's stylesheet to a widget.
+
+    Args:
+        widget: The Qt widget to apply the stylesheet to
+    """
+    widget.setStyleSheet(get_stylesheet())
 
 
 class PROCESS_TABLE_HEADER(IntEnum):
@@ -60,6 +130,10 @@ class PROCESS_TABLE_HEADER(IntEnum):
     STATUS = 3
     KILL = 4
     RUN = 5
+    WALL_TIME = 6
+    CPU_TIME = 7
+    PEAK_MEMORY = 8
+    DEPENDS_ON = 9
 
 
 class SettingsDialog(QDialog):
@@ -116,16 +190,25 @@ class SettingsDialog(QDialog):
 
 
 class LogDialog(QDialog):
-    """Dialog for displaying process output logs.
+    """Dialog for displaying the log file of a job.
+
+    The log is read through a LogPager, so only the lines in view are
+    loaded, however large the file is. The log is refreshed every
+    REFRESH_INTERVAL milliseconds while the dialog is visible, and the view
+    keeps following the end of the log while scrolled to the bottom.
 
-    This dialog shows the output from running processes and maintains
-    a maximum buffer size to prevent memory issues.
+    Args:
+        log_path: Path to the log file
+        parent: Parent widget
     """
 
-    def __init__(self, parent=None):
+    REFRESH_INTERVAL = 100
+
+    def __init__(self, log_path, parent=None):
         """Initialize the log dialog.
 
         Args:
+            log_path: Path to the log file
             parent: Parent widget
         """
         super(LogDialog, self).__init__(parent)
@@ -133,51 +216,170 @@ class LogDialog(QDialog):
         self.resize(640, 480)
         apply_stylesheet(self)
 
-        layout = QVBoxLayout(self)
-        self._output_text_edit = QTextEdit()
-
-        self._max_characters = 65535 * 10
+        self._pager = LogPager(log_path)
 
-        layout.addWidget(self._output_text_edit)
+        layout = QVBoxLayout(self)
+        view_layout = QHBoxLayout()
+        view_layout.setSpacing(0)
+
+        self._output_text_edit = QPlainTextEdit()
+        self._output_text_edit.setReadOnly(True)
+        self._output_text_edit.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self._output_text_edit.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self._output_text_edit.installEventFilter(self)
+        self._output_text_edit.viewport().installEventFilter(self)
+        view_layout.addWidget(self._output_text_edit)
+
+        self._scroll_bar = QScrollBar(Qt.Vertical)
+        self._scroll_bar.valueChanged.connect(self.show_lines)
+        view_layout.addWidget(self._scroll_bar)
+        layout.addLayout(view_layout)
+
+        self._text_formats = {}
+        for color in (NORMAL_COLOR, FAIL_COLOR, ERROR_COLOR):
+            text_format = QTextCharFormat()
+            text_format.setForeground(color)
+            self._text_formats[color.name()] = text_format
+
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setInterval(self.REFRESH_INTERVAL)
+        self._refresh_timer.timeout.connect(self.refresh)
+
+        bottom_layout = QHBoxLayout()
+        self._line_count_label = QLabel()
+        bottom_layout.addWidget(self._line_count_label)
+        bottom_layout.addStretch()
+        bottom_layout.addWidget(QLabel("go to line:"))
+        self._line_spin_box = QSpinBox()
+        self._line_spin_box.setMinimum(1)
+        self._line_spin_box.editingFinished.connect(self.go_to_line)
+        bottom_layout.addWidget(self._line_spin_box)
 
         self.buttons = QDialogButtonBox(QDialogButtonBox.Ok, Qt.Horizontal, self)
-        layout.addWidget(self.buttons)
+        bottom_layout.addWidget(self.buttons)
+        layout.addLayout(bottom_layout)
 
         self.buttons.accepted.connect(self.accept)
         self.buttons.rejected.connect(self.reject)
 
-    def append_message(self, msg):
-        """Append a message to the log.
-
-        Maintains a maximum buffer size by removing old content if necessary.
+    @staticmethod
+    def get_line_color(line):
+        """Get the color to show a log line in.
 
         Args:
-            msg: Message to append
+            line: Log line
+
+        Returns:
+            QColor: Color of the line
+        """
+        upper_line = line.upper()
+        if "WARNING" in upper_line:
+            return FAIL_COLOR
+        elif "ERROR" in upper_line or "EXCEPTION" in upper_line:
+            return ERROR_COLOR
+        return NORMAL_COLOR
+
+    def get_page_size(self):
+        """Get the number of lines that fit in the view."""
+        line_height = self._output_text_edit.fontMetrics().lineSpacing()
+        return max(1, self._output_text_edit.viewport().height() // line_height)
+
+    def reset(self):
+        """Read the log from the start, after the log file was rewritten."""
+        self._pager.reset()
+        self._output_text_edit.clear()
+        self.refresh()
+
+    @Slot()
+    def refresh(self):
+        """Index the new output of the log and update the view."""
+        at_end = self._scroll_bar.value() >= self._scroll_bar.maximum()
+        self._pager.refresh()
+
+        line_count = self._pager.line_count
+        self._line_count_label.setText("{0} lines".format(line_count))
+        self._line_spin_box.setMaximum(max(1, line_count))
+
+        page_size = self.get_page_size()
+        self._scroll_bar.setPageStep(page_size)
+        self._scroll_bar.blockSignals(True)
+        self._scroll_bar.setMaximum(max(0, line_count - page_size))
+        if at_end:
+            self._scroll_bar.setValue(self._scroll_bar.maximum())
+        self._scroll_bar.blockSignals(False)
+
+        self.show_lines()
+
+    @Slot()
+    def show_lines(self, *args):
+        """Show the lines at the scroll bar position.
+
+        Consecutive lines of the same color are inserted at once.
         """
-        if len(self._output_text_edit.toPlainText()) > self._max_characters:
-            logger.warning(
-                "too many output characters [{0}], flush!".format(self._max_characters)
+        lines = [
+            line.decode("ISO-8859-1")
+            for line in self._pager.read_lines(
+                self._scroll_bar.value(), self.get_page_size()
             )
-            self._output_text_edit.clear()
+        ]
+        if lines:
+            lines[-1] = lines[-1].rstrip("\r\n")
+
+        self._output_text_edit.clear()
+        cursor = QTextCursor(self._output_text_edit.document())
+        run_lines = []
+        run_color = None
+        for line in lines:
+            color = self.get_line_color(line)
+            if run_lines and color != run_color:
+                cursor.insertText(
+                    "".join(run_lines), self._text_formats[run_color.name()]
+                )
+                run_lines = []
+            run_lines.append(line)
+            run_color = color
+
+        if run_lines:
+            cursor.insertText("".join(run_lines), self._text_formats[run_color.name()])
 
-        cursor = self._output_text_edit.textCursor()
+    @Slot()
+    def go_to_line(self):
+        """Scroll to the line entered in the line spin box."""
+        self._scroll_bar.setValue(self._line_spin_box.value() - 1)
+
+    def eventFilter(self, watched, event):
+        """Scroll the log with the mouse wheel and the keyboard."""
+        if event.type() == QEvent.Wheel:
+            steps = event.angleDelta().y() // 40
+            self._scroll_bar.setValue(self._scroll_bar.value() - steps)
+            return True
+
+        if event.type() == QEvent.Resize:
+            QTimer.singleShot(0, self.refresh)
+        elif event.type() == QEvent.KeyPress and event.key() in SCROLL_KEY_ACTIONS:
+            self._scroll_bar.triggerAction(SCROLL_KEY_ACTIONS[event.key()])
+            return True
 
-        if "WARNING" in msg.upper():
-            self._output_text_edit.setTextColor(FAIL_COLOR)
-        elif "ERROR" in msg.upper() or "EXCEPTION" in msg.upper():
-            self._output_text_edit.setTextColor(ERROR_COLOR)
-        self._output_text_edit.insertPlainText(msg)
-        self._output_text_edit.setTextColor(NORMAL_COLOR)
+        return super(LogDialog, self).eventFilter(watched, event)
 
-        cursor.movePosition(QTextCursor.End)
-        self._output_text_edit.ensureCursorVisible()
+    def showEvent(self, event):
+        """Refresh the log periodically while visible."""
+        self.refresh()
+        self._refresh_timer.start()
+        super(LogDialog, self).showEvent(event)
+
+    def hideEvent(self, event):
+        """Stop refreshing while hidden."""
+        self._refresh_timer.stop()
+        super(LogDialog, self).hideEvent(event)
 
 
 class BatchQProcess(QProcess):
     """Process handler for running commands.
 
     This class extends QProcess to handle command execution and logging.
-    It provides methods for starting processes and handling their output.
+    It provides methods for starting processes and forwards their raw output
+    through the outputReceived signal.
 
     Args:
         _name: Name of the process
@@ -186,6 +388,8 @@ class BatchQProcess(QProcess):
         _arguments: Command arguments
     """
 
+    outputReceived = Signal(bytes)
+
     def __init__(self, _name, _command, _script_file, _arguments):
         QProcess.__init__(self)
 
@@ -198,13 +402,6 @@ class BatchQProcess(QProcess):
 
         self.build_command_line()
 
-        self._log_dialog = LogDialog()
-        self._log_dialog.setWindowTitle(
-            "{0}: {1} {2}".format(_name, _script_file, _arguments)
-        )
-
-        self._log_dialog.setVisible(False)
-
     def build_command_line(self):
         """Build the command line for process execution."""
         # simple check for extra arguments
@@ -223,31 +420,1046 @@ class BatchQProcess(QProcess):
             "PYTHONPATH",
             CUR_DIR.as_posix() + ";" + env.value("PYTHONPATH"),
         )
-        env.insert("ARG_JSON_PATH", self._arguments.as_posix())
+        if self._arguments:
+            env.insert("ARG_JSON_PATH", self._arguments.as_posix())
         self.setProcessEnvironment(env)
 
     def do_start(self):
         """Start the process execution."""
-        self.start(self.command_line)
-
-    @Slot()
-    def show_stdout(self):
-        """Show the log dialog with process output."""
-        self._log_dialog.setVisible(True)
+        # Qt6 dropped the QProcess.start(command_line) overload
+        if hasattr(self, "startCommand"):
+            self.startCommand(self.command_line)
+        else:
+            self.start(self.command_line)
 
     @Slot()
     def read_std_out(self):
         """Handle standard output from the process."""
-        output_msg = self.readAllStandardOutput()
-        output_msg = output_msg.data().decode("ISO-8859-1")
-        self._log_dialog.append_message(output_msg)
+        self.outputReceived.emit(self.readAllStandardOutput().data())
 
     @Slot()
     def read_std_error(self):
         """Handle standard error from the process."""
-        output_msg = self.readAllStandardError()
-        output_msg = output_msg.data().decode("ISO-8859-1")
-        self._log_dialog.append_message(output_msg)
+        self.outputReceived.emit(self.readAllStandardError().data())
+
+
+class WorkerQProcess(BatchQProcess):
+    """Long-lived CommandExecuter process that runs jobs one after another.
+
+    Jobs are sent as argument JSON paths over stdin. The worker prints a
+    CommandConfig.WORKER_JOB_DONE line after each job, which is filtered out of
+    the job log and turned into the jobDone signal.
+
+    Args:
+        _name: Name of the worker
+        _command: Interpreter command the worker runs with
+        _script_file: Path to CommandExecuter.py
+    """
+
+    jobDone = Signal(object, bool)
+
+    def __init__(self, _name, _command, _script_file):
+        super(WorkerQProcess, self).__init__(_name, _command, _script_file, None)
+
+        self._job = None
+        self._pending_output = b""
+
+        self.setProcessChannelMode(QProcess.MergedChannels)
+        self.readyReadStandardOutput.connect(self.read_std_out)
+        self.outputReceived.connect(self.dispatch_output)
+        self.finished.connect(self.on_worker_finished)
+
+    def build_command_line(self):
+        """Build the command line, switching CommandExecuter to worker mode."""
+        super(WorkerQProcess, self).build_command_line()
+
+        env = self.processEnvironment()
+        env.insert(Core.CommandConfig.WORKER_ENV, "1")
+        self.setProcessEnvironment(env)
+
+    @property
+    def command(self):
+        """The interpreter command of this worker."""
+        return self._command
+
+    @property
+    def job(self):
+        """The job currently running on this worker, None if idle."""
+        return self._job
+
+    def submit(self, job):
+        """Send a job to the worker, starting the worker if needed.
+
+        Args:
+            job: BatchJob to run
+        """
+        self._job = job
+        if self.state() == QProcess.NotRunning:
+            self._pending_output = b""
+            self.do_start()
+
+        self.write((job.arguments.as_posix() + "\n").encode("utf-8"))
+
+    def dispatch_output(self, msg):
+        """Forward worker output to the current job and detect finished jobs.
+
+        Args:
+            msg: Output chunk from the worker
+        """
+        marker = Core.CommandConfig.WORKER_JOB_DONE.encode("ascii")
+        lines = (self._pending_output + msg).split(b"\n")
+        tail = lines.pop()
+        self._pending_output = b""
+
+        chunks = []
+        for line in lines:
+            if not line.startswith(marker):
+                chunks.append(line + b"\n")
+                continue
+
+            self.forward_output(b"".join(chunks))
+            chunks = []
+
+            result = json.loads(line[len(marker) :])
+            job, self._job = self._job, None
+            if job:
+                self.jobDone.emit(job, result["success"])
+
+        # hold back an incomplete line only while it could still be a marker
+        if tail.startswith(marker) or marker.startswith(tail):
+            self._pending_output = tail
+        else:
+            chunks.append(tail)
+
+        self.forward_output(b"".join(chunks))
+
+    def forward_output(self, msg):
+        """Append output to the log of the current job.
+
+        Args:
+            msg: Output to append
+        """
+        if msg and self._job:
+            self._job.append_message(msg)
+
+    @Slot()
+    def on_worker_finished(self, *args):
+        """Fail the current job if the worker exits in the middle of it."""
+        job, self._job = self._job, None
+        if job:
+            self.jobDone.emit(job, False)
+
+    def shutdown(self):
+        """Ask the worker to exit once its current job is done."""
+        if self.state() != QProcess.NotRunning:
+            self.closeWriteChannel()
+
+
+class WorkerPool(QObject):
+    """Pool of warm CommandExecuter workers, per interpreter command.
+
+    Jobs submitted to the pool are queued and dispatched to an idle worker of
+    their interpreter. Up to max_workers workers are started per interpreter
+    and kept alive between jobs.
+
+    Args:
+        script_file: Path to CommandExecuter.py
+        max_workers: Maximum number of workers per interpreter command
+        parent: Parent object
+    """
+
+    def __init__(self, script_file, max_workers, parent=None):
+        super(WorkerPool, self).__init__(parent)
+
+        self._script_file = script_file
+        self._max_workers = max_workers
+        self._workers = {}
+        self._queue = deque()
+
+    def submit(self, job):
+        """Queue a job and dispatch it when a worker is free.
+
+        Args:
+            job: BatchJob to run
+        """
+        self._queue.append(job)
+        self.dispatch()
+
+    def is_queued(self, job) -> bool:
+        """Whether a job is waiting for a worker.
+
+        Args:
+            job: BatchJob to check
+
+        Returns:
+            bool: True if the job is queued
+        """
+        return job in self._queue
+
+    def cancel(self, job) -> bool:
+        """Remove a job from the queue if it has not been dispatched yet.
+
+        Args:
+            job: BatchJob to remove
+
+        Returns:
+            bool: True if the job was still queued
+        """
+        if job in self._queue:
+            self._queue.remove(job)
+            return True
+        return False
+
+    def dispatch(self):
+        """Dispatch queued jobs to idle workers."""
+        for job in list(self._queue):
+            worker = self.get_idle_worker(job.command)
+            if not worker:
+                continue
+
+            self._queue.remove(job)
+            job.run_on_worker(worker)
+            worker.submit(job)
+
+    def get_idle_worker(self, command):
+        """Get an idle worker for an interpreter, starting one if allowed.
+
+        Args:
+            command: Interpreter command
+
+        Returns:
+            WorkerQProcess or None if all workers of this command are busy
+        """
+        workers = self._workers.setdefault(command, [])
+        for worker in workers:
+            if not worker.job:
+                return worker
+
+        if len(workers) >= self._max_workers:
+            return None
+
+        worker = WorkerQProcess(
+            "Worker #[{0}]".format(len(workers)), command, self._script_file
+        )
+        worker.setParent(self)
+        worker.jobDone.connect(self.on_job_done)
+        workers.append(worker)
+        return worker
+
+    def on_job_done(self, job, success):
+        """Handle a finished job and hand the worker the next one.
+
+        Args:
+            job: Finished BatchJob
+            success: Whether the job succeeded
+        """
+        job.finish(success)
+        self.dispatch()
+
+    def shutdown(self):
+        """Drop queued jobs and stop all workers."""
+        self._queue.clear()
+        for workers in self._workers.values():
+            for worker in workers:
+                worker.shutdown()
+
+
+class JobCacheSignals(QObject):
+    """Signals of the job cache tasks, delivered in the GUI thread."""
+
+    lookupFinished = Signal(object, object, object)
+    storeFinished = Signal()
+
+
+class JobCacheLookupTask(QRunnable):
+    """Look up a job in the job cache in a thread pool thread.
+
+    Hashing the target files of a job can take a while, so it is kept out of
+    the GUI thread. The job, its cache key and the cache entry, None on a
+    miss, are sent with lookupFinished.
+
+    Args:
+        job_cache: JobCache to look the job up in
+        job: BatchJob to look up
+    """
+
+    def __init__(self, job_cache, job):
+        super(JobCacheLookupTask, self).__init__()
+
+        self.signals = JobCacheSignals()
+        self._job_cache = job_cache
+        self._job = job
+        self._arguments = job.arguments
+        self._command = job.command
+
+    def run(self):
+        key = entry = None
+        try:
+            key = self._job_cache.get_job_key(self._arguments, self._command)
+            if key:
+                entry = self._job_cache.lookup(key)
+        except Exception as e:
+            logger.error(e, exc_info=True)
+
+        self.signals.lookupFinished.emit(self._job, key, entry)
+
+
+class JobCacheStoreTask(QRunnable):
+    """Store the result of a job in the job cache in a thread pool thread.
+
+    Storing copies the log and may evict old entries, so it is kept out of
+    the GUI thread too. storeFinished is sent once done, whether it succeeded
+    or not.
+
+    Args:
+        job_cache: JobCache to store the result in
+        key: Cache key of the job
+        arguments: Path to the arguments JSON file of the job
+        log_path: Path to the log of the job
+    """
+
+    def __init__(self, job_cache, key, arguments, log_path):
+        super(JobCacheStoreTask, self).__init__()
+
+        self.signals = JobCacheSignals()
+        self._job_cache = job_cache
+        self._key = key
+        self._arguments = arguments
+        self._log_path = log_path
+
+    def run(self):
+        try:
+            self._job_cache.store(self._key, self._arguments, self._log_path)
+        except Exception as e:
+            logger.error(e, exc_info=True)
+
+        self.signals.storeFinished.emit()
+
+
+class JobScheduler(QObject):
+    """Run queued jobs with a limited number of parallel slots.
+
+    Jobs are started in submission order, and the next queued job is started
+    as soon as a running one finishes. Jobs with dependencies wait until all
+    of them finished, and are skipped if one of them fails. With a job cache,
+    jobs are looked up in it first, and the ones found finish right away.
+
+    Args:
+        max_jobs: Maximum number of jobs running at once
+        parent: Parent object
+    """
+
+    def __init__(self, max_jobs, parent=None):
+        super(JobScheduler, self).__init__(parent)
+
+        self._max_jobs = max(1, max_jobs)
+        self._worker_pool = None
+        self._job_cache = None
+        self._queue = deque()
+        self._running = set()
+        self._waiting = []
+        self._watched = set()
+        self._checking = {}
+
+    @property
+    def max_jobs(self):
+        """The number of parallel slots."""
+        return self._max_jobs
+
+    @max_jobs.setter
+    def max_jobs(self, value):
+        self._max_jobs = max(1, value)
+        self.dispatch()
+
+    @property
+    def worker_pool(self):
+        """The WorkerPool jobs are started on, None to start new processes."""
+        return self._worker_pool
+
+    @worker_pool.setter
+    def worker_pool(self, value):
+        self._worker_pool = value
+
+    @property
+    def job_cache(self):
+        """The JobCache jobs are looked up in, None to always run them."""
+        return self._job_cache
+
+    @job_cache.setter
+    def job_cache(self, value):
+        self._job_cache = value
+
+    def is_pending(self, job) -> bool:
+        """Whether a job is waiting, checked in the cache, queued or running.
+
+        Args:
+            job: BatchJob to check
+        """
+        if job in self._waiting or job in self._checking or job.running:
+            return True
+        return any(
+            runnable_job in self._queue or runnable_job in self._running
+            for runnable_job in job.shards or [job]
+        )
+
+    def submit(self, jobs):
+        """Queue jobs to run, together with the dependencies they need.
+
+        Dependencies that are not finished are submitted too, and the jobs are
+        queued in dependency order. Jobs whose dependencies are not finished
+        yet wait for them. Jobs that are already pending are ignored.
+
+        Args:
+            jobs: List of BatchJob
+        """
+        submitted = self.get_submitted_jobs(jobs)
+        for job in Core.sort_topologically(submitted, lambda job: job.dependencies):
+            if all(
+                dependency.state == JOB_STATE.FINISHED
+                for dependency in job.dependencies
+            ):
+                self.queue(job)
+            else:
+                self.wait_for_dependencies(job)
+
+        self.dispatch()
+
+    def get_submitted_jobs(self, jobs):
+        """Get the jobs to submit, with the dependencies they need.
+
+        Args:
+            jobs: List of BatchJob
+
+        Returns:
+            list: The jobs and their unfinished dependencies that aren't
+                pending yet
+        """
+        submitted = []
+        for job in jobs:
+            if job not in submitted and not self.is_pending(job):
+                submitted.append(job)
+        for job in submitted:
+            for dependency in job.dependencies:
+                if dependency.state == JOB_STATE.FINISHED:
+                    continue
+                if dependency not in submitted and not self.is_pending(dependency):
+                    submitted.append(dependency)
+
+        return submitted
+
+    def wait_for_dependencies(self, job):
+        """Hold a job until its dependencies finished.
+
+        Args:
+            job: BatchJob to hold
+        """
+        self._waiting.append(job)
+        job.set_state(JOB_STATE.WAITING)
+        for dependency in job.dependencies:
+            if dependency not in self._watched:
+                self._watched.add(dependency)
+                dependency.jobFinished.connect(self.on_dependency_finished)
+
+    def queue(self, job):
+        """Queue the jobs that run a job, once it wasn't found in the cache.
+
+        Args:
+            job: BatchJob to queue
+        """
+        if self._job_cache is None or not job.cacheable:
+            job.set_cache(None, None)
+            self.enqueue(job)
+            return
+
+        task = JobCacheLookupTask(self._job_cache, job)
+        task.signals.lookupFinished.connect(self.on_cache_lookup_finished)
+        self._checking[job] = task
+        job.set_state(JOB_STATE.CHECKING)
+        QThreadPool.globalInstance().start(task)
+
+    def enqueue(self, job):
+        """Add the jobs that run a job to the queue.
+
+        Args:
+            job: BatchJob to queue
+        """
+        for runnable_job in job.prepare_run():
+            self._queue.append(runnable_job)
+            runnable_job.set_state(JOB_STATE.QUEUED)
+
+    def cancel(self, job) -> bool:
+        """Remove a job, or its shards, from the queue if not started yet.
+
+        Args:
+            job: BatchJob to remove
+
+        Returns:
+            bool: True if the job was still queued
+        """
+        cancelled = False
+        if job in self._waiting:
+            self._waiting.remove(job)
+            self.release_dependencies()
+            job.cancel()
+            cancelled = True
+
+        if self._checking.pop(job, None):
+            job.cancel()
+            cancelled = True
+
+        for queued_job in job.shards or [job]:
+            if queued_job in self._queue:
+                self._queue.remove(queued_job)
+                queued_job.cancel()
+                cancelled = True
+
+        return cancelled
+
+    def clear(self):
+        """Drop all queued and waiting jobs."""
+        self._queue.clear()
+        self._waiting.clear()
+        self._checking.clear()
+        self.release_dependencies()
+
+    def release_dependencies(self):
+        """Stop watching the dependencies no waiting job needs anymore."""
+        needed = {
+            dependency for job in self._waiting for dependency in job.dependencies
+        }
+        for dependency in self._watched - needed:
+            self._watched.discard(dependency)
+            dependency.jobFinished.disconnect(self.on_dependency_finished)
+
+    def dispatch(self):
+        """Start queued jobs while there are free slots."""
+        while self._queue and len(self._running) < self._max_jobs:
+            job = self._queue.popleft()
+            self._running.add(job)
+            job.jobFinished.connect(self.on_job_finished)
+            job.start(self._worker_pool)
+
+    @Slot()
+    def on_job_finished(self, *args):
+        """Free the slot of a finished job and start the next one."""
+        job = self.sender()
+        if job in self._running:
+            self._running.discard(job)
+            job.jobFinished.disconnect(self.on_job_finished)
+        self.dispatch()
+
+    @Slot()
+    def on_cache_lookup_finished(self, job, key, entry):
+        """Finish a job found in the cache, or queue it to run.
+
+        Args:
+            job: BatchJob that was looked up
+            key: Cache key of the job, None if it doesn't cache its results
+            entry: Cache entry of the job, None on a miss
+        """
+        if self._checking.pop(job, None) is None:
+            return
+
+        if entry:
+            job.finish_from_cache(self._job_cache, entry)
+            return
+
+        job.set_cache(self._job_cache if key else None, key)
+        self.enqueue(job)
+        self.dispatch()
+
+    @Slot()
+    def on_dependency_finished(self, *args):
+        """Queue the waiting jobs whose dependencies all finished.
+
+        Waiting jobs with a failed, killed or skipped dependency are skipped,
+        which in turn skips the jobs waiting for them.
+        """
+        for job in list(self._waiting):
+            if job not in self._waiting:
+                continue
+
+            states = [dependency.state for dependency in job.dependencies]
+            if all(state == JOB_STATE.FINISHED for state in states):
+                self._waiting.remove(job)
+                self.queue(job)
+            elif any(
+                state in (JOB_STATE.FAILED, JOB_STATE.KILLED, JOB_STATE.SKIPPED)
+                for state in states
+            ):
+                self._waiting.remove(job)
+                job.skip()
+
+        self.release_dependencies()
+        self.dispatch()
+
+
+class BatchJob(QObject):
+    """A job in the process table.
+
+    A job runs CommandExecuter with its arguments JSON, either in a new
+    BatchQProcess or on a warm worker from a WorkerPool. Its output is
+    streamed to a log file next to the arguments JSON, which the LogDialog
+    reads when the log is shown.
+
+    Args:
+        _name: Name of the job
+        _command: Interpreter command to run the job with
+        _script_file: Path to CommandExecuter.py
+        _arguments: Path to the arguments JSON file
+        _parent_job: ShardedBatchJob this job is a shard of, which then keeps
+            the log
+    """
+
+    stateChanged = Signal(str)
+    jobFinished = Signal(bool)
+
+    def __init__(self, _name, _command, _script_file, _arguments, _parent_job=None):
+        super(BatchJob, self).__init__()
+
+        self._name = _name
+        self._command = _command
+        self._script_file = _script_file
+        self._arguments = _arguments
+        self._parent_job = _parent_job
+
+        self._state = JOB_STATE.NOT_RUNNING
+        self._process = None
+        self._worker = None
+        self._worker_pool = None
+
+        self._log_path = None if _parent_job else Path(_arguments).with_suffix(".log")
+        self._log_file = None
+        self._log_dialog = None
+        self._dependencies = []
+        self._job_cache = None
+        self._cache_key = None
+        self._store_task = None
+
+    @property
+    def name(self):
+        """The name of the job."""
+        return self._name
+
+    @property
+    def command(self):
+        """The interpreter command of the job."""
+        return self._command
+
+    @property
+    def arguments(self):
+        """The path to the arguments JSON file."""
+        return self._arguments
+
+    @property
+    def log_path(self):
+        """The path to the log file, None for shards."""
+        return self._log_path
+
+    @property
+    def stats(self):
+        """The resource usage of the last run, see Core.summarize_job_stats."""
+        return Core.summarize_job_stats(Core.read_job_stats(self._arguments))
+
+    @property
+    def state(self):
+        """The current state of the job."""
+        return self._state
+
+    @property
+    def running(self):
+        """Whether the job is running, waiting for a warm worker or storing its
+        result in the job cache."""
+        if self._worker_pool and self._worker_pool.is_queued(self):
+            return True
+        if self._store_task:
+            return True
+        return self._state in (JOB_STATE.STARTING, JOB_STATE.RUNNING)
+
+    @property
+    def cacheable(self):
+        """Whether the job may be looked up in and stored to the job cache."""
+        return True
+
+    @property
+    def shards(self):
+        """The shard jobs running this job, empty if it isn't sharded."""
+        return []
+
+    @property
+    def dependencies(self):
+        """The jobs that must finish before this job runs."""
+        return list(self._dependencies)
+
+    def set_dependencies(self, jobs):
+        """Set the jobs that must finish before this job runs.
+
+        Args:
+            jobs: List of BatchJob
+        """
+        self._dependencies = list(jobs)
+
+    def set_cache(self, job_cache, key):
+        """Set where the result of the job is stored once it succeeded.
+
+        Args:
+            job_cache: JobCache to store the result in, None to not store it
+            key: Cache key of the job
+        """
+        self._job_cache = job_cache
+        self._cache_key = key
+
+    def prepare_run(self):
+        """Prepare the job to be queued.
+
+        Returns:
+            list: The jobs to queue to run this job
+        """
+        Core.clear_job_stats(self._arguments)
+        self.open_log()
+        return [self]
+
+    def open_log(self):
+        """Start a new log file for a run of the job."""
+        if not self._log_path:
+            return
+
+        self.close_log()
+        self._log_file = open(self._log_path, "wb", buffering=0)
+        if self._log_dialog:
+            self._log_dialog.reset()
+
+    def close_log(self):
+        """Close the log file of the run."""
+        if self._log_file:
+            self._log_file.close()
+            self._log_file = None
+
+    def set_state(self, state):
+        """Set the state of the job and notify listeners.
+
+        Args:
+            state: New JOB_STATE
+        """
+        self._state = state
+        self.stateChanged.emit(state)
+
+    def start(self, worker_pool=None):
+        """Start the job.
+
+        Args:
+            worker_pool: Optional WorkerPool to run the job on a warm worker.
+                If None, the job runs in a new process.
+        """
+        if self.running:
+            return
+
+        if worker_pool:
+            self._worker_pool = worker_pool
+            self.set_state(JOB_STATE.QUEUED)
+            worker_pool.submit(self)
+            return
+
+        self._process = BatchQProcess(
+            self._name, self._command, self._script_file, self._arguments
+        )
+        self._process.setProcessChannelMode(QProcess.MergedChannels)
+        self._process.readyReadStandardOutput.connect(self._process.read_std_out)
+        self._process.readyReadStandardError.connect(self._process.read_std_error)
+        self._process.outputReceived.connect(self.append_message)
+        self._process.stateChanged.connect(self.on_process_state_changed)
+        self._process.finished.connect(self.on_process_finished)
+        self._process.errorOccurred.connect(self.on_process_error)
+        self._process.do_start()
+
+    def run_on_worker(self, worker):
+        """Mark the job as running on a warm worker.
+
+        Args:
+            worker: WorkerQProcess the job was dispatched to
+        """
+        self._worker = worker
+        self.set_state(JOB_STATE.RUNNING)
+
+    def kill(self):
+        """Kill the job, or drop it from the worker queue if not started."""
+        if self._worker_pool and self._worker_pool.cancel(self):
+            self.cancel()
+            return
+
+        process = self._worker or self._process
+        if process and process.state() != QProcess.NotRunning:
+            process.kill()
+            self.set_state(JOB_STATE.KILLED)
+
+    def cancel(self):
+        """Mark the job as killed before it was started."""
+        self.close_log()
+        self.set_state(JOB_STATE.KILLED)
+        self.jobFinished.emit(False)
+
+    def skip(self):
+        """Mark the job as skipped because a dependency didn't finish."""
+        self.close_log()
+        self.set_state(JOB_STATE.SKIPPED)
+        self.jobFinished.emit(False)
+
+    def finish(self, success):
+        """Mark the job as finished, storing its result in the job cache.
+
+        The result is stored in a thread pool thread, and jobFinished is sent
+        once it was.
+
+        Args:
+            success: Whether the job succeeded
+        """
+        self._worker = None
+        self.close_log()
+        if self._state != JOB_STATE.KILLED:
+            self.set_state(JOB_STATE.FINISHED if success else JOB_STATE.FAILED)
+
+        if success and self._state == JOB_STATE.FINISHED and self._cache_key:
+            self._store_task = JobCacheStoreTask(
+                self._job_cache, self._cache_key, self._arguments, self._log_path
+            )
+            self._store_task.signals.storeFinished.connect(self.on_cache_stored)
+            QThreadPool.globalInstance().start(self._store_task)
+            return
+
+        self.jobFinished.emit(success)
+
+    @Slot()
+    def on_cache_stored(self):
+        """Report the job as finished once its result is in the job cache."""
+        self._store_task = None
+        self.jobFinished.emit(True)
+
+    def finish_from_cache(self, job_cache, entry):
+        """Mark the job as finished with the log of a cached run.
+
+        Args:
+            job_cache: JobCache the job was found in
+            entry: Cache entry from JobCache.lookup
+        """
+        self.close_log()
+        Core.clear_job_stats(self._arguments)
+        self._cache_key = None
+        try:
+            job_cache.restore(entry, self._log_path)
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            self.finish(False)
+            return
+
+        if self._log_dialog:
+            self._log_dialog.reset()
+        self.set_state(JOB_STATE.FINISHED)
+        self.jobFinished.emit(True)
+
+    @Slot()
+    def on_process_state_changed(self, state):
+        """Forward the state of the job's own process.
+
+        Args:
+            state: QProcess state
+        """
+        if state != QProcess.NotRunning:
+            self.set_state(STATUS_STR[state])
+
+    @Slot()
+    def on_process_finished(self, exit_code, exit_status=QProcess.NormalExit):
+        """Handle the job's own process exiting.
+
+        Args:
+            exit_code: Exit code of the process
+            exit_status: Whether the process exited normally
+        """
+        self.finish(exit_status == QProcess.NormalExit and exit_code == 0)
+
+    @Slot()
+    def on_process_error(self, error):
+        """Fail the job if its process could not be started.
+
+        Args:
+            error: QProcess error
+        """
+        if error == QProcess.FailedToStart:
+            self.append_message(
+                "Failed to start: {0}\n".format(self._process.command_line).encode(
+                    "utf-8"
+                )
+            )
+            self.finish(False)
+
+    @Slot()
+    def show_log(self):
+        """Show the log dialog with the job output, creating it if needed."""
+        if not self._log_dialog:
+            self._log_dialog = LogDialog(self._log_path)
+            self._log_dialog.setWindowTitle(
+                "{0}: {1} {2}".format(self._name, self._script_file, self._arguments)
+            )
+
+        self._log_dialog.setVisible(True)
+
+    @Slot()
+    def append_message(self, msg):
+        """Append output to the job log.
+
+        Args:
+            msg: Raw output chunk
+        """
+        if self._parent_job:
+            self._parent_job.append_shard_message(self, msg)
+        elif self._log_file:
+            self._log_file.write(msg)
+        else:
+            with open(self._log_path, "ab") as log_file:
+                log_file.write(msg)
+
+
+class ShardedBatchJob(BatchJob):
+    """A job whose target files are shared by several processes.
+
+    Each shard runs the same arguments JSON. CommandExecuter hands the target
+    files to every shard through a SharedWorkQueue, so shards keep pulling
+    files until none are left. The shard states and logs are merged into this
+    job, which finishes when all of its shards did.
+
+    Args:
+        _name: Name of the job
+        _command: Interpreter command to run the job with
+        _script_file: Path to CommandExecuter.py
+        _arguments: Path to the arguments JSON file
+        _shard_count: Number of shard processes
+    """
+
+    def __init__(self, _name, _command, _script_file, _arguments, _shard_count):
+        super(ShardedBatchJob, self).__init__(_name, _command, _script_file, _arguments)
+
+        self._shards = []
+        self._shard_results = {}
+        self._partial_lines = {}
+        self._active = False
+
+        for index in range(_shard_count):
+            shard = BatchJob(
+                "{0}/{1}".format(_name, index),
+                _command,
+                _script_file,
+                _arguments,
+                self,
+            )
+            shard.stateChanged.connect(self.on_shard_state_changed)
+            shard.jobFinished.connect(self.on_shard_finished)
+            self._shards.append(shard)
+
+    @property
+    def shards(self):
+        """The shard jobs running this job."""
+        return list(self._shards)
+
+    @property
+    def running(self):
+        """Whether any shard is queued or running."""
+        return self._active
+
+    @property
+    def cacheable(self):
+        """Never, as in the command line runner, sharded jobs always run."""
+        return False
+
+    def prepare_run(self):
+        """Reset the shared work queue and the shard results.
+
+        Returns:
+            list: The shard jobs to queue
+        """
+        Core.SharedWorkQueue(
+            Core.SharedWorkQueue.get_queue_dir(self._arguments), []
+        ).reset()
+        Core.clear_job_stats(self._arguments)
+        self.open_log()
+        self._shard_results = {}
+        self._partial_lines = {}
+        self._active = True
+        self.set_state(JOB_STATE.QUEUED)
+        return self.shards
+
+    def start(self, worker_pool=None):
+        """Start all shards at once.
+
+        Args:
+            worker_pool: Optional WorkerPool to run the shards on warm workers
+        """
+        if self.running:
+            return
+
+        for shard in self.prepare_run():
+            shard.start(worker_pool)
+
+    def kill(self):
+        """Kill all running shards."""
+        if self.running:
+            self.set_state(JOB_STATE.KILLED)
+
+        for shard in self._shards:
+            shard.kill()
+
+    @Slot()
+    def on_shard_state_changed(self, state):
+        """Update the job state from the states of its shards.
+
+        Args:
+            state: New state of the shard
+        """
+        if not self._active or self._state == JOB_STATE.KILLED:
+            return
+
+        states = [shard.state for shard in self._shards]
+        if JOB_STATE.RUNNING in states or JOB_STATE.STARTING in states:
+            job_state = JOB_STATE.RUNNING
+        elif JOB_STATE.QUEUED in states:
+            job_state = JOB_STATE.QUEUED
+        else:
+            return
+
+        if job_state != self._state:
+            self.set_state(job_state)
+
+    @Slot()
+    def on_shard_finished(self, success):
+        """Finish the job once every shard finished.
+
+        Args:
+            success: Whether the shard succeeded
+        """
+        self._shard_results[self.sender()] = success
+        if len(self._shard_results) < len(self._shards):
+            return
+
+        for index in list(self._partial_lines):
+            self.append_shard_message(self._shards[index], b"\n")
+
+        self._active = False
+        self.finish(all(self._shard_results.values()))
+
+    def append_shard_message(self, shard, msg):
+        """Append shard output to the job log, prefixing it with the shard.
+
+        Args:
+            shard: Shard job the output comes from
+            msg: Raw output chunk
+        """
+        index = self._shards.index(shard)
+        lines = (self._partial_lines.pop(index, b"") + msg).split(b"\n")
+        tail = lines.pop()
+        if tail:
+            self._partial_lines[index] = tail
+
+        if lines:
+            prefix = "[{0}] ".format(index).encode("ascii")
+            self.append_message(b"".join(prefix + line + b"\n" for line in lines))
 
 
 class CommandRunnerWidget(QWidget):
@@ -273,9 +1485,14 @@ class CommandRunnerWidget(QWidget):
 
         # member variables
         self._process_list = []
+        self._job_numbers = {}
+        self._next_job_number = 0
+        self._job_scheduler = JobScheduler(1, self)
         self._commands_map = {}
-        self._commands_model = None
+        self._command_manifest = {}
+        self._command_items = {}
         self._commands_model = QStandardItemModel(self.ui.command_list_view)
+        self.ui.command_list_view.setModel(self._commands_model)
 
         self.build_command_list()
         self.build_executalbe_commands()
@@ -289,28 +1506,76 @@ class CommandRunnerWidget(QWidget):
 
         self.add_job_btn.clicked.connect(self.add_process)
         self.delete_job_btn.clicked.connect(lambda: self.remove_selected_process())
+        self.delete_all_job_btn.clicked.connect(self.reset)
+        self.run_all_job_btn.clicked.connect(self.run_all_jobs)
+        self.run_selected_job_btn.clicked.connect(self.run_selected_jobs)
 
         self.process_tableWidget.horizontalHeader().setSectionResizeMode(
             1, QHeaderView.ResizeMode.Stretch
         )
+        self.process_tableWidget.itemChanged.connect(self.on_process_item_changed)
 
     def build_command_list(self, command_path=None) -> None:
-        """Build the list of available commands.
+        """Build or refresh the list of available commands.
+
+        Only the command files added, changed or removed since the last call
+        are processed, and the model is patched in place.
 
         Args:
             command_path: Optional path to look for commands
         """
-        self._commands_map = Core.get_commands_map(command_path)
-
-        self._commands_model.clear()
+        manifest = Core.get_command_manifest(command_path)
+        added, changed, removed = Core.diff_command_manifests(
+            self._command_manifest, manifest
+        )
+        self._command_manifest = manifest
+
+        for path in removed:
+            self.remove_command_item(path)
+
+        for path in changed + added:
+            command_entry = Core.create_command_entry(manifest[path])
+            if not command_entry or not command_entry.active:
+                self.remove_command_item(path)
+                continue
+
+            widget_item = self._command_items.get(path)
+            if widget_item is None:
+                widget_item = QStandardItem()
+                self._command_items[path] = widget_item
+                self._commands_model.appendRow(widget_item)
+            else:
+                old_entry = widget_item.data(self.COMMAND_DATA_ROLE)
+                self._commands_map.pop(old_entry.label, None)
+
+            widget_item.setText(command_entry.label)
+            widget_item.setToolTip(command_entry.tooltip)
+            widget_item.setData(command_entry, self.COMMAND_DATA_ROLE)
+            self._commands_map[command_entry.label] = command_entry
+
+        if changed:
+            logger.info(f"commands changed: {changed}")
+            selection = self.ui.command_list_view.selectionModel().selection()
+            if any(
+                self._command_items.get(path)
+                and self._command_items[path].index() in selection.indexes()
+                for path in changed
+            ):
+                self.on_command_selected(selection, None)
+
+    def remove_command_item(self, path) -> None:
+        """Remove a command from the command list.
 
-        for key, item in self._commands_map.items():
-            widget_item = QStandardItem(item.label)
-            widget_item.setToolTip(item.tooltip)
-            widget_item.setData(item, self.COMMAND_DATA_ROLE)
-            self._commands_model.appendRow(widget_item)
+        Args:
+            path: Path of the command file
+        """
+        widget_item = self._command_items.pop(path, None)
+        if widget_item is None:
+            return
 
-        self.ui.command_list_view.setModel(self._commands_model)
+        command_entry = widget_item.data(self.COMMAND_DATA_ROLE)
+        self._commands_map.pop(command_entry.label, None)
+        self._commands_model.removeRow(widget_item.row())
 
     def on_command_selected(self, selected, deselected) -> None:
         """Handle command selection.
@@ -324,6 +1589,9 @@ class CommandRunnerWidget(QWidget):
         Util.clear_layout(self.ui.params_layout)
         for index in selected.indexes():
             command = self.get_command(index)
+            if not command:
+                continue
+
             command.rebuild_ui()
 
             self.ui.params_layout.addWidget(command.ui)
@@ -331,15 +1599,17 @@ class CommandRunnerWidget(QWidget):
     def get_command(self, index):
         """Get the command at the specified index.
 
+        The command module is imported the first time its command is needed.
+
         Args:
             index: Index of the command
 
         Returns:
-            Command object
+            Command object, or None if the command failed to load
         """
         qt_item = self._commands_model.item(index.row())
-        command = qt_item.data(self.COMMAND_DATA_ROLE)
-        return command
+        command_entry = qt_item.data(self.COMMAND_DATA_ROLE)
+        return command_entry.load()
 
     def add_process(self, *args):
         """Add a new process to the table.
@@ -352,6 +1622,9 @@ class CommandRunnerWidget(QWidget):
 
         cur_command_index = cur_command_index[0]
         cur_command = self.get_command(cur_command_index)
+        if not cur_command:
+            return
+
         cmd_py_path = inspect.getfile(cur_command.__class__)
         if not Path(cmd_py_path).exists():
             logger.error("cmd_py_path not existed: {0}".format(cmd_py_path))
@@ -359,17 +1632,16 @@ class CommandRunnerWidget(QWidget):
 
         command = self.command_comboBox.currentText()
         logger.info(f"command: {command}")
-        cur_time_str = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
-        arguments_json = Core.get_log_dir() / f"Arguments_{cur_time_str}.json"
         arguments = cur_command.get_parameters()
         arguments["cmd_py_path"] = cmd_py_path
+        if cur_command.cache_results:
+            arguments[JobCache.ARGUMENT] = True
+        if arguments.get("shard_count", 1) > 1:
+            arguments["shard_count"] = min(
+                arguments["shard_count"], len(arguments.get("target_files", []))
+            )
 
-        json.dump(
-            arguments,
-            open(arguments_json, "w", encoding="utf-8"),
-            indent=4,
-            ensure_ascii=False,
-        )
+        arguments_json = Core.save_arguments(arguments)
 
         executer_py = CUR_DIR / "CommandExecuter.py"
 
@@ -382,7 +1654,10 @@ class CommandRunnerWidget(QWidget):
             """
         )
 
-        name = "Job #[{0}] ".format(self.process_tableWidget.rowCount())
+        job_number = self._next_job_number
+        self._next_job_number += 1
+        name = "Job #[{0}] ".format(job_number)
+        self.process_tableWidget.blockSignals(True)
         self.process_tableWidget.setRowCount(self.process_tableWidget.rowCount() + 1)
         current_row = self.process_tableWidget.rowCount() - 1
 
@@ -423,31 +1698,51 @@ class CommandRunnerWidget(QWidget):
             current_row, PROCESS_TABLE_HEADER.RUN, run_btn
         )
 
-        process = BatchQProcess(name, command, executer_py, arguments_json)
-        process.setProcessChannelMode(QProcess.MergedChannels)
+        stats_items = {}
+        for column in (
+            PROCESS_TABLE_HEADER.WALL_TIME,
+            PROCESS_TABLE_HEADER.CPU_TIME,
+            PROCESS_TABLE_HEADER.PEAK_MEMORY,
+        ):
+            stats_items[column] = QTableWidgetItem()
+            self.process_tableWidget.setItem(current_row, column, stats_items[column])
 
-        process.readyReadStandardOutput.connect(process.read_std_out)
-        process.readyReadStandardError.connect(process.read_std_error)
+        depends_on_item = QTableWidgetItem()
+        depends_on_item.setToolTip(
+            "Numbers of the jobs to wait for, e.g. 0, 2. "
+            "The job is skipped if one of them fails."
+        )
+        self.process_tableWidget.setItem(
+            current_row, PROCESS_TABLE_HEADER.DEPENDS_ON, depends_on_item
+        )
+        self.process_tableWidget.blockSignals(False)
 
-        process.stateChanged.connect(
+        if arguments.get("shard_count", 1) > 1:
+            job = ShardedBatchJob(
+                name, command, executer_py, arguments_json, arguments["shard_count"]
+            )
+        else:
+            job = BatchJob(name, command, executer_py, arguments_json)
+
+        job.stateChanged.connect(
             lambda state: self.handle_stateChanged_cb(state, status_item, kill_btn)
         )
-        self.handle_stateChanged_cb(process.state(), status_item, kill_btn)
+        self.handle_stateChanged_cb(job.state, status_item, kill_btn)
 
-        process.finished.connect(
-            lambda state: self.handle_finished_cb(state, status_item)
+        job.jobFinished.connect(
+            lambda success: self.handle_finished_cb(success, status_item)
         )
+        job.jobFinished.connect(lambda success: self.show_stats(job, stats_items))
 
         kill_btn.clicked.connect(
-            lambda: self.kill_btn_clicked_cb(process, status_item, kill_btn)
+            lambda: self.kill_btn_clicked_cb(job, status_item, kill_btn)
         )
-        run_btn.clicked.connect(lambda: self.run_btn_clicked_cb(process))
+        run_btn.clicked.connect(lambda: self.run_btn_clicked_cb(job))
 
-        self.delete_all_job_btn.clicked.connect(self.reset)
-
-        show_stdout_btn.clicked.connect(process.show_stdout)
+        show_stdout_btn.clicked.connect(job.show_log)
 
-        self._process_list.append(process)
+        self._process_list.append(job)
+        self._job_numbers[job] = job_number
 
     def remove_selected_process(self):
         """Remove the selected process from the table.
@@ -459,72 +1754,202 @@ class CommandRunnerWidget(QWidget):
             "Delete Job", f"Are you sure you want to delete job {row}?"
         ):
             self.process_tableWidget.removeRow(row)
-            self._process_list.pop(row)
+            job = self._process_list.pop(row)
+            self._job_numbers.pop(job, None)
+            self._job_scheduler.cancel(job)
+
+            for other_row, other_job in enumerate(self._process_list):
+                if job in other_job.dependencies:
+                    other_job.set_dependencies(
+                        [
+                            dependency
+                            for dependency in other_job.dependencies
+                            if dependency is not job
+                        ]
+                    )
+                    self.show_dependencies(other_row)
 
     def reset(self):
         """Reset the process table and list.
 
         Kills all running processes, clears the table, and resets the process list.
         """
+        self._job_scheduler.clear()
         for p in self._process_list:
             p.kill()
 
         self._process_list = []
+        self._job_numbers = {}
+        self._next_job_number = 0
         self.process_tableWidget.clear()
         self.process_tableWidget.setRowCount(0)
 
-    def kill_btn_clicked_cb(self, _process, _status_item, _kill_btn):
+    def on_process_item_changed(self, item):
+        """Set the dependencies of a job from its edited "Depends On" cell.
+
+        Invalid job numbers and dependency cycles are rejected, restoring the
+        previous dependencies.
+
+        Args:
+            item: Edited table item
+        """
+        if item.column() != PROCESS_TABLE_HEADER.DEPENDS_ON:
+            return
+
+        job = self._process_list[item.row()]
+        jobs_by_number = {number: other for other, number in self._job_numbers.items()}
+        try:
+            dependencies = []
+            for token in re.split(r"[,;\s]+", item.text().replace("#", "")):
+                if not token:
+                    continue
+                dependency = jobs_by_number.get(int(token)) if token.isdigit() else None
+                if dependency is None or dependency is job:
+                    raise ValueError(f"Invalid job number: {token}")
+                if dependency not in dependencies:
+                    dependencies.append(dependency)
+
+            try:
+                Core.sort_topologically(
+                    self._process_list,
+                    lambda other: dependencies if other is job else other.dependencies,
+                )
+            except ValueError:
+                raise ValueError("The jobs would wait for each other")
+        except ValueError as e:
+            logger.error(f"{job.name}: can't depend on {item.text()}: {e}")
+        else:
+            job.set_dependencies(dependencies)
+
+        self.show_dependencies(item.row())
+
+    def show_dependencies(self, row):
+        """Show the numbers of the jobs a job depends on.
+
+        Args:
+            row: Row of the job
+        """
+        item = self.process_tableWidget.item(row, PROCESS_TABLE_HEADER.DEPENDS_ON)
+        if item is None:
+            return
+
+        self.process_tableWidget.blockSignals(True)
+        item.setText(
+            ", ".join(
+                str(self._job_numbers[dependency])
+                for dependency in self._process_list[row].dependencies
+            )
+        )
+        self.process_tableWidget.blockSignals(False)
+
+    def kill_btn_clicked_cb(self, _job, _status_item, _kill_btn):
         """Handle kill button click.
 
-        Kills the process and updates the status item.
+        Kills the job and updates the status item.
 
         Args:
-            _process: Process to kill
+            _job: Job to kill
             _status_item: Status item to update
             _kill_btn: Kill button
         """
-        _process.kill()
+        self._job_scheduler.cancel(_job)
+        _job.kill()
         _kill_btn.setText("Killed")
-        _status_item.setText(str(_process.ProcessState))
+        _status_item.setText(_job.state)
 
-    def handle_finished_cb(self, state, _status_item):
-        """Handle process finished.
+    def handle_finished_cb(self, success, _status_item):
+        """Handle job finished.
 
-        Updates the status item.
+        Colors the status item by the job result.
 
         Args:
-            state: Process state
+            success: Whether the job succeeded
             _status_item: Status item to update
         """
-        _status_item.setText("Finished!")
+        _status_item.setForeground(
+            JOB_STATE_COLOR.get(_status_item.text(), NORMAL_COLOR)
+        )
+
+    def show_stats(self, _job, _stats_items):
+        """Show the resource usage of a finished job.
+
+        Args:
+            _job: Finished job
+            _stats_items: Table items of the stats columns
+        """
+        stats = _job.stats
+        for item in _stats_items.values():
+            item.setText("")
+            item.setToolTip("")
+        if not stats:
+            return
+
+        tooltip = (
+            "processes: {processes}\n"
+            "import: {import_time:.2f} s\n"
+            "run: {run_time:.2f} s\n"
+            "user CPU: {user_time:.2f} s\n"
+            "system CPU: {system_time:.2f} s"
+        ).format(**stats)
+
+        _stats_items[PROCESS_TABLE_HEADER.WALL_TIME].setText(
+            "{0:.2f} s".format(stats["wall_time"])
+        )
+        _stats_items[PROCESS_TABLE_HEADER.CPU_TIME].setText(
+            "{0:.2f} s".format(stats["user_time"] + stats["system_time"])
+        )
+        _stats_items[PROCESS_TABLE_HEADER.PEAK_MEMORY].setText(
+            "{0:.1f} MB".format(stats["peak_rss"] / (1024 * 1024))
+        )
+        for item in _stats_items.values():
+            item.setToolTip(tooltip)
 
     def handle_stateChanged_cb(self, state, _status_item, _kill_btn):
-        """Handle process state change.
+        """Handle job state change.
 
         Updates the status item and kill button.
 
         Args:
-            state: Process state
+            state: Job state
             _status_item: Status item to update
             _kill_btn: Kill button to update
         """
-        _status_item.setText(STATUS_STR[state])
-
-        if STATUS_STR[state] == "Running":
+        _status_item.setText(state)
+        _status_item.setForeground(NORMAL_COLOR)
+
+        if state in (
+            JOB_STATE.WAITING,
+            JOB_STATE.CHECKING,
+            JOB_STATE.QUEUED,
+            JOB_STATE.RUNNING,
+        ):
             _kill_btn.setEnabled(True)
             _kill_btn.setText("Terminated")
         else:
             _kill_btn.setEnabled(False)
 
-    def run_btn_clicked_cb(self, _process):
+    def run_btn_clicked_cb(self, _job):
         """Handle run button click.
 
-        Starts the process.
+        Queues the job, it starts as soon as a job slot is free.
 
         Args:
-            _process: Process to start
+            _job: Job to start
         """
-        _process.do_start()
+        self._job_scheduler.submit([_job])
+
+    def run_all_jobs(self):
+        """Queue every job that has not been run yet, in dependency order."""
+        self._job_scheduler.submit(
+            [job for job in self._process_list if job.state == JOB_STATE.NOT_RUNNING]
+        )
+
+    def run_selected_jobs(self):
+        """Queue the jobs of the selected rows."""
+        rows = sorted(
+            {index.row() for index in self.process_tableWidget.selectedIndexes()}
+        )
+        self._job_scheduler.submit([self._process_list[row] for row in rows])
 
     def open_settings(self):
         """Open the settings dialog.
@@ -539,10 +1964,26 @@ class CommandRunnerWidget(QWidget):
     def build_executalbe_commands(self):
         """Build the executable commands.
 
-        Builds the list of executable commands from the configuration.
+        Builds the list of executable commands from the configuration, sets
+        the number of parallel jobs, builds the warm worker pool if
+        "warm_workers" is set and the job cache unless "job_cache_size_mb" is 0.
         """
         config = Core.get_command_config()
         logger.info("config: {0}".format(config))
+
+        self._job_scheduler.max_jobs = config["max_parallel_jobs"]
+
+        if self._job_scheduler.worker_pool:
+            self._job_scheduler.worker_pool.shutdown()
+            self._job_scheduler.worker_pool = None
+
+        if config["warm_workers"] > 0:
+            self._job_scheduler.worker_pool = WorkerPool(
+                CUR_DIR / "CommandExecuter.py", config["warm_workers"], self
+            )
+
+        self._job_scheduler.job_cache = JobCache.from_config(config)
+
         all_commands = config["command"]
         self.command_comboBox.clear()
 
@@ -0,0 +1,65 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# modules in src import each other as top-level modules, e.g. "import Core"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+class OverlapGate:
+    """Holds every call until "overlap" of them are in flight at once.
+
+    Lets tests check that calls overlap without timing them: a call that is
+    never joined by the others is released after the timeout, and the test
+    sees a lower max_active.
+
+    Args:
+        overlap (int, optional): Number of calls to hold until
+        timeout (float, optional): Longest time a call waits for the others
+    """
+
+    def __init__(self, overlap: int = 1, timeout: float = 2):
+        self.overlap = overlap
+        self.timeout = timeout
+        self.active = 0
+        self.max_active = 0
+        self._condition = threading.Condition()
+
+    def __enter__(self):
+        with self._condition:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self._condition.notify_all()
+            self._condition.wait_for(
+                lambda: self.max_active >= self.overlap, self.timeout
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        with self._condition:
+            self.active -= 1
+
+
+@pytest.fixture
+def overlap_gate():
+    return OverlapGate()
+
+
+@pytest.fixture
+def temp_file_tree(tmp_path):
+    for relative_path in [
+        "a.ma",
+        "b.fbx",
+        "Chars/hero.ma",
+        "Chars/hero.MA",
+        "Chars/Props/sword.ma",
+        "Chars/Props/sword.fbx",
+        "Env/forest.ma",
+        "Env/deep/deeper/rock.ma",
+    ]:
+        file_path = tmp_path / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text("")
+    return tmp_path
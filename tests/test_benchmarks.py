@@ -0,0 +1,30 @@
+import json
+
+from benchmarks import run_benchmarks
+
+
+def test_run_benchmarks_quick(tmp_path):
+    names = ["get_command_manifest_cold", "execute_in_process", "load_arguments"]
+    output_path = tmp_path / "results.json"
+
+    assert run_benchmarks.main(["--quick", "--output", str(output_path)] + names) == 0
+
+    results = json.loads(output_path.read_text())
+    assert results["quick"]
+    assert list(results["benchmarks"]) == names
+    for result in results["benchmarks"].values():
+        assert result["repeat"] == len(result["timings"])
+        assert 0 <= result["min"] <= result["median"]
+
+
+def test_compare_results_reports_slower(capsys):
+    old = {"benchmarks": {"a": {"params": {}, "median": 1.0}}}
+    new = {
+        "benchmarks": {
+            "a": {"params": {}, "median": 1.5},
+            "b": {"params": {}, "median": 1.0},
+        }
+    }
+
+    assert run_benchmarks.compare_results(old, new, 1.2) == ["a"]
+    assert "SLOWER" in capsys.readouterr().out
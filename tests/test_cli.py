@@ -0,0 +1,150 @@
+import json
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pytest
+
+import CommandRunnerCLI
+from Core import CommandEntry, get_interpreter_arguments, parse_command_file
+from JobCache import JobCache
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+
+@pytest.fixture
+def command_entry(tmp_path):
+    cmd_file = tmp_path / "Cmd_Params.py"
+    cmd_content = """
+from dataclasses import dataclass, field
+
+from CommandBase import CommandBase
+
+
+@dataclass
+class Cmd_Params(CommandBase):
+    label = "params"
+
+    count: int = field(default=3)
+    ratio: float = 0.5
+    name: str = "abc"
+    items: list = field(default=None)
+"""
+    cmd_file.write_text(cmd_content)
+    return CommandEntry(parse_command_file(cmd_file))
+
+
+def test_build_parameters(command_entry):
+    parameters = CommandRunnerCLI.build_parameters(
+        command_entry,
+        ["count=5", "name=42", "items=[1, 2]"],
+        {"target_files": ["a.ma"]},
+    )
+
+    assert parameters["count"] == 5
+    assert parameters["ratio"] == 0.5
+    assert parameters["name"] == "42"
+    assert parameters["items"] == [1, 2]
+    assert parameters["target_files"] == ["a.ma"]
+    assert parameters["cmd_py_path"] == command_entry.path.as_posix()
+
+
+def test_build_parameters_invalid_override(command_entry):
+    with pytest.raises(ValueError):
+        CommandRunnerCLI.build_parameters(command_entry, ["count"])
+
+
+def test_find_command(command_entry):
+    commands = {"params": command_entry}
+
+    assert CommandRunnerCLI.find_command(commands, "params") is command_entry
+    assert CommandRunnerCLI.find_command(commands, "Cmd_Params") is command_entry
+    assert CommandRunnerCLI.find_command(commands, "Params") is command_entry
+    assert CommandRunnerCLI.find_command(commands, "missing") is None
+
+
+def test_get_interpreter_arguments():
+    arguments = get_interpreter_arguments(
+        "C:/Blender 4.3/blender.exe --background --python", Path("run.py")
+    )
+    assert arguments == [
+        "C:/Blender 4.3/blender.exe",
+        "--background",
+        "--python",
+        "run.py",
+    ]
+
+
+def test_import_without_qt():
+    code = (
+        "import sys, CommandRunnerCLI; "
+        "print(any(m.split('.')[0] in ('Qt', 'qtawesome', 'Util', 'PySide6') "
+        "for m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "False"
+
+
+def test_run_cached_job(tmp_path):
+    command_file = tmp_path / "Cmd_Cached.py"
+    command_file.write_text("print('cached')\n")
+    arguments = {"cmd_py_path": command_file.as_posix(), "cache_results": True}
+    job_cache = JobCache(1024 * 1024, cache_dir=tmp_path / "cache")
+    runs = []
+
+    def run(job):
+        runs.append(job.name)
+        job.log_path.write_text("ran {0}\n".format(job.name))
+        return job.name != "failed"
+
+    def run_job(name, **kwargs):
+        arguments_json = tmp_path / "{0}.json".format(name)
+        arguments_json.write_text(json.dumps({**arguments, **kwargs}))
+        job = CommandRunnerCLI.CLIJob(name, arguments_json)
+        job.success = CommandRunnerCLI.run_cached_job(job_cache, "python", job, run)
+        return job
+
+    # failed runs are not stored
+    assert not run_job("failed", value=1).success
+    assert not run_job("failed", value=1).cached
+    assert runs == ["failed", "failed"]
+
+    assert not run_job("first", value=2).cached
+    second = run_job("second", value=2)
+    assert second.success and second.cached
+    assert runs == ["failed", "failed", "first"]
+    assert second.log_path.read_text().splitlines()[1:] == ["ran first"]
+
+    # a broken cache runs the job instead
+    (tmp_path / "cache" / "index.sqlite").write_text("not a database")
+    third = run_job("third", value=2)
+    assert third.success and not third.cached
+    assert runs[-1] == "third"
+
+
+def test_build_parameters_not_static(command_entry, monkeypatch):
+    @dataclass
+    class Base:
+        count: int = 3
+
+    @dataclass
+    class Cmd_Params(Base):
+        items: list = field(default_factory=lambda: [1, 2])
+
+    command_entry.record["static"] = False
+    monkeypatch.setattr(command_entry, "load", Cmd_Params)
+    parameters = CommandRunnerCLI.build_parameters(command_entry, ["count=5"])
+
+    assert parameters["count"] == 5
+    assert parameters["items"] == [1, 2]
+
+    monkeypatch.setattr(command_entry, "load", lambda: None)
+    with pytest.raises(ValueError, match="Failed to import"):
+        CommandRunnerCLI.build_parameters(command_entry, [])
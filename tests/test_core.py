@@ -1,19 +1,30 @@
 import json
 import logging
+from pathlib import Path
 
 import pytest
 
+from Records import RECORD_FORMATS
 from src.Core import (
+    OutdatedFiles,
+    SharedWorkQueue,
     add_file_logger,
+    diff_command_manifests,
     generate_html_content_with_links,
     generate_html_content_with_text,
+    generate_html_report_with_links,
     get_command_config,
+    get_command_entries,
+    get_command_manifest,
     get_commands_map,
     get_config_dir,
     get_log_dir,
     get_logger,
+    get_scene_output_path,
     load_config,
+    parse_command_file,
     save_config,
+    sort_topologically,
 )
 
 
@@ -43,6 +54,39 @@ class Cmd_Test:
     return commands_dir
 
 
+@pytest.fixture
+def temp_cache_dir(monkeypatch, tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    monkeypatch.setattr("src.Core.get_cache_dir", lambda: cache_dir)
+    return cache_dir
+
+
+@pytest.fixture
+def temp_dataclass_command(temp_commands_dir):
+    cmd_file = temp_commands_dir / "Cmd_Fields.py"
+    cmd_content = """
+from dataclasses import dataclass, field
+
+import heavy_module_that_is_not_installed
+
+from CommandBase import CommandBase
+
+
+@dataclass
+class Cmd_Fields(CommandBase):
+    label = "fields"
+    tooltip = "has fields"
+    ui_class = "CmdUI_FileCollector"
+
+    count: int = field(default=3, metadata={"help": "a count"})
+    name: str = "abc"
+    choice: str = field(default="a", metadata={"items": ["a", "b"]})
+"""
+    cmd_file.write_text(cmd_content)
+    return cmd_file
+
+
 @pytest.fixture
 def temp_args_json(tmp_path):
     args_data = {
@@ -92,6 +136,8 @@ def test_get_command_config(monkeypatch, temp_config_file):
     assert "command" in config
     assert isinstance(config["command"], list)
     assert all(isinstance(cmd, str) for cmd in config["command"])
+    assert config["max_parallel_jobs"] >= 1
+    assert config["warm_workers"] == 0
 
 
 def test_get_commands_map(temp_commands_dir):
@@ -99,6 +145,153 @@ def test_get_commands_map(temp_commands_dir):
     assert isinstance(commands, dict)
 
 
+def test_parse_command_file(temp_dataclass_command):
+    record = parse_command_file(temp_dataclass_command)
+
+    assert record["static"]
+    assert record["label"] == "fields"
+    assert record["ui_class"] == "CmdUI_FileCollector"
+    assert record["active"] is True
+    assert record["Category"] == "General"
+    assert record["fields"] == [
+        {"name": "count", "type": "int", "default": 3, "metadata": {"help": "a count"}},
+        {"name": "name", "type": "str", "default": "abc", "metadata": {}},
+        {
+            "name": "choice",
+            "type": "str",
+            "default": "a",
+            "metadata": {"items": ["a", "b"]},
+        },
+    ]
+
+
+def test_parse_command_file_not_static(temp_commands_dir):
+    cmd_file = temp_commands_dir / "Cmd_Dynamic.py"
+    cmd_file.write_text("class Cmd_Dynamic:\n    label = 'dyn' + 'amic'\n")
+
+    assert not parse_command_file(cmd_file)["static"]
+    assert parse_command_file(temp_commands_dir / "Cmd_Test.py")["label"] == "test"
+
+
+def test_parse_command_file_shared_constants(temp_commands_dir):
+    cmd_file = temp_commands_dir / "Cmd_Formats.py"
+    cmd_file.write_text(
+        "import Records\n"
+        "@dataclass\n"
+        "class Cmd_Formats(CommandBase):\n"
+        "    label = 'formats'\n"
+        "    all: str = field(metadata={'items': Records.RECORD_FORMATS})\n"
+        "    json: str = field(metadata={'items': ['json', *Records.RECORD_FORMATS]})\n"
+        "    missing: str = field(metadata={'items': Records.NO_SUCH_FORMATS})\n"
+    )
+
+    record = parse_command_file(cmd_file)
+    assert not record["static"]
+    assert [field["metadata"]["items"] for field in record["fields"]] == [
+        RECORD_FORMATS,
+        ["json", *RECORD_FORMATS],
+    ]
+
+    cmd_file.write_text(cmd_file.read_text().rsplit("    missing", 1)[0])
+    assert parse_command_file(cmd_file)["static"]
+
+
+def test_get_command_manifest_is_cached(
+    monkeypatch, temp_cache_dir, temp_commands_dir, temp_dataclass_command
+):
+    manifest = get_command_manifest(temp_commands_dir)
+    assert len(manifest) == 2
+    assert list(temp_cache_dir.glob("CommandManifest_*.json"))
+
+    def fail_parse(command_file):
+        raise AssertionError(f"{command_file} should not be parsed again")
+
+    monkeypatch.setattr("src.Core.parse_command_file", fail_parse)
+    assert get_command_manifest(temp_commands_dir) == manifest
+
+
+def test_get_command_entries_does_not_import(
+    temp_cache_dir, temp_commands_dir, temp_dataclass_command
+):
+    entries = get_command_entries(temp_commands_dir)
+
+    assert set(entries) == {"test", "fields"}
+    assert entries["fields"].tooltip == "has fields"
+    assert not entries["fields"].loaded
+    assert [f["name"] for f in entries["fields"].fields] == ["count", "name", "choice"]
+
+
+def test_diff_command_manifests():
+    old = {"a.py": {"sha1": "1"}, "b.py": {"sha1": "2"}, "c.py": {"sha1": "3"}}
+    new = {"a.py": {"sha1": "1"}, "b.py": {"sha1": "22"}, "d.py": {"sha1": "4"}}
+
+    added, changed, removed = diff_command_manifests(old, new)
+    assert added == ["d.py"]
+    assert changed == ["b.py"]
+    assert removed == ["c.py"]
+
+
+def test_shared_work_queue(tmp_path):
+    queue_dir = SharedWorkQueue.get_queue_dir(tmp_path / "Arguments.json")
+    items = [f"file_{i}" for i in range(10)]
+    queue_a = SharedWorkQueue(queue_dir, items)
+    queue_b = SharedWorkQueue(queue_dir, items)
+
+    iter_a, iter_b = iter(queue_a), iter(queue_b)
+    taken = [next(iter_a), next(iter_b), next(iter_b)]
+    taken += list(iter_a) + list(iter_b)
+
+    assert sorted(taken) == sorted(items)
+    assert queue_a.claimed + queue_b.claimed == len(items)
+    assert queue_b.claimed == 2
+
+    queue_a.reset()
+    assert list(SharedWorkQueue(queue_dir, items)) == items
+
+
+def test_get_scene_output_path(tmp_path):
+    scene_a = (tmp_path / "a" / "scene.ma").as_posix()
+    scene_b = (tmp_path / "b" / "scene.ma").as_posix()
+
+    assert get_scene_output_path(scene_a, "", "_nodes.jsonl") == (
+        (tmp_path / "a" / "scene_nodes.jsonl").as_posix()
+    )
+
+    output_dir = (tmp_path / "out").as_posix()
+    output_a = get_scene_output_path(scene_a, output_dir, "_nodes.jsonl")
+    output_b = get_scene_output_path(scene_b, output_dir, "_nodes.jsonl")
+    assert output_a != output_b
+    assert Path(output_a).parent == tmp_path / "out"
+    assert Path(output_a).name.startswith("scene_")
+    assert get_scene_output_path(scene_a, output_dir, "_nodes.jsonl") == output_a
+
+
+def test_outdated_files(tmp_path):
+    target_files = []
+    for name in ("a", "b", "c"):
+        target_file = tmp_path / f"{name}.ma"
+        target_file.write_text("scene")
+        target_files.append(target_file.as_posix())
+    (tmp_path / "a.ma.out").write_text("up to date")
+
+    outdated = OutdatedFiles(
+        target_files,
+        lambda target_file: (
+            None if target_file.endswith("c.ma") else target_file + ".out"
+        ),
+    )
+    assert len(outdated) == 2
+    for _ in range(2):
+        assert list(outdated) == target_files[1:]
+        assert outdated.skipped == 1
+
+    queue = SharedWorkQueue(tmp_path / "queue", target_files)
+    assert len(queue) == 3
+    # counting doesn't claim any file
+    assert len(OutdatedFiles(queue, outdated.get_output_path)) == 2
+    assert list(queue) == target_files
+
+
 def test_add_file_logger(tmp_path):
     log_file = tmp_path / "test.log"
     add_file_logger(log_file)
@@ -130,9 +323,49 @@ def test_generate_html_content_with_links_no_votes():
     assert "Votes:" not in html
 
 
+def test_generate_html_report_with_links():
+    sections = [
+        (
+            "[0] rain",
+            [{"Link": "http://example.com/a", "Title": "A & B", "Votes": "CNA"}],
+        ),
+        ("[1] <quake>", []),
+    ]
+    html = generate_html_report_with_links(sections, "Trends", votes_label="Source")
+
+    assert html.count("<h1>Trends</h1>") == 1
+    assert '<a href="#section-0">[0] rain</a>' in html
+    assert '<h2 id="section-1">[1] &lt;quake&gt;</h2>' in html
+    assert ">A &amp; B</a>" in html
+    assert "Source: CNA" in html
+
+
 def test_generate_html_content_with_text():
     html = generate_html_content_with_text("Test content", "Test Title")
 
     assert "Test Title" in html
     assert "Test content" in html
     assert "<!DOCTYPE html>" in html
+
+
+def test_sort_topologically():
+    dependencies = {
+        "dump": [],
+        "aggregate": ["dump", "fetch"],
+        "fetch": [],
+        "report": ["aggregate"],
+    }
+    order = sort_topologically(
+        ["report", "aggregate", "dump", "fetch"], dependencies.get
+    )
+    assert order == ["dump", "fetch", "aggregate", "report"]
+
+    # dependencies that are not sorted are ignored
+    assert sort_topologically(["report", "aggregate"], dependencies.get) == [
+        "aggregate",
+        "report",
+    ]
+
+    dependencies["dump"] = ["report"]
+    with pytest.raises(ValueError):
+        sort_topologically(["dump", "aggregate", "fetch", "report"], dependencies.get)
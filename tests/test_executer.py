@@ -0,0 +1,166 @@
+import json
+import os
+import types
+
+import pytest
+
+import CommandExecuter
+from Core import read_job_stats, summarize_job_stats
+
+
+class Cmd_Noop:
+    def run(self, data={}):
+        pass
+
+
+def write_arguments(tmp_path, cmd_py_path):
+    arguments_json = tmp_path / "Arguments.json"
+    arguments_json.write_text(json.dumps({"cmd_py_path": cmd_py_path}))
+    return arguments_json
+
+
+def test_execute_writes_job_stats(tmp_path, monkeypatch):
+    command_module = types.ModuleType("Commands.Cmd_Noop")
+    command_module.Cmd_Noop = Cmd_Noop
+    monkeypatch.setattr(
+        CommandExecuter, "import_command_module", lambda cmd, path: command_module
+    )
+    arguments_json = write_arguments(tmp_path, "Commands/Cmd_Noop.py")
+
+    assert CommandExecuter.execute(str(arguments_json))
+    assert CommandExecuter.execute(str(arguments_json))
+
+    records = read_job_stats(arguments_json)
+    assert len(records) == 2
+    assert records[0]["command"] == "Cmd_Noop"
+    assert records[0]["success"]
+    assert records[0]["wall_time"] >= records[0]["run_time"] >= 0
+
+    stats = summarize_job_stats(records)
+    assert stats["processes"] == 2
+    assert stats["user_time"] == records[0]["user_time"] + records[1]["user_time"]
+
+
+def test_execute_records_failed_import(tmp_path):
+    arguments_json = write_arguments(tmp_path, (tmp_path / "Cmd_Missing.py").as_posix())
+
+    assert not CommandExecuter.execute(str(arguments_json))
+
+    (record,) = read_job_stats(arguments_json)
+    assert record["command"] == "Cmd_Missing"
+    assert not record["success"]
+
+
+class Cmd_Convert:
+    def get_output_path(self, target_file, data):
+        return target_file + ".out"
+
+    def run(self, data={}):
+        for target_file in data["target_files"]:
+            with open(target_file + ".out", "w") as f:
+                f.write("converted")
+
+
+def test_execute_incremental_skips_up_to_date_files(tmp_path, monkeypatch):
+    command_module = types.ModuleType("Commands.Cmd_Convert")
+    command_module.Cmd_Convert = Cmd_Convert
+    monkeypatch.setattr(
+        CommandExecuter, "import_command_module", lambda cmd, path: command_module
+    )
+    target_files = [tmp_path / "a.ma", tmp_path / "b.ma", tmp_path / "c.ma"]
+    for target_file in target_files:
+        target_file.write_text("scene")
+
+    arguments_json = tmp_path / "Arguments.json"
+    arguments_json.write_text(
+        json.dumps(
+            {
+                "cmd_py_path": "Commands/Cmd_Convert.py",
+                "target_files": [path.as_posix() for path in target_files],
+                "incremental": True,
+            }
+        )
+    )
+    assert CommandExecuter.execute(str(arguments_json))
+
+    outputs = [tmp_path / f"{path.name}.out" for path in target_files]
+    for output in outputs:
+        output.write_text("previous run")
+    stat = outputs[1].stat()
+    os.utime(target_files[1], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    outputs[2].unlink()
+
+    assert CommandExecuter.execute(str(arguments_json))
+    assert [output.exists() and output.read_text() for output in outputs] == [
+        "previous run",
+        "converted",
+        "converted",
+    ]
+
+    # every output is recorded for the job cache, skipped files included
+    assert read_job_stats(arguments_json)[-1]["outputs"] == [
+        output.as_posix() for output in outputs
+    ]
+
+
+def test_execute_fails_on_shared_outputs(tmp_path, monkeypatch):
+    class Cmd_Shared(Cmd_Convert):
+        def get_output_path(self, target_file, data):
+            return (tmp_path / "out" / os.path.basename(target_file)).as_posix()
+
+    command_module = types.ModuleType("Commands.Cmd_Shared")
+    command_module.Cmd_Shared = Cmd_Shared
+    monkeypatch.setattr(
+        CommandExecuter, "import_command_module", lambda cmd, path: command_module
+    )
+    target_files = [tmp_path / "a" / "scene.ma", tmp_path / "b" / "scene.ma"]
+    for target_file in target_files:
+        target_file.parent.mkdir()
+        target_file.write_text("scene")
+
+    arguments_json = tmp_path / "Arguments.json"
+    arguments_json.write_text(
+        json.dumps(
+            {
+                "cmd_py_path": "Commands/Cmd_Shared.py",
+                # the same file listed twice is no clash
+                "target_files": [target_files[0].as_posix()] * 2,
+            }
+        )
+    )
+    assert CommandExecuter.execute(str(arguments_json))
+
+    arguments = json.loads(arguments_json.read_text())
+    arguments["target_files"].append(target_files[1].as_posix())
+    arguments_json.write_text(json.dumps(arguments))
+    (target_files[0].parent / "scene.ma.out").unlink()
+    assert not CommandExecuter.execute(str(arguments_json))
+    # nothing was written
+    assert not (target_files[0].parent / "scene.ma.out").exists()
+
+
+def test_execute_resets_peak_rss_per_job(tmp_path, monkeypatch):
+    class Cmd_Allocate:
+        def run(self, data={}):
+            if data.get("allocate"):
+                block = bytearray(64 * 1024 * 1024)
+                block[::4096] = b"x" * len(block[::4096])
+
+    command_module = types.ModuleType("Commands.Cmd_Allocate")
+    command_module.Cmd_Allocate = Cmd_Allocate
+    monkeypatch.setattr(
+        CommandExecuter, "import_command_module", lambda cmd, path: command_module
+    )
+    large_json = tmp_path / "Large.json"
+    large_json.write_text(json.dumps({"cmd_py_path": "Cmd_Allocate.py", "allocate": 1}))
+    small_json = tmp_path / "Small.json"
+    small_json.write_text(json.dumps({"cmd_py_path": "Cmd_Allocate.py"}))
+
+    assert CommandExecuter.execute(str(large_json))
+    assert CommandExecuter.execute(str(small_json))
+
+    (large,) = read_job_stats(large_json)
+    (small,) = read_job_stats(small_json)
+    if large["peak_rss_scope"] != "job":
+        pytest.skip("the peak memory can't be reset on this platform")
+    assert large["peak_rss"] - small["peak_rss"] > 32 * 1024 * 1024
@@ -0,0 +1,167 @@
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+import FileIndex
+from FileIndex import (
+    DirectoryIndex,
+    FileFilter,
+    iter_collected_files,
+    iter_directory_files,
+    split_file_extensions,
+)
+
+
+def walk_collected_files(directory, file_ext, file_filters):
+    # what FileCollectorWidget collected with os.walk before
+    all_targets = [
+        Path(dp).joinpath(f).as_posix()
+        for dp, dn, filenames in os.walk(directory)
+        for f in filenames
+        if file_ext == "*.*" or os.path.splitext(f)[1].lower() == file_ext
+    ]
+    matched = [
+        target
+        for target in all_targets
+        if any(file_filter.lower() in target.lower() for file_filter in file_filters)
+    ]
+    return matched, len(all_targets)
+
+
+@pytest.mark.parametrize(
+    "file_ext, file_filters",
+    [("*.*", [""]), (".ma", [""]), (".ma", ["chars", "ROCK"]), (".fbx", ["nothing"])],
+)
+def test_iter_collected_files_matches_os_walk(temp_file_tree, file_ext, file_filters):
+    chunks = list(
+        iter_collected_files(str(temp_file_tree), file_ext, file_filters, chunk_size=2)
+    )
+    matched = [path for chunk, total in chunks for path in chunk]
+
+    expected_matched, expected_total = walk_collected_files(
+        temp_file_tree, file_ext, file_filters
+    )
+    assert sorted(matched) == sorted(expected_matched)
+    assert chunks[-1][1] == expected_total
+    assert all(len(chunk) <= 2 for chunk, total in chunks)
+
+
+@pytest.mark.parametrize(
+    "file_ext, file_filters, expected",
+    [
+        (".ma;.fbx", ["sword"], ["Chars/Props/sword.ma", "Chars/Props/sword.fbx"]),
+        ("*.*", ["*.FBX"], ["b.fbx", "Chars/Props/sword.fbx"]),
+        (".ma", ["env/*/rock.ma"], ["Env/deep/deeper/rock.ma"]),
+        (".ma", ["s/h"], ["Chars/hero.ma", "Chars/hero.MA"]),
+        (".ma", ["re:/[a-c]\\.MA$"], ["a.ma"]),
+        (".ma", ["!chars", "!deep"], ["a.ma", "Env/forest.ma"]),
+        (".ma", ["hero", "sword", "!PROPS"], ["Chars/hero.ma", "Chars/hero.MA"]),
+        (".fbx", ["", " "], ["b.fbx", "Chars/Props/sword.fbx"]),
+    ],
+)
+def test_file_filter(temp_file_tree, file_ext, file_filters, expected):
+    root = temp_file_tree.as_posix()
+    matched = [
+        path
+        for chunk, total in iter_collected_files(root, file_ext, file_filters)
+        for path in chunk
+    ]
+    assert sorted(matched) == sorted(f"{root}/{path}" for path in expected)
+
+
+def test_split_file_extensions():
+    assert split_file_extensions("*.*") == ()
+    assert split_file_extensions(".MA; mb,*.fbx") == (".ma", ".mb", ".fbx")
+    assert FileFilter(["!x"], ".ma").filter_extensions(["a.Ma", "b.fbx"]) == ["a.Ma"]
+
+
+def test_iter_collected_files_cancel(temp_file_tree):
+    cancel_event = threading.Event()
+    chunks = iter_collected_files(
+        str(temp_file_tree), chunk_size=1, cancel_event=cancel_event
+    )
+    next(chunks)
+    cancel_event.set()
+    assert list(chunks) == []
+
+
+def set_old_mtimes(root, mtime_ns):
+    # make every directory look unmodified for longer than RACY_SECONDS
+    for dir_path, dir_names, file_names in os.walk(root):
+        os.utime(dir_path, ns=(mtime_ns, mtime_ns))
+
+
+def test_directory_index_walk(monkeypatch, temp_file_tree, tmp_path_factory):
+    index_path = tmp_path_factory.mktemp("index") / "index.sqlite"
+    set_old_mtimes(temp_file_tree, 10**18)
+
+    expected = sorted(iter_directory_files(str(temp_file_tree)))
+    index = DirectoryIndex(str(temp_file_tree), index_path)
+    assert sorted(index.walk()) == expected
+
+    scanned = []
+    scan_directory = FileIndex.scan_directory
+    monkeypatch.setattr(
+        FileIndex,
+        "scan_directory",
+        lambda dir_path: scanned.append(dir_path) or scan_directory(dir_path),
+    )
+
+    # nothing changed, so nothing is scanned again
+    assert sorted(index.walk()) == expected
+    assert scanned == []
+
+    (temp_file_tree / "Chars" / "Props" / "shield.ma").write_text("")
+    (temp_file_tree / "Env" / "new").mkdir()
+    (temp_file_tree / "Env" / "new" / "tree.ma").write_text("")
+    for path in (temp_file_tree / "Env" / "deep").rglob("*"):
+        if path.is_file():
+            path.unlink()
+    for path in sorted((temp_file_tree / "Env" / "deep").rglob("*"), reverse=True):
+        path.rmdir()
+    (temp_file_tree / "Env" / "deep").rmdir()
+    for changed_dir in ("Chars/Props", "Env", "Env/new"):
+        set_old_mtimes(temp_file_tree / changed_dir, 11 * 10**17)
+
+    # without refresh the index is used as is
+    assert sorted(index.walk(refresh=False)) == expected
+    assert scanned == []
+
+    expected = sorted(iter_directory_files(str(temp_file_tree)))
+    scanned.clear()
+    assert sorted(index.walk()) == expected
+    root = temp_file_tree.as_posix()
+    assert sorted(scanned) == [
+        root + "/Chars/Props",
+        root + "/Env",
+        root + "/Env/new",
+    ]
+
+
+def test_directory_index_collect(temp_file_tree, tmp_path_factory):
+    index = DirectoryIndex(
+        str(temp_file_tree), tmp_path_factory.mktemp("index") / "index.sqlite"
+    )
+    chunks = list(
+        iter_collected_files(
+            str(temp_file_tree),
+            ".ma",
+            ["chars"],
+            directory_files=index.walk(file_ext=".ma"),
+        )
+    )
+    matched = [path for chunk, total in chunks for path in chunk]
+
+    expected_matched, expected_total = walk_collected_files(
+        temp_file_tree, ".ma", ["chars"]
+    )
+    assert sorted(matched) == sorted(expected_matched)
+    assert chunks[-1][1] == expected_total
+
+    # the second walk reads the file names from the index
+    assert sorted(index.walk(refresh=False, file_ext=".fbx")) == sorted(
+        (dir_path, [name for name in file_names if name.endswith(".fbx")])
+        for dir_path, file_names in iter_directory_files(str(temp_file_tree))
+    )
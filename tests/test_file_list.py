@@ -0,0 +1,84 @@
+import pytest
+
+from FileList import (
+    PackedPathList,
+    find_missing_files,
+    iter_file_list,
+    load_file_list,
+    save_file_list,
+    summarize_missing_files,
+)
+
+
+def test_packed_path_list():
+    paths = PackedPathList(["C:/a.ma", "/b/\u00e9t\u00e9.ma"])
+    paths.extend([])
+    paths.extend(["c.fbx", ""])
+
+    assert len(paths) == 4
+    assert paths[1] == "/b/\u00e9t\u00e9.ma"
+    assert paths[-2] == "c.fbx"
+    assert paths[3] == ""
+    with pytest.raises(IndexError):
+        paths[4]
+
+    assert paths.get_range(1, 3) == ["/b/\u00e9t\u00e9.ma", "c.fbx"]
+    assert paths.get_range(3, 10) == [""]
+    assert paths.get_range(2, 2) == []
+    assert list(paths) == ["C:/a.ma", "/b/\u00e9t\u00e9.ma", "c.fbx", ""]
+    assert paths.to_bytes() == "C:/a.ma\n/b/\u00e9t\u00e9.ma\nc.fbx\n".encode("utf-8")
+
+    paths.clear()
+    assert len(paths) == 0
+    assert list(paths) == []
+    assert paths.to_bytes() == b""
+
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_file_list_round_trip(tmp_path, compression):
+    paths = [f"/assets/d{i // 100}/f\u00e9_{i}.ma" for i in range(1000)]
+    file_path = tmp_path / "scenes.filelist"
+    save_file_list(file_path, PackedPathList(paths), compression)
+
+    assert list(load_file_list(file_path)) == paths
+    chunks = list(iter_file_list(file_path, block_size=1000))
+    assert len(chunks) > 1
+    assert [path for chunk in chunks for path in chunk] == paths
+
+    with open(file_path, "rb") as f:
+        data = f.read()
+    with open(file_path, "wb") as f:
+        f.write(data[: len(data) // 2])
+    with pytest.raises(ValueError):
+        load_file_list(file_path)
+
+
+def test_file_list_without_header(tmp_path):
+    file_path = tmp_path / "old.filelist"
+    file_path.write_text("C:/a.ma\n\n  /b.ma \r\n/c.ma")
+
+    assert list(load_file_list(file_path)) == ["C:/a.ma", "/b.ma", "/c.ma"]
+    assert [path for chunk in iter_file_list(file_path, 4) for path in chunk] == [
+        "C:/a.ma",
+        "/b.ma",
+        "/c.ma",
+    ]
+
+
+def test_find_missing_files(temp_file_tree):
+    root = temp_file_tree.as_posix()
+    paths = [
+        f"{root}/a.ma",
+        f"{root}/Chars/hero.ma",
+        f"{root}/Chars/hero.MA",
+        f"{root}/Chars/villain.ma",
+        f"{root}/Chars/Props/sword.ma",
+        f"{root}/Nothing/rock.ma",
+        str(temp_file_tree / "Env" / "forest.ma"),
+    ]
+
+    missing = find_missing_files(paths, max_workers=2)
+    assert missing == [f"{root}/Chars/villain.ma", f"{root}/Nothing/rock.ma"]
+    assert summarize_missing_files(missing, len(paths), limit=1) == (
+        f"2 of 7 files are missing:\n{root}/Chars/villain.ma\n... and 1 more"
+    )
@@ -0,0 +1,95 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("bs4")
+
+from Commands.Cmd_TopVotesHackerNews import fetch_top_votes  # noqa: E402
+
+
+def get_page(page):
+    rows = []
+    for index in range(3):
+        votes = page * 100 + index
+        rows.append(
+            f'<tr><td><span class="titleline"><a href="https://example.com/{page}/'
+            f'{index}">Story {page}.{index}</a></span></td></tr>'
+            f'<tr><td class="subtext"><span class="score">{votes} points</span> '
+            f'<a href="user?id=a">a</a> <a href="item?id={page}{index}">comments</a>'
+            "</td></tr>"
+        )
+    return f"<html><body><table>{''.join(rows)}</table></body></html>"
+
+
+@pytest.fixture
+def stub_server(overlap_gate):
+    connections = set()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            connections.add(self.client_address)
+            with overlap_gate:
+                self.send_page()
+
+        def send_page(self):
+            page = int(parse_qs(urlparse(self.path).query)["p"][0])
+            body = get_page(page).encode("utf-8")
+            if page == 13:
+                self.send_response(500)
+                body = b""
+            else:
+                self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/", connections
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_top_votes_fetches_pages_at_once(stub_server, overlap_gate):
+    url, _connections = stub_server
+    overlap_gate.overlap = 20
+
+    links = fetch_top_votes(url, 20, max_connections=20)
+
+    # every page was requested before the first one was answered
+    assert overlap_gate.max_active == 20
+    # page 13 fails and is skipped
+    assert len(links) == 19 * 3
+    assert [link["Votes"] for link in links] == sorted(
+        (
+            page * 100 + index
+            for page in range(1, 21)
+            if page != 13
+            for index in range(3)
+        ),
+        reverse=True,
+    )
+    assert links[0]["Link"] == "https://example.com/20/2"
+    assert links[0]["Comments"] == url + "item?id=202"
+
+
+def test_fetch_top_votes_bounds_connections(stub_server, overlap_gate):
+    url, connections = stub_server
+    overlap_gate.overlap = 3
+
+    links = fetch_top_votes(url, 12, max_connections=3)
+
+    assert len(links) == 12 * 3
+    assert overlap_gate.max_active == 3
+    # connections are kept alive and reused
+    assert len(connections) == 3
@@ -0,0 +1,98 @@
+import json
+import os
+
+import pytest
+
+from Core import append_job_stats
+from JobCache import JobCache
+
+
+def _save_job(tmp_path, name, target_files, cache_results=True):
+    command_file = tmp_path / "Cmd_Cached.py"
+    if not command_file.exists():
+        command_file.write_text("print('cached')\n")
+    arguments_path = tmp_path / f"{name}.json"
+    arguments = {"cmd_py_path": command_file.as_posix(), "target_files": target_files}
+    if cache_results:
+        arguments["cache_results"] = True
+    arguments_path.write_text(json.dumps(arguments))
+    return arguments_path
+
+
+@pytest.mark.parametrize("hash_contents", [False, True])
+def test_job_cache(tmp_path, hash_contents):
+    target = tmp_path / "scene.ma"
+    target.write_text("v1")
+    cache = JobCache(1024 * 1024, hash_contents, cache_dir=tmp_path / "cache")
+
+    arguments_path = _save_job(tmp_path, "first", [target.as_posix()])
+    key = cache.get_job_key(arguments_path, "python")
+    assert cache.lookup(key) is None
+    assert key != cache.get_job_key(arguments_path, "mayapy")
+    assert cache.get_job_key(_save_job(tmp_path, "off", [], False)) is None
+
+    log_path = tmp_path / "first.log"
+    log_path.write_text("dumped scene.ma\n")
+    cache.store(key, arguments_path, log_path)
+
+    # the same inputs in a new arguments file hit
+    second_path = _save_job(tmp_path, "second", [target.as_posix()])
+    entry = cache.lookup(cache.get_job_key(second_path, "python"))
+    assert entry["command"] == "Cmd_Cached"
+    cache.restore(entry, tmp_path / "second.log")
+    lines = (tmp_path / "second.log").read_text().splitlines()
+    assert lines[0].startswith(f"Cached result of {arguments_path.as_posix()}")
+    assert lines[1:] == ["dumped scene.ma"]
+
+    # touching a target only misses when the keys use modification times
+    stat = target.stat()
+    os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert (cache.get_job_key(second_path, "python") == key) is hash_contents
+
+    target.write_text("v2")
+    assert cache.get_job_key(second_path, "python") != key
+
+
+def test_job_cache_evicts_least_recently_used(tmp_path):
+    cache = JobCache(250, cache_dir=tmp_path / "cache")
+    log_path = tmp_path / "job.log"
+    log_path.write_text("x" * 100)
+
+    keys = []
+    for name in ("a", "b", "c"):
+        arguments_path = _save_job(tmp_path, name, [name])
+        keys.append(cache.get_job_key(arguments_path))
+        cache.store(keys[-1], arguments_path, log_path)
+        if name == "b":
+            assert cache.lookup(keys[0])
+
+    assert cache.lookup(keys[0])
+    assert cache.lookup(keys[1]) is None
+    assert not cache.get_entry_dir(keys[1]).exists()
+    assert cache.lookup(keys[2])
+
+
+def test_job_cache_checks_outputs(tmp_path):
+    cache = JobCache(1024 * 1024, cache_dir=tmp_path / "cache")
+    output = tmp_path / "scene_nodes.jsonl"
+    output.write_text("{}\n")
+
+    def store_job(name):
+        arguments_path = _save_job(tmp_path, name, [name])
+        append_job_stats(arguments_path, {"outputs": [output.as_posix()]})
+        key = cache.get_job_key(arguments_path)
+        cache.store(key, arguments_path, None)
+        return key
+
+    key = store_job("a")
+    assert cache.lookup(key)
+
+    # an output written again since, e.g. by an other job, is a miss
+    stat = output.stat()
+    os.utime(output, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.lookup(key) is None
+    assert not cache.get_entry_dir(key).exists()
+
+    key = store_job("a")
+    output.unlink()
+    assert cache.lookup(key) is None
@@ -0,0 +1,46 @@
+from LogPager import LogPager
+
+
+def test_log_pager_reads_windows_of_lines(tmp_path):
+    log_path = tmp_path / "job.log"
+    lines = [b"line %d\n" % index for index in range(1000)]
+    log_path.write_bytes(b"".join(lines))
+
+    pager = LogPager(log_path, block_size=64)
+    assert pager.refresh()
+    assert not pager.refresh()
+    assert pager.line_count == 1000
+    assert pager.read_lines(0, 2) == lines[:2]
+    assert pager.read_lines(500, 3) == lines[500:503]
+    assert pager.read_lines(998, 10) == lines[998:]
+    assert pager.read_lines(1000, 10) == []
+
+
+def test_log_pager_follows_appended_output(tmp_path):
+    log_path = tmp_path / "job.log"
+    pager = LogPager(log_path, block_size=16)
+    assert not pager.refresh()
+    assert pager.line_count == 0
+
+    with open(log_path, "ab") as f:
+        f.write(b"first\nsecond")
+    assert pager.refresh()
+    assert pager.line_count == 2
+    assert pager.read_lines(1, 1) == [b"second"]
+
+    with open(log_path, "ab") as f:
+        f.write(b" line\n" + b"x" * 40 + b"\nlast\n")
+    pager.refresh()
+    assert pager.line_count == 4
+    assert pager.read_lines(1, 3) == [b"second line\n", b"x" * 40 + b"\n", b"last\n"]
+
+    # a rewritten, shorter log is indexed from the start again
+    log_path.write_bytes(b"new\n")
+    assert pager.refresh()
+    assert pager.read_lines(0, 10) == [b"new\n"]
+
+    # so is a log truncated to nothing, e.g. when the job restarts
+    log_path.write_bytes(b"")
+    assert pager.refresh()
+    assert pager.line_count == 0
+    assert not pager.refresh()
@@ -0,0 +1,35 @@
+import pytest
+
+from Records import RECORD_FORMATS, RecordWriter, get_record_format, iter_records
+
+
+@pytest.mark.parametrize("record_format", RECORD_FORMATS)
+def test_record_file_round_trip(tmp_path, record_format):
+    encoding, _, compression = record_format.partition(".")
+    if encoding == "msgpack":
+        pytest.importorskip("msgpack")
+    if compression == "zst":
+        pytest.importorskip("zstandard")
+
+    records = [{"scene": "a.ma"}] + [
+        {"name": f"node{index}", "translate": [index, 0.5, -1.0], "referenced": False}
+        for index in range(1000)
+    ]
+    file_path = tmp_path / f"a_nodes.{record_format}"
+    assert get_record_format(file_path) == record_format
+
+    with RecordWriter(file_path) as writer:
+        for record in records:
+            writer.write(record)
+
+    assert list(iter_records(file_path)) == records
+
+    # the records are read lazily
+    reader = iter_records(file_path)
+    assert next(reader) == {"scene": "a.ma"}
+    reader.close()
+
+
+def test_get_record_format_unknown():
+    with pytest.raises(ValueError):
+        get_record_format("a_nodes.json")
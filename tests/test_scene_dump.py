@@ -0,0 +1,101 @@
+from pathlib import Path
+
+import pytest
+
+import Commands.Cmd_BlenderDumpSceneInformation as blender_dump
+import Commands.Cmd_MayaDumpSceneInformation as maya_dump
+from Records import iter_records
+
+
+class StubCmds:
+    """Stands in for maya.cmds, keeping the path of the open scene."""
+
+    def __init__(self):
+        self.scene = None
+
+    def file(self, *args, **kwargs):
+        if kwargs.get("open"):
+            if "missing" in Path(args[0]).name:
+                raise RuntimeError("File not found: {0}".format(args[0]))
+            self.scene = args[0]
+
+
+@pytest.fixture
+def maya_scene(monkeypatch):
+    cmds = StubCmds()
+
+    def iter_node_records():
+        yield {"name": "root", "type": "transform"}
+        # the node iteration fails half way through the broken scenes
+        if "broken" in Path(cmds.scene).name:
+            raise RuntimeError("Unexpected node")
+        yield {"name": "mesh", "type": "mesh"}
+
+    monkeypatch.setattr(maya_dump, "cmds", cmds, raising=False)
+    monkeypatch.setattr(maya_dump, "iter_node_records", iter_node_records)
+
+
+def get_scenes(tmp_path, names):
+    return [(tmp_path / name).as_posix() for name in names]
+
+
+def test_maya_dump_keeps_finished_scenes(tmp_path, maya_scene):
+    command = maya_dump.Cmd_MayaDumpSceneInformation()
+    data = {
+        "target_files": get_scenes(
+            tmp_path,
+            ["a/scene.ma", "b/scene.ma", "broken.ma", "missing.ma", "c/last.ma"],
+        ),
+        "param_output_dir": (tmp_path / "out").as_posix(),
+        "param_output_format": "jsonl.gz",
+    }
+
+    with pytest.raises(RuntimeError, match="2 of 5 files failed"):
+        command.run(data)
+
+    outputs = [
+        Path(command.get_output_path(target_file, data))
+        for target_file in data["target_files"]
+    ]
+    assert len(set(outputs)) == len(outputs)
+    assert [output.exists() for output in outputs] == [True, True, False, False, True]
+    # nothing of the failed scenes is left behind
+    assert sorted((tmp_path / "out").iterdir()) == sorted(
+        output for output in outputs if output.exists()
+    )
+    assert list(iter_records(outputs[1])) == [
+        {"scene": data["target_files"][1]},
+        {"name": "root", "type": "transform"},
+        {"name": "mesh", "type": "mesh"},
+    ]
+
+
+def test_maya_dump_output_path(tmp_path):
+    command = maya_dump.Cmd_MayaDumpSceneInformation()
+    scene = (tmp_path / "scene.ma").as_posix()
+
+    assert command.get_output_path(scene, {}) == (
+        (tmp_path / "scene_nodes.jsonl").as_posix()
+    )
+    assert command.get_output_path(scene, {"param_output_format": "msgpack"}) == (
+        (tmp_path / "scene_nodes.msgpack").as_posix()
+    )
+
+
+def test_blender_dump_output_path(tmp_path):
+    command = blender_dump.Cmd_BlenderDumpSceneInformation()
+    scene = (tmp_path / "scene.blend").as_posix()
+
+    assert command.get_output_path(scene, {}) == (
+        (tmp_path / "scene_info.json").as_posix()
+    )
+    assert command.get_output_path(scene, {"param_output_type": "materials"}) == (
+        (tmp_path / "scene_materials_info.json").as_posix()
+    )
+
+    data = {"param_output_dir": (tmp_path / "out").as_posix()}
+    outputs = {
+        command.get_output_path(target_file, data)
+        for target_file in get_scenes(tmp_path, ["a/scene.blend", "b/scene.blend"])
+    }
+    assert len(outputs) == 2
@@ -0,0 +1,135 @@
+import json
+import sys
+import time
+
+import pytest
+
+pytest.importorskip("Qt")
+
+from Qt.QtCore import QCoreApplication  # noqa: E402
+
+from JobCache import JobCache  # noqa: E402
+from Widgets import JOB_STATE, BatchJob, JobScheduler  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+class StubJob(BatchJob):
+    """A job that is marked as running instead of starting a process."""
+
+    def __init__(self, tmp_path, name, cache_results=False):
+        command_file = tmp_path / "Cmd_Stub.py"
+        command_file.write_text("print('stub')\n")
+        arguments_json = tmp_path / "{0}.json".format(name)
+        arguments_json.write_text(
+            json.dumps(
+                {"cmd_py_path": command_file.as_posix(), "cache_results": cache_results}
+            )
+        )
+        super(StubJob, self).__init__(
+            name, sys.executable, "CommandExecuter.py", arguments_json
+        )
+        self.started = 0
+
+    def start(self, worker_pool=None):
+        self.started += 1
+        self.set_state(JOB_STATE.RUNNING)
+
+
+def wait_for(app, condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        app.processEvents()
+        time.sleep(0.01)
+
+
+def test_scheduler_checks_job_cache(app, tmp_path):
+    scheduler = JobScheduler(1)
+    scheduler.job_cache = JobCache(1024 * 1024, cache_dir=tmp_path / "cache")
+    finished = []
+
+    first = StubJob(tmp_path, "first", cache_results=True)
+    first.jobFinished.connect(finished.append)
+    scheduler.submit([first])
+    assert first.state == JOB_STATE.CHECKING
+    assert scheduler.is_pending(first)
+
+    wait_for(app, lambda: first.started)
+    first.log_path.write_text("ran first\n")
+    first.finish(True)
+    # the result is stored in the thread pool before the job is reported
+    assert first.state == JOB_STATE.FINISHED
+    assert scheduler.is_pending(first)
+    wait_for(app, lambda: finished)
+    assert finished == [True]
+    assert not scheduler.is_pending(first)
+
+    second = StubJob(tmp_path, "second", cache_results=True)
+    scheduler.submit([second])
+    wait_for(app, lambda: second.state == JOB_STATE.FINISHED)
+    assert second.started == 0
+    assert second.log_path.read_text().splitlines()[1:] == ["ran first"]
+
+    # jobs that don't cache their results run without being stored
+    third = StubJob(tmp_path, "third")
+    third.jobFinished.connect(finished.append)
+    scheduler.submit([third])
+    wait_for(app, lambda: third.started)
+    third.finish(True)
+    assert finished == [True, True]
+
+
+def test_scheduler_runs_job_after_dependency(app, tmp_path):
+    scheduler = JobScheduler(1)
+    dependency = StubJob(tmp_path, "dependency")
+    job = StubJob(tmp_path, "job")
+    job.set_dependencies([dependency])
+
+    scheduler.submit([job])
+    assert dependency.started == 1
+    assert job.state == JOB_STATE.WAITING
+
+    dependency.finish(True)
+    assert job.started == 1
+    assert not scheduler._watched
+
+    # a finished dependency no longer reaches the scheduler
+    dependency.finish(True)
+    assert job.started == 1
+
+
+def test_scheduler_releases_dependencies_of_dropped_jobs(app, tmp_path):
+    scheduler = JobScheduler(1)
+    dependency = StubJob(tmp_path, "dependency")
+    jobs = [StubJob(tmp_path, "job{0}".format(index)) for index in range(2)]
+    for job in jobs:
+        job.set_dependencies([dependency])
+
+    scheduler.submit(jobs)
+    scheduler.cancel(jobs[0])
+    assert jobs[0].state == JOB_STATE.KILLED
+    assert scheduler._watched == {dependency}
+
+    scheduler.clear()
+    assert not scheduler._watched
+
+    dependency.finish(True)
+    assert jobs[1].started == 0
+    assert jobs[1].state == JOB_STATE.WAITING
+
+
+def test_scheduler_closes_log_of_cancelled_job(app, tmp_path):
+    scheduler = JobScheduler(1)
+    running, queued = [StubJob(tmp_path, name) for name in ("running", "queued")]
+
+    scheduler.submit([running, queued])
+    assert queued.state == JOB_STATE.QUEUED
+    assert queued._log_file
+
+    assert scheduler.cancel(queued)
+    assert queued.state == JOB_STATE.KILLED
+    assert queued._log_file is None
@@ -0,0 +1,73 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from Commands import Cmd_Trends
+
+
+@pytest.fixture
+def fake_trends(monkeypatch, overlap_gate):
+    state = {"clients": 0, "trends": []}
+    lock = threading.Lock()
+
+    class FakeTrends:
+        def __init__(self):
+            with lock:
+                state["clients"] += 1
+
+        def trending_now(self, geo):
+            return state["trends"]
+
+        def trending_now_news_by_ids(self, news_tokens, max_news=20):
+            with overlap_gate:
+                if news_tokens == ["bad"]:
+                    raise ConnectionError("news unavailable")
+                return [
+                    SimpleNamespace(
+                        title=f"{token} news", url=f"http://{token}", source="CNA"
+                    )
+                    for token in news_tokens
+                ]
+
+    monkeypatch.setattr(Cmd_Trends, "Trends", FakeTrends, raising=False)
+    return state
+
+
+def test_fetch_news(fake_trends, overlap_gate):
+    overlap_gate.overlap = 4
+    selected = [
+        (index, SimpleNamespace(news_tokens=["bad"] if index == 3 else [f"t{index}"]))
+        for index in range(12)
+    ]
+
+    news = Cmd_Trends.fetch_news(selected, max_connections=4)
+
+    assert overlap_gate.max_active == 4
+    assert fake_trends["clients"] == 4
+    assert news[3] == []
+    assert news[0] == [{"Title": "t0 news", "Link": "http://t0", "Votes": "CNA"}]
+    assert [links[0]["Link"] for links in news if links] == [
+        f"http://t{index}" for index in range(12) if index != 3
+    ]
+
+
+def test_run_labels_sections_by_trend_index(fake_trends, monkeypatch, tmp_path):
+    fake_trends["trends"] = [
+        SimpleNamespace(keyword=f"k{index}", news_tokens=[f"t{index}"] * (index % 2))
+        for index in range(8)
+    ]
+    reports = []
+    monkeypatch.setattr(
+        Cmd_Trends.Core,
+        "generate_html_report_with_links",
+        lambda sections, **kwargs: reports.append(sections) or "",
+    )
+    monkeypatch.setattr(Cmd_Trends.webbrowser, "open_new_tab", lambda url: None)
+    monkeypatch.setattr(Cmd_Trends.tempfile, "tempdir", str(tmp_path))
+
+    Cmd_Trends.Cmd_Trends().run(
+        {"country_code": "TW", "start_idx": 2, "count": 2, "max_connections": 2}
+    )
+
+    assert [title for title, _news in reports[0]] == ["[3] k3", "[5] k5"]